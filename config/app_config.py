@@ -11,13 +11,83 @@ APP_AUTHOR = "TrackMyMouse"
 # --- File Names ---
 DB_FILENAME = "stats.db"
 PREFERENCES_FILENAME = "user_preferences.ini"
+RAW_EVENTS_DIRNAME = "raw_events"
+STATE_JOURNAL_FILENAME = "state.journal"
+
+# --- Database ---
+# Pragmas appliqués à chaque connexion à stats.db (journal_mode et synchronous : écrivain uniquement).
+DB_PRAGMAS = {
+    "journal_mode": "WAL",
+    "synchronous": "NORMAL",   # Sûr en mode WAL, évite un fsync à chaque commit
+    "cache_size": -8000,       # Valeur négative = taille en Kio (ici ~8 Mo)
+    "mmap_size": 67108864,     # 64 Mo
+    "busy_timeout": 5000,      # ms
+    "temp_store": "MEMORY",
+}
+DB_READ_POOL_SIZE = 2 # Connexions en lecture seule pour les requêtes de l'interface
+DB_READ_CACHED_STATEMENTS = 64 # Requêtes préparées gardées en cache par connexion de lecture
+# Toutes les écritures passent par un thread dédié ; les commandes en attente sont
+# regroupées dans une même transaction, dans la limite de N commandes par transaction.
+DB_WRITE_BATCH_MAX_COMMANDS = 64
 
 # --- Stats & Activity Tracking ---
 INACTIVITY_THRESHOLD_SECONDS = 5
 ACTIVITY_TRACKER_INTERVAL = 1
+# Écriture différée : les statistiques en mémoire sont persistées toutes les N secondes
+# (si elles ont changé), au changement de jour et à la fermeture. Les lectures n'écrivent plus.
+STATS_FLUSH_INTERVAL_SECONDS = 60
+# Journal d'état mmap des compteurs en cours (stats du jour, points XP), mis à jour chaque seconde
+# et rejoué au démarrage après un arrêt non propre.
+STATE_JOURNAL_ENABLED = True
+
+# --- Input Pipeline ---
+# En mode lot, le listener pynput écrit les mouvements dans un tampon circulaire
+# et un thread consommateur publie un seul événement 'mouse_moved_batch' toutes les N ms.
+MOUSE_BATCH_MODE_ENABLED = True
+MOUSE_BATCH_INTERVAL_MS = 50
+MOUSE_RING_BUFFER_CAPACITY = 4096 # Arrondi à la puissance de 2 supérieure
+
+# Décimation des mouvements : les mouvements de longueur nulle sont toujours supprimés (sans perte).
+# Une fenêtre de fusion > 0 fusionne aussi les points proches dans le temps et dans l'espace ;
+# chaque point fusionné sous-estime la distance d'au plus 2 * sqrt(2) * RADIUS pixels.
+# Ignorée lorsque RAW_EVENT_LOG_ENABLED est vrai : le journal brut reçoit tous les mouvements.
+MOUSE_DECIMATION_ENABLED = True
+MOUSE_DECIMATION_MERGE_WINDOW_MS = 0 # 0 = fusion désactivée, distance exacte
+MOUSE_DECIMATION_MERGE_RADIUS_PX = 1
+
+# Journal brut optionnel des événements (rejeu, cartes de chaleur) : segments compressés
+# d'une heure dans le dossier RAW_EVENTS_DIRNAME, à côté de stats.db. Désactivé par défaut.
+# Activé, il désactive la décimation des mouvements (MOUSE_DECIMATION_ENABLED).
+RAW_EVENT_LOG_ENABLED = False
+RAW_EVENT_LOG_FLUSH_INTERVAL_SECONDS = 5
+RAW_EVENT_LOG_CHUNK_RECORDS = 4096 # Enregistrements par trame compressée (granularité de l'index)
+RAW_EVENT_LOG_COMPRESSION_LEVEL = 6
+RAW_EVENT_LOG_REORDER_WINDOW_SECONDS = 1.0 # Retenue des événements récents pour les écrire dans l'ordre
+
+# --- Event Dispatch ---
+# Sujets distribués de manière asynchrone par le thread de l'EventManager (opt-in par sujet).
+# Politiques : 'block' (le publieur attend), 'drop_oldest' (abandon du plus ancien),
+# 'coalesce' (le dernier événement en attente est remplacé par le nouveau).
+# 'day_changed' reste synchrone : il doit être traité avant l''activity_tick' publié juste après,
+# sinon les premières secondes (et l'XP) du nouveau jour sont attribuées à la veille.
+EVENT_ASYNC_TOPICS = {
+    "level_up": {"maxsize": 1, "policy": "coalesce"},
+    "xp_recompute_progress": {"maxsize": 1, "policy": "coalesce"},
+}
+
+# Métriques de distribution par sujet et par callback (coût quasi nul lorsqu'elles sont désactivées)
+EVENT_METRICS_ENABLED = False
+EVENT_SLOW_CALLBACK_BUDGET_MS = 5
+EVENT_SLOW_CALLBACK_WARNING_INTERVAL_S = 60
 
 # --- XP/Level System ---
-XP_SAVE_INTERVAL_SECONDS = 3600 # 1 heure
+# Les points gagnés sont écrits dans le registre xp_ledger au rythme de STATS_FLUSH_INTERVAL_SECONDS.
+# Rechargement à chaud de modules/level/xp_config.json (scrutation de sa date de modification)
+XP_CONFIG_WATCH_ENABLED = True
+XP_CONFIG_WATCH_INTERVAL_SECONDS = 2
+# Recalcul du registre XP depuis daily_stats quand les taux de gain diffèrent de ceux de l'historique
+XP_RECOMPUTE_ON_RATES_CHANGE = True
+XP_RECOMPUTE_CHUNK_DAYS = 366 # Jours calculés entre deux événements 'xp_recompute_progress'
 
 # --- GUI (Graphical User Interface) ---
 HISTORY_DAYS_OPTIONS = [7, 14, 30]
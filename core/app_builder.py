@@ -5,13 +5,21 @@ logger = logging.getLogger(__name__)
 
 from core.event_manager import event_manager
 from core.service_locator import service_locator
+from core.database import Database
+from utils.paths import get_state_journal_path
 
 # Import de tous les managers à construire
 from managers.config_manager import ConfigManager
 from managers.language_manager import LanguageManager
 from managers.stats_manager import StatsManager
 from managers.activity_tracker import ActivityTracker
+from managers.flush_scheduler import FlushScheduler
 from managers.input_manager import InputManager
+from managers.movement_aggregator import MovementAggregator
+from managers.raw_event_recorder import RawEventRecorder
+from managers.state_journal import StateJournal
+from managers.stats_repository import StatsRepository
+from modules.level.xp_repository import XPRepository
 from modules.level.xp_manager import XPManager
 
 class AppBuilder:
@@ -38,12 +46,28 @@ class AppBuilder:
 
     def _build_core_services(self):
         """Construit les services fondamentaux comme le ConfigManager."""
-        logger.debug("Construction de ConfigManager et LanguageManager...")
+        logger.debug("Construction de ConfigManager, LanguageManager et Database...")
         
         config_manager = ConfigManager()
         service_locator.register_service("config_manager", config_manager)
         self._services['config_manager'] = config_manager
 
+        database = Database(
+            pragmas=config_manager.get_app_config('DB_PRAGMAS'),
+            read_pool_size=config_manager.get_app_config('DB_READ_POOL_SIZE', 2),
+            write_batch_max_commands=config_manager.get_app_config('DB_WRITE_BATCH_MAX_COMMANDS', 64),
+            read_cached_statements=config_manager.get_app_config('DB_READ_CACHED_STATEMENTS', 64)
+        )
+        service_locator.register_service("database", database)
+        self._services['database'] = database
+
+        # Le journal d'état est rejoué avant que les managers ne chargent leurs compteurs depuis la BDD
+        if config_manager.get_app_config('STATE_JOURNAL_ENABLED', False):
+            state_journal = StateJournal(get_state_journal_path())
+            state_journal.replay(StatsRepository(database), XPRepository(database))
+            service_locator.register_service("state_journal", state_journal)
+            self._services['state_journal'] = state_journal
+
         language_manager = LanguageManager()
         service_locator.register_service("language_manager", language_manager)
         self._services['language_manager'] = language_manager
@@ -51,10 +75,24 @@ class AppBuilder:
         service_locator.register_service("event_manager", event_manager)
         self._services['event_manager'] = event_manager
 
+        event_manager.configure_metrics(
+            enabled=config_manager.get_app_config('EVENT_METRICS_ENABLED', False),
+            slow_callback_budget_ms=config_manager.get_app_config('EVENT_SLOW_CALLBACK_BUDGET_MS', 5),
+            warning_interval_s=config_manager.get_app_config('EVENT_SLOW_CALLBACK_WARNING_INTERVAL_S', 60)
+        )
+
+        async_topics = config_manager.get_app_config('EVENT_ASYNC_TOPICS', {})
+        for event_name, options in async_topics.items():
+            event_manager.configure_async(event_name, **options)
+
     def _build_managers(self):
         """Construit le reste des managers métier."""
         logger.debug("Construction des managers métier...")
 
+        movement_aggregator = MovementAggregator()
+        service_locator.register_service("movement_aggregator", movement_aggregator)
+        self._services['movement_aggregator'] = movement_aggregator
+
         stats_manager = StatsManager()
         service_locator.register_service("stats_manager", stats_manager)
         self._services['stats_manager'] = stats_manager
@@ -66,13 +104,27 @@ class AppBuilder:
         activity_tracker = ActivityTracker()
         self._services['activity_tracker'] = activity_tracker
 
+        flush_scheduler = FlushScheduler()
+        self._services['flush_scheduler'] = flush_scheduler
+
+        if self._services['config_manager'].get_app_config('RAW_EVENT_LOG_ENABLED', False):
+            raw_event_recorder = RawEventRecorder()
+            service_locator.register_service("raw_event_recorder", raw_event_recorder)
+            self._services['raw_event_recorder'] = raw_event_recorder
+
         input_manager = InputManager()
         service_locator.register_service("input_manager", input_manager)
         self._services['input_manager'] = input_manager
 
     def _start_background_threads(self):
         """Démarre les services qui tournent en arrière-plan."""
-        logger.debug("Démarrage des threads de fond (XPManager, ActivityTracker)...")
+        logger.debug("Démarrage des threads de fond (XPManager, ActivityTracker, FlushScheduler)...")
         self._services['xp_manager'].start()
+        # Après XPManager.start() : sur 'activity_tick', le journal doit voir l'XP de la seconde déjà créditée
+        if 'state_journal' in self._services:
+            self._services['state_journal'].attach(self._services['stats_manager'], self._services['xp_manager'])
         self._services['activity_tracker'].start()
+        self._services['flush_scheduler'].start()
+        if 'raw_event_recorder' in self._services:
+            self._services['raw_event_recorder'].start()
         self._services['input_manager'].start_tracking()
\ No newline at end of file
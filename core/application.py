@@ -35,6 +35,11 @@ class MouseTrackerApp:
         self.input_manager = self.services.get('input_manager')
         self.xp_manager = self.services.get('xp_manager')
         self.activity_tracker = self.services.get('activity_tracker')
+        self.event_manager = self.services.get('event_manager')
+        self.flush_scheduler = self.services.get('flush_scheduler')
+        self.database = self.services.get('database')
+        self.raw_event_recorder = self.services.get('raw_event_recorder')
+        self.state_journal = self.services.get('state_journal')
         # -----------------------------------------------------------
 
         # La création de l'UI et du systray reste de la responsabilité de l'application
@@ -138,9 +143,15 @@ class MouseTrackerApp:
         logger.info("Début de l'arrêt des composants de l'application...")
         if self.main_window: self.main_window.stop_update_loop()
         if self.input_manager: self.input_manager.stop_tracking()
-        if hasattr(self, 'activity_tracker'): self.activity_tracker.stop()
+        if self.raw_event_recorder: self.raw_event_recorder.stop()
+        # Attend la fin du tick et du cycle d'écriture en cours avant les sauvegardes finales
+        if self.activity_tracker: self.activity_tracker.stop()
+        if self.flush_scheduler: self.flush_scheduler.stop()
+        if self.event_manager: self.event_manager.shutdown()
         if self.xp_manager: self.xp_manager.stop()
         if self.stats_manager: self.stats_manager.close()
+        if self.state_journal: self.state_journal.close()
+        if self.database: self.database.close()
         if self.systray_manager:
             if from_systray_thread: self.systray_manager.signal_icon_to_stop()
             else: self.systray_manager.stop() 
@@ -0,0 +1,246 @@
+# core/database.py
+
+import pathlib
+import queue
+import sqlite3
+import logging
+import threading
+from concurrent.futures import Future
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from utils.paths import get_db_path
+
+logger = logging.getLogger(__name__)
+
+# Pragmas appliqués par défaut si la configuration n'en fournit pas
+DEFAULT_PRAGMAS: Dict[str, Any] = {
+    "journal_mode": "WAL",
+    "synchronous": "NORMAL",
+    "cache_size": -8000,
+    "mmap_size": 64 * 1024 * 1024,
+    "busy_timeout": 5000,
+    "temp_store": "MEMORY",
+}
+
+# Pragmas persistants ou propres à l'écrivain, non rejoués sur les connexions de lecture
+_WRITER_ONLY_PRAGMAS = ("journal_mode", "synchronous")
+
+class _WriteCommand:
+    """Commande d'écriture en attente : fonction à exécuter et futur à résoudre."""
+    __slots__ = ('fn', 'args', 'kwargs', 'future')
+
+    def __init__(self, fn: Callable, args: tuple, kwargs: dict):
+        self.fn = fn
+        self.args = args
+        self.kwargs = kwargs
+        self.future: Future = Future()
+
+class Database:
+    """
+    Service de base de données partagé par tous les repositories (stats.db).
+
+    - Toutes les écritures sont exécutées par un unique thread d'écriture, seul propriétaire
+      de la connexion d'écriture. Les composants soumettent des commandes (submit) et reçoivent
+      un Future. Les commandes en attente sont regroupées dans une même transaction, chacune
+      dans son propre SAVEPOINT : l'échec d'une commande n'annule pas les autres.
+    - Une commande qui en soumet d'autres (depuis le thread d'écriture) les exécute immédiatement
+      dans la transaction en cours, ce qui permet de composer les écritures de plusieurs repositories.
+    - Un petit pool de connexions distinctes, ouvertes en lecture seule au niveau du fichier
+      (URI 'file:...?mode=ro'), pour toutes les requêtes. En mode WAL, un lecteur lit un instantané
+      cohérent sans jamais attendre l'écrivain, et inversement. Chaque connexion garde en cache
+      ses requêtes préparées (cached_statements).
+    """
+    def __init__(self, db_path: Optional[str] = None, pragmas: Optional[Dict[str, Any]] = None,
+                 read_pool_size: int = 2, write_batch_max_commands: int = 64, read_cached_statements: int = 64):
+        self.db_path = db_path or get_db_path()
+        self._pragmas = dict(DEFAULT_PRAGMAS if pragmas is None else pragmas)
+        self._read_pool_size = max(1, read_pool_size)
+        self._write_batch_max_commands = max(1, write_batch_max_commands)
+        self._read_cached_statements = max(0, read_cached_statements)
+
+        self._write_queue: "queue.Queue[Optional[_WriteCommand]]" = queue.Queue()
+        self._read_pool: List[sqlite3.Connection] = []
+        self._read_pool_lock = threading.Lock()
+        self._closed = False
+
+        # Compteurs du thread d'écriture
+        self.committed_transactions = 0
+        self.executed_commands = 0
+        self.failed_commands = 0
+
+        logger.info(f"Database : Connexion d'écriture à {self.db_path}")
+        try:
+            self._writer = self._open_connection(writer=True)
+        except (sqlite3.Error, OSError) as e:
+            logger.critical(f"Database : Erreur critique lors de la connexion à la BDD '{self.db_path}': {e}", exc_info=True)
+            raise
+        logger.info(f"Database : Connexion établie (journal_mode={self._writer.execute('PRAGMA journal_mode').fetchone()[0]}).")
+
+        self._writer_thread = threading.Thread(target=self._writer_loop, name="DatabaseWriter", daemon=True)
+        self._writer_thread.start()
+
+    def _open_connection(self, writer: bool) -> sqlite3.Connection:
+        """
+        Ouvre une connexion et lui applique les pragmas configurés. Les lecteurs passent par une URI
+        en mode 'ro' : ils ne peuvent ni écrire ni prendre de verrou d'écriture sur la base.
+        """
+        if writer:
+            conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        else:
+            uri = pathlib.Path(self.db_path).resolve().as_uri() + "?mode=ro"
+            conn = sqlite3.connect(uri, uri=True, check_same_thread=False,
+                                   cached_statements=self._read_cached_statements)
+        conn.row_factory = sqlite3.Row
+        for name, value in self._pragmas.items():
+            if not writer and name in _WRITER_ONLY_PRAGMAS:
+                continue
+            conn.execute(f"PRAGMA {name} = {value}")
+        if writer:
+            # Transactions pilotées explicitement par le thread d'écriture (BEGIN / SAVEPOINT / COMMIT)
+            conn.isolation_level = None
+        return conn
+
+    # --- Écritures ---
+
+    def submit(self, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Future:
+        """
+        Soumet une écriture : `fn(conn, *args, **kwargs)` sera exécutée par le thread d'écriture.
+        Retourne un Future résolu avec la valeur de retour de `fn` une fois la transaction validée,
+        ou avec l'exception levée par `fn` (son SAVEPOINT est alors annulé).
+
+        Appelée depuis le thread d'écriture (commande imbriquée), `fn` est exécutée immédiatement
+        dans la transaction en cours et ses exceptions sont propagées à la commande englobante.
+        """
+        if threading.current_thread() is self._writer_thread:
+            future: Future = Future()
+            future.set_result(fn(self._writer, *args, **kwargs))
+            return future
+        command = _WriteCommand(fn, args, kwargs)
+        # Vérification et mise en file sous le verrou que close() prend avant le signal d'arrêt :
+        # une commande acceptée est toujours en file avant le signal, donc exécutée
+        with self._read_pool_lock:
+            if self._closed:
+                raise RuntimeError("Database fermée : écriture refusée.")
+            self._write_queue.put(command)
+        return command.future
+
+    def execute(self, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        """Soumet une écriture et attend son résultat (raccourci pour submit(...).result())."""
+        return self.submit(fn, *args, **kwargs).result()
+
+    def _next_batch(self) -> Tuple[List[_WriteCommand], bool]:
+        """
+        Attend une commande puis récupère, sans attendre, celles déjà en file (dans la limite
+        configurée). Retourne le lot et un indicateur d'arrêt.
+        """
+        command = self._write_queue.get()
+        if command is None:
+            return [], True
+        batch = [command]
+        stop = False
+        while len(batch) < self._write_batch_max_commands:
+            try:
+                command = self._write_queue.get_nowait()
+            except queue.Empty:
+                break
+            if command is None:
+                stop = True
+                break
+            batch.append(command)
+        return batch, stop
+
+    def _run_batch(self, batch: List[_WriteCommand]):
+        """Exécute un lot de commandes dans une transaction, chacune dans un SAVEPOINT."""
+        conn = self._writer
+        outcomes = []
+        try:
+            conn.execute("BEGIN")
+            for command in batch:
+                if not command.future.set_running_or_notify_cancel():
+                    continue
+                conn.execute("SAVEPOINT write_command")
+                try:
+                    result = command.fn(conn, *command.args, **command.kwargs)
+                except BaseException as e:
+                    conn.execute("ROLLBACK TO write_command")
+                    conn.execute("RELEASE write_command")
+                    outcomes.append((command, False, e))
+                    self.failed_commands += 1
+                    logger.error(f"Database : Échec de la commande d'écriture '{getattr(command.fn, '__qualname__', command.fn)}'", exc_info=True)
+                else:
+                    conn.execute("RELEASE write_command")
+                    outcomes.append((command, True, result))
+            conn.execute("COMMIT")
+            self.committed_transactions += 1
+        except sqlite3.Error as e:
+            logger.error(f"Database : Échec de la transaction ({len(batch)} commande(s)) : {e}", exc_info=True)
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            for command in batch:
+                if not command.future.done():
+                    if not command.future.running():
+                        command.future.set_running_or_notify_cancel()
+                    command.future.set_exception(e)
+            return
+
+        # Les futurs ne sont résolus qu'après le COMMIT : un résultat signifie une écriture durable
+        self.executed_commands += len(outcomes)
+        for command, succeeded, value in outcomes:
+            if succeeded:
+                command.future.set_result(value)
+            else:
+                command.future.set_exception(value)
+
+    def _writer_loop(self):
+        """Boucle du thread d'écriture : exécute les commandes par lots jusqu'à la fermeture."""
+        logger.info("Le thread d'écriture de la BDD démarre.")
+        stop = False
+        while not stop:
+            batch, stop = self._next_batch()
+            if batch:
+                self._run_batch(batch)
+        logger.info(
+            f"Le thread d'écriture de la BDD s'est arrêté proprement ({self.executed_commands} commandes, "
+            f"{self.committed_transactions} transactions, {self.failed_commands} échecs)."
+        )
+
+    # --- Lectures ---
+
+    @contextmanager
+    def read_connection(self) -> Iterator[sqlite3.Connection]:
+        """Emprunte une connexion en lecture seule au pool (ou en ouvre une nouvelle)."""
+        with self._read_pool_lock:
+            conn = self._read_pool.pop() if self._read_pool else None
+        if conn is None:
+            conn = self._open_connection(writer=False)
+        try:
+            yield conn
+        finally:
+            # Termine la transaction de lecture implicite pour libérer l'instantané WAL
+            if conn.in_transaction:
+                conn.rollback()
+            with self._read_pool_lock:
+                if not self._closed and len(self._read_pool) < self._read_pool_size:
+                    self._read_pool.append(conn)
+                    conn = None
+            if conn is not None:
+                conn.close()
+
+    def close(self):
+        """
+        Exécute les écritures encore en file, arrête le thread d'écriture puis ferme
+        la connexion d'écriture et toutes les connexions de lecture du pool.
+        """
+        if self._closed:
+            return
+        logger.info("Database : Fermeture des connexions à la BDD.")
+        with self._read_pool_lock:
+            self._closed = True
+            for conn in self._read_pool:
+                conn.close()
+            self._read_pool.clear()
+            # Dernier élément de la file : aucune commande ne peut plus être acceptée après lui
+            self._write_queue.put(None)
+        self._writer_thread.join()
+        self._writer.close()
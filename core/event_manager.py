@@ -1,15 +1,133 @@
 # core/event_manager.py
 
+import inspect
 import logging
-from collections import defaultdict
-from typing import Callable, Dict, List, Any
+import threading
+import time
+import weakref
+from collections import deque
+from typing import Callable, Dict, Tuple, Any, Optional
 
 logger = logging.getLogger(__name__)
 
+# Politiques de contre-pression pour les sujets asynchrones
+POLICY_BLOCK = 'block'             # Le publieur attend qu'une place se libère
+POLICY_DROP_OLDEST = 'drop_oldest' # L'événement le plus ancien en attente est abandonné
+POLICY_COALESCE = 'coalesce'       # Le dernier événement en attente est remplacé par le nouveau
+ASYNC_POLICIES = (POLICY_BLOCK, POLICY_DROP_OLDEST, POLICY_COALESCE)
+
+class _AsyncTopic:
+    """État d'un sujet publié en mode asynchrone : file bornée, politique et compteurs."""
+    __slots__ = ('maxsize', 'policy', 'queue', 'enqueued', 'dispatched', 'dropped', 'coalesced', 'max_depth')
+
+    def __init__(self, maxsize: int, policy: str):
+        self.maxsize = maxsize
+        self.policy = policy
+        self.queue: deque = deque()
+        self.enqueued = 0
+        self.dispatched = 0
+        self.dropped = 0
+        self.coalesced = 0
+        self.max_depth = 0
+
+# Histogramme à mémoire fixe : le seau b contient les durées dans [2^(b-1), 2^b) unités de 1,024 µs
+_HISTOGRAM_BUCKETS = 32
+_HISTOGRAM_UNIT_MS = 1024 / 1_000_000
+
+class _CallbackMetrics:
+    """Compteurs d'un callback : appels, temps total/max et histogramme logarithmique des durées."""
+    __slots__ = ('calls', 'total_ns', 'max_ns', 'slow_calls', 'last_warning', 'histogram')
+
+    def __init__(self):
+        self.calls = 0
+        self.total_ns = 0
+        self.max_ns = 0
+        self.slow_calls = 0
+        self.last_warning = float('-inf')
+        self.histogram = [0] * _HISTOGRAM_BUCKETS
+
+    def record(self, elapsed_ns: int):
+        self.calls += 1
+        self.total_ns += elapsed_ns
+        if elapsed_ns > self.max_ns:
+            self.max_ns = elapsed_ns
+        self.histogram[min((elapsed_ns >> 10).bit_length(), _HISTOGRAM_BUCKETS - 1)] += 1
+
+    def approximate_percentile_ms(self, percentile: float) -> float:
+        """Retourne la borne haute du seau contenant le percentile demandé (approximation par excès)."""
+        if not self.calls:
+            return 0.0
+        threshold = self.calls * percentile
+        cumulative = 0
+        for bucket, count in enumerate(self.histogram):
+            cumulative += count
+            if cumulative >= threshold:
+                return min((1 << bucket) * _HISTOGRAM_UNIT_MS, self.max_ns / 1_000_000)
+        return self.max_ns / 1_000_000
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            'calls': self.calls,
+            'total_ms': self.total_ns / 1_000_000,
+            'mean_ms': self.total_ns / self.calls / 1_000_000 if self.calls else 0.0,
+            'max_ms': self.max_ns / 1_000_000,
+            'p99_ms': self.approximate_percentile_ms(0.99),
+            'slow_calls': self.slow_calls,
+        }
+
+class _TopicMetrics:
+    """Compteurs d'un sujet : nombre de publications et métriques par callback."""
+    __slots__ = ('publish_count', 'callbacks')
+
+    def __init__(self):
+        self.publish_count = 0
+        self.callbacks: Dict[str, _CallbackMetrics] = {}
+
+class _Subscriber:
+    """Entrée du registre : référence forte ou faible vers un callback."""
+    __slots__ = ('callback', 'ref', '__weakref__')
+
+    def __init__(self, callback: Optional[Callable] = None):
+        self.callback = callback
+        self.ref: Optional[weakref.ref] = None
+
+    def resolve(self) -> Optional[Callable]:
+        """Retourne le callback, ou None si l'objet référencé faiblement a été détruit."""
+        if self.callback is not None:
+            return self.callback
+        return self.ref() if self.ref is not None else None
+
+class Subscription:
+    """
+    Poignée retournée par EventManager.subscribe().
+    Permet de se désabonner sans conserver une référence au callback.
+    """
+    __slots__ = ('event_name', '_entry', '_manager')
+
+    def __init__(self, manager: 'EventManager', event_name: str, entry: _Subscriber):
+        self._manager = manager
+        self.event_name = event_name
+        self._entry = entry
+
+    @property
+    def active(self) -> bool:
+        """Indique si l'abonnement est toujours présent dans le registre."""
+        return self._entry in self._manager._subscribers.get(self.event_name, ())
+
+    def unsubscribe(self):
+        """Retire l'abonnement du registre (sans effet s'il a déjà été retiré)."""
+        self._manager._remove_entry(self.event_name, self._entry)
+
 class EventManager:
     """
     Gestionnaire d'événements Singleton pour une architecture Publish/Subscribe.
     Permet un couplage faible entre les différents composants de l'application.
+    Par défaut, les abonnés sont appelés sur le thread du publieur ; certains sujets
+    peuvent être basculés en mode asynchrone (file bornée vidée par un thread dédié).
+
+    Le registre des abonnés est en copie-sur-écriture : chaque sujet pointe vers un tuple
+    immuable qui est remplacé (sous verrou) à chaque (dés)abonnement. La publication lit
+    l'instantané courant sans prendre de verrou.
     """
     _instance = None
     _initialized: bool = False
@@ -21,33 +139,286 @@ class EventManager:
 
     def __init__(self):
         if not self._initialized:
-            # Un dictionnaire pour stocker les abonnés à chaque événement.
-            # defaultdict(list) crée automatiquement une liste vide pour les nouveaux événements.
-            self.subscribers: Dict[str, List[Callable]] = defaultdict(list)
+            # Un dictionnaire associant à chaque événement un tuple immuable d'abonnés.
+            self._subscribers: Dict[str, Tuple[_Subscriber, ...]] = {}
+            # RLock : un finaliseur de référence faible peut se déclencher pendant une modification
+            self._registry_lock = threading.RLock()
+
+            # --- Mode asynchrone (opt-in par sujet) ---
+            self._async_topics: Dict[str, _AsyncTopic] = {}
+            self._async_condition = threading.Condition()
+            self._ready_topics: deque = deque()
+            self._dispatcher_thread: Optional[threading.Thread] = None
+            self._stopping = False
+
+            # --- Métriques de distribution (désactivées par défaut) ---
+            self._metrics_enabled = False
+            self._metrics: Dict[str, _TopicMetrics] = {}
+            self._slow_callback_budget_ns = 5_000_000
+            self._slow_warning_interval_s = 60.0
             self._initialized = True
 
-    def subscribe(self, event_name: str, callback: Callable):
+    def subscribe(self, event_name: str, callback: Callable, weak: bool = False) -> Subscription:
         """
-        Abonne une fonction (callback) à un événement.
+        Abonne une fonction (callback) à un événement et retourne une poignée de désabonnement.
+        Avec weak=True, seule une référence faible est conservée : l'abonnement disparaît
+        automatiquement lorsque l'objet propriétaire de la méthode est détruit.
         """
-        self.subscribers[event_name].append(callback)
+        entry = _Subscriber()
+        if weak:
+            on_collected = lambda _ref, name=event_name, e=weakref.ref(entry): self._on_referent_collected(name, e)
+            if inspect.ismethod(callback):
+                entry.ref = weakref.WeakMethod(callback, on_collected)
+            else:
+                entry.ref = weakref.ref(callback, on_collected)
+        else:
+            entry.callback = callback
+
+        with self._registry_lock:
+            self._subscribers[event_name] = self._subscribers.get(event_name, ()) + (entry,)
+        return Subscription(self, event_name, entry)
+
+    def unsubscribe(self, event_name: str, callback: Callable) -> bool:
+        """
+        Désabonne un callback d'un événement. Retourne True si un abonnement a été retiré.
+        """
+        with self._registry_lock:
+            current = self._subscribers.get(event_name, ())
+            remaining = tuple(entry for entry in current if entry.resolve() != callback)
+            if len(remaining) == len(current):
+                return False
+            self._set_entries(event_name, remaining)
+        return True
+
+    def _remove_entry(self, event_name: str, entry: _Subscriber):
+        """Retire une entrée précise du registre (utilisé par les poignées d'abonnement)."""
+        with self._registry_lock:
+            current = self._subscribers.get(event_name, ())
+            if entry in current:
+                self._set_entries(event_name, tuple(e for e in current if e is not entry))
+
+    def _on_referent_collected(self, event_name: str, entry_ref: weakref.ref):
+        """Appelée par le ramasse-miettes quand l'objet d'un abonnement faible est détruit."""
+        entry = entry_ref()
+        if entry is not None:
+            self._remove_entry(event_name, entry)
+
+    def _set_entries(self, event_name: str, entries: Tuple[_Subscriber, ...]):
+        """Remplace l'instantané d'un sujet. Doit être appelée sous le verrou du registre."""
+        if entries:
+            self._subscribers[event_name] = entries
+        else:
+            self._subscribers.pop(event_name, None)
+
+    def get_subscriber_count(self, event_name: str) -> int:
+        """Retourne le nombre d'abonnés (encore vivants) à un événement."""
+        return sum(1 for entry in self._subscribers.get(event_name, ()) if entry.resolve() is not None)
 
     def publish(self, event_name: str, *args: Any, **kwargs: Any):
         """
         Publie un événement, ce qui déclenche tous les callbacks abonnés.
+        Pour un sujet asynchrone, l'événement est mis en file et la méthode rend la main aussitôt.
+        """
+        topic = self._async_topics.get(event_name)
+        if topic is not None and not self._stopping and threading.current_thread() is not self._dispatcher_thread:
+            self._enqueue(event_name, topic, args, kwargs)
+        else:
+            self._dispatch(event_name, args, kwargs)
+
+    def _dispatch(self, event_name: str, args: tuple, kwargs: dict):
+        """Appelle chaque abonné de l'événement sur le thread courant."""
+        if self._metrics_enabled:
+            self._dispatch_with_metrics(event_name, args, kwargs)
+            return
+        # Lecture sans verrou de l'instantané courant (tuple immuable)
+        for entry in self._subscribers.get(event_name, ()):
+            callback = entry.callback
+            if callback is None:
+                callback = entry.resolve()
+                if callback is None:
+                    continue # Objet détruit, l'entrée sera retirée par son finaliseur
+            try:
+                callback(*args, **kwargs)
+            except Exception as e:
+                # Log l'erreur mais continue d'appeler les autres abonnés
+                # exc_info=True inclut automatiquement les détails de l'erreur dans le log
+                logger.error(
+                    f"Erreur lors de l'appel du callback '{getattr(callback, '__qualname__', callback)}' pour l'événement '{event_name}'",
+                    exc_info=True
+                )
+
+    # --- Métriques de distribution ---
+
+    def configure_metrics(self, enabled: bool, slow_callback_budget_ms: float = 5.0, warning_interval_s: float = 60.0):
+        """
+        Active ou désactive les métriques par sujet et par callback.
+        Un callback qui dépasse `slow_callback_budget_ms` déclenche un avertissement,
+        au plus une fois toutes les `warning_interval_s` secondes par callback.
         """
-        if event_name in self.subscribers:
-            # Appelle chaque fonction abonnée avec les arguments fournis
-            for callback in self.subscribers[event_name]:
-                try:
-                    callback(*args, **kwargs)
-                except Exception as e:
-                    # Log l'erreur mais continue d'appeler les autres abonnés
-                    # exc_info=True inclut automatiquement les détails de l'erreur dans le log
-                    logger.error(
-                        f"Erreur lors de l'appel du callback '{callback.__name__}' pour l'événement '{event_name}'", 
-                        exc_info=True
+        self._slow_callback_budget_ns = int(slow_callback_budget_ms * 1_000_000)
+        self._slow_warning_interval_s = warning_interval_s
+        self._metrics_enabled = enabled
+        logger.info(f"Métriques de l'EventManager {'activées' if enabled else 'désactivées'} (budget : {slow_callback_budget_ms} ms).")
+
+    def _dispatch_with_metrics(self, event_name: str, args: tuple, kwargs: dict):
+        """
+        Variante instrumentée de _dispatch. Les compteurs ne sont pas protégés par un verrou :
+        en cas de publications concurrentes, ils restent approximatifs.
+        """
+        topic_metrics = self._metrics.get(event_name)
+        if topic_metrics is None:
+            topic_metrics = self._metrics.setdefault(event_name, _TopicMetrics())
+        topic_metrics.publish_count += 1
+
+        for entry in self._subscribers.get(event_name, ()):
+            callback = entry.resolve()
+            if callback is None:
+                continue
+            callback_name = getattr(callback, '__qualname__', repr(callback))
+            start_ns = time.perf_counter_ns()
+            try:
+                callback(*args, **kwargs)
+            except Exception as e:
+                logger.error(
+                    f"Erreur lors de l'appel du callback '{callback_name}' pour l'événement '{event_name}'",
+                    exc_info=True
+                )
+            elapsed_ns = time.perf_counter_ns() - start_ns
+
+            callback_metrics = topic_metrics.callbacks.get(callback_name)
+            if callback_metrics is None:
+                callback_metrics = topic_metrics.callbacks.setdefault(callback_name, _CallbackMetrics())
+            callback_metrics.record(elapsed_ns)
+
+            if elapsed_ns > self._slow_callback_budget_ns:
+                callback_metrics.slow_calls += 1
+                now = time.monotonic()
+                if now - callback_metrics.last_warning >= self._slow_warning_interval_s:
+                    callback_metrics.last_warning = now
+                    logger.warning(
+                        f"Callback lent : '{callback_name}' a pris {elapsed_ns / 1_000_000:.2f} ms pour l'événement "
+                        f"'{event_name}' (budget : {self._slow_callback_budget_ns / 1_000_000:.2f} ms, "
+                        f"{callback_metrics.slow_calls} dépassements au total)."
                     )
 
+    def get_metrics(self) -> Dict[str, Dict[str, Any]]:
+        """Retourne un instantané des métriques par sujet et par callback."""
+        return {
+            event_name: {
+                'publish_count': topic_metrics.publish_count,
+                'callbacks': {
+                    callback_name: callback_metrics.snapshot()
+                    for callback_name, callback_metrics in list(topic_metrics.callbacks.items())
+                },
+            }
+            for event_name, topic_metrics in list(self._metrics.items())
+        }
+
+    def reset_metrics(self):
+        """Remet à zéro toutes les métriques collectées."""
+        self._metrics = {}
+
+    # --- Mode de distribution asynchrone ---
+
+    def configure_async(self, event_name: str, maxsize: int = 256, policy: str = POLICY_BLOCK):
+        """
+        Bascule un sujet en mode asynchrone : publish() met l'événement dans une file bornée
+        vidée par le thread de distribution, selon la politique de contre-pression choisie.
+        """
+        if policy not in ASYNC_POLICIES:
+            raise ValueError(f"Politique de contre-pression inconnue : '{policy}'")
+        with self._async_condition:
+            self._async_topics[event_name] = _AsyncTopic(max(1, int(maxsize)), policy)
+            if self._dispatcher_thread is None:
+                self._stopping = False
+                self._dispatcher_thread = threading.Thread(
+                    target=self._dispatch_loop, name="EventDispatcher", daemon=True
+                )
+                self._dispatcher_thread.start()
+        logger.info(f"Événement '{event_name}' distribué en mode asynchrone (taille max : {maxsize}, politique : {policy}).")
+
+    def _enqueue(self, event_name: str, topic: _AsyncTopic, args: tuple, kwargs: dict):
+        """
+        Ajoute un événement à la file de son sujet en appliquant la politique de contre-pression.
+        Si l'arrêt a été demandé entre-temps (publieur réveillé par shutdown(), par exemple),
+        le thread de distribution a pu terminer : l'événement est alors distribué sur le thread courant.
+        """
+        with self._async_condition:
+            if len(topic.queue) >= topic.maxsize and not self._stopping:
+                if topic.policy == POLICY_BLOCK:
+                    while len(topic.queue) >= topic.maxsize and not self._stopping:
+                        self._async_condition.wait()
+                elif topic.policy == POLICY_DROP_OLDEST:
+                    topic.queue.popleft()
+                    topic.dropped += 1
+                elif topic.policy == POLICY_COALESCE:
+                    topic.queue[-1] = (args, kwargs)
+                    topic.coalesced += 1
+                    return
+
+            if not self._stopping:
+                topic.queue.append((args, kwargs))
+                topic.enqueued += 1
+                if len(topic.queue) > topic.max_depth:
+                    topic.max_depth = len(topic.queue)
+                self._ready_topics.append(event_name)
+                self._async_condition.notify_all()
+                return
+        self._dispatch(event_name, args, kwargs)
+
+    def _dispatch_loop(self):
+        """Boucle du thread de distribution : vide les files dans l'ordre de publication."""
+        logger.info("Le thread de distribution des événements démarre.")
+        while True:
+            with self._async_condition:
+                while not self._ready_topics and not self._stopping:
+                    self._async_condition.wait()
+                if not self._ready_topics:
+                    break
+                event_name = self._ready_topics.popleft()
+                topic = self._async_topics[event_name]
+                # La file peut être vide si son plus ancien événement a été abandonné (drop_oldest)
+                if not topic.queue:
+                    continue
+                args, kwargs = topic.queue.popleft()
+                topic.dispatched += 1
+                # Réveille les publieurs bloqués par une file pleine
+                self._async_condition.notify_all()
+            self._dispatch(event_name, args, kwargs)
+        logger.info("Le thread de distribution des événements s'est arrêté proprement.")
+
+    def get_queue_stats(self) -> Dict[str, Dict[str, Any]]:
+        """Retourne, pour chaque sujet asynchrone, la profondeur de file et les compteurs."""
+        with self._async_condition:
+            return {
+                event_name: {
+                    'policy': topic.policy,
+                    'maxsize': topic.maxsize,
+                    'depth': len(topic.queue),
+                    'max_depth': topic.max_depth,
+                    'enqueued': topic.enqueued,
+                    'dispatched': topic.dispatched,
+                    'dropped': topic.dropped,
+                    'coalesced': topic.coalesced,
+                }
+                for event_name, topic in self._async_topics.items()
+            }
+
+    def shutdown(self, timeout: Optional[float] = 5.0):
+        """
+        Arrête le thread de distribution après avoir vidé les files.
+        Les publications ultérieures sont distribuées de manière synchrone.
+        """
+        thread = self._dispatcher_thread
+        if thread is None:
+            return
+        logger.info("Demande d'arrêt du thread de distribution des événements.")
+        with self._async_condition:
+            self._stopping = True
+            self._async_condition.notify_all()
+        thread.join(timeout)
+        self._dispatcher_thread = None
+        logger.info(f"Statistiques des files asynchrones : {self.get_queue_stats()}")
+
 # Instance unique du gestionnaire d'événements pour toute l'application
 event_manager = EventManager()
\ No newline at end of file
@@ -76,9 +76,16 @@ class RecordsTab(ttk.Frame):
         # Recharger les données pour refléter les changements de langue dans les valeurs
         self.load_records_data()
 
+    def update_display(self):
+        """
+        Rafraîchit les valeurs des records (appelée chaque seconde quand l'onglet est actif).
+        Les records proviennent du cache en mémoire du StatsManager : aucune requête en BDD.
+        """
+        self.load_records_data()
+
     def load_records_data(self):
         """Charge les données des records et met à jour les labels de valeur."""
-        logger.info("Chargement des données des records.")
+        logger.debug("Chargement des données des records.")
         try:
             dist_record = self.stats_manager.get_record_day_for_distance()
             activity_record = self.stats_manager.get_record_day_for_activity()
@@ -88,7 +95,7 @@ class RecordsTab(ttk.Frame):
             
             self.record_distance_label_value.config(text=dist_text)
             self.record_activity_label_value.config(text=activity_text)
-            logger.info("Données des records chargées et affichées.")
+            logger.debug("Données des records chargées et affichées.")
             
         except Exception as e:
             logger.error(f"Erreur lors du chargement des records: {e}", exc_info=True)
@@ -4,6 +4,7 @@ import threading
 import time
 import datetime
 import logging
+from typing import Optional
 
 from core.event_manager import event_manager
 from core.service_locator import service_locator
@@ -30,6 +31,7 @@ class ActivityTracker(threading.Thread):
 
         # Le tracker s'abonne lui-même aux événements de la souris pour savoir quand l'utilisateur est actif
         self.event_manager.subscribe('mouse_moved', self._update_last_activity_time)
+        self.event_manager.subscribe('mouse_moved_batch', self._update_last_activity_time)
         self.event_manager.subscribe('mouse_clicked', self._update_last_activity_time)
         logger.info("ActivityTracker initialisé et abonné aux événements de la souris.")
 
@@ -69,7 +71,14 @@ class ActivityTracker(threading.Thread):
             
         logger.info("Le thread du ActivityTracker s'est arrêté proprement.")
 
-    def stop(self):
-        """Signale au thread de s'arrêter."""
+    def stop(self, timeout: Optional[float] = 5.0):
+        """
+        Signale au thread de s'arrêter et attend (au plus `timeout` secondes) la fin du tick
+        en cours : aucun 'activity_tick' n'est publié après le retour.
+        """
         logger.info("Demande d'arrêt du ActivityTracker.")
-        self._stop_event.set()
\ No newline at end of file
+        self._stop_event.set()
+        if self.is_alive() and threading.current_thread() is not self:
+            self.join(timeout)
+            if self.is_alive():
+                logger.warning(f"Le thread du ActivityTracker ne s'est pas arrêté en {timeout} s.")
\ No newline at end of file
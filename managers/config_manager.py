@@ -1,13 +1,24 @@
 # managers/config_manager.py
 
 import logging
+from dataclasses import dataclass
 from typing import Any, Optional
 
 import config.app_config as app_config
+from core.event_manager import event_manager
 from managers.preference_manager import PreferenceManager
 
 logger = logging.getLogger(__name__)
 
+@dataclass(frozen=True, slots=True)
+class HotPathPreferences:
+    """
+    Instantané immuable et typé des préférences lues à chaque événement souris.
+    Il est remplacé d'un bloc (jamais modifié) lorsqu'un setter concerné est appelé.
+    """
+    track_mouse_distance: bool
+    track_mouse_clicks: bool
+
 class ConfigManager:
     """
     Manager Singleton agissant comme source de vérité unique pour toute la configuration.
@@ -34,6 +45,7 @@ class ConfigManager:
             logger.debug(f"Configuration statique chargée : {list(self._static_config.keys())}")
 
             self._pref_manager = PreferenceManager()
+            self.hot_preferences = self._build_hot_preferences()
             
             self._initialized = True
             logger.info("ConfigManager initialisé.")
@@ -44,6 +56,21 @@ class ConfigManager:
         """Récupère une valeur depuis la configuration statique de l'application."""
         return self._static_config.get(key, default)
 
+    # --- Instantané des préférences du chemin critique ---
+
+    def _build_hot_preferences(self) -> HotPathPreferences:
+        """Construit un nouvel instantané depuis PreferenceManager (seul endroit où configparser est lu)."""
+        return HotPathPreferences(
+            track_mouse_distance=self._pref_manager.get_track_mouse_distance(),
+            track_mouse_clicks=self._pref_manager.get_track_mouse_clicks(),
+        )
+
+    def _refresh_hot_preferences(self):
+        """Remplace atomiquement l'instantané et annonce le changement via 'preferences_changed'."""
+        self.hot_preferences = self._build_hot_preferences()
+        logger.debug(f"Préférences du chemin critique mises à jour : {self.hot_preferences}")
+        event_manager.publish('preferences_changed', preferences=self.hot_preferences)
+
     # --- Façade complète pour les méthodes de PreferenceManager ---
 
     def save_preferences(self):
@@ -71,10 +98,14 @@ class ConfigManager:
     def set_show_first_launch_dialog(self, show: bool): self._pref_manager.set_show_first_launch_dialog(show)
 
     def get_track_mouse_distance(self) -> bool: return self._pref_manager.get_track_mouse_distance()
-    def set_track_mouse_distance(self, track: bool): self._pref_manager.set_track_mouse_distance(track)
+    def set_track_mouse_distance(self, track: bool):
+        self._pref_manager.set_track_mouse_distance(track)
+        self._refresh_hot_preferences()
 
     def get_track_mouse_clicks(self) -> bool: return self._pref_manager.get_track_mouse_clicks()
-    def set_track_mouse_clicks(self, track: bool): self._pref_manager.set_track_mouse_clicks(track)
+    def set_track_mouse_clicks(self, track: bool):
+        self._pref_manager.set_track_mouse_clicks(track)
+        self._refresh_hot_preferences()
 
     # --- Méthodes "Screen" ---
     def get_physical_width_cm(self) -> float: return self._pref_manager.get_physical_width_cm()
@@ -89,4 +120,25 @@ class ConfigManager:
 
     # --- Méthodes "Features" ---
     def get_show_tab(self, tab_id: str) -> bool: return self._pref_manager.get_show_tab(tab_id)
-    def set_show_tab(self, tab_id: str, value: bool): self._pref_manager.set_show_tab(tab_id, value)
\ No newline at end of file
+    def set_show_tab(self, tab_id: str, value: bool): self._pref_manager.set_show_tab(tab_id, value)
+
+
+if __name__ == '__main__':
+    # Micro-benchmark : coût par événement de la lecture du drapeau de suivi,
+    # avant (configparser.getboolean) et après (attribut d'un instantané).
+    import configparser
+    import timeit
+
+    parser = configparser.ConfigParser()
+    parser['General'] = {'track_mouse_distance': 'True', 'track_mouse_clicks': 'True'}
+    snapshot = HotPathPreferences(track_mouse_distance=True, track_mouse_clicks=True)
+
+    iterations = 1_000_000
+    before = min(timeit.repeat(
+        lambda: parser.getboolean('General', 'track_mouse_distance', fallback=True),
+        number=iterations, repeat=5))
+    after = min(timeit.repeat(lambda: snapshot.track_mouse_distance, number=iterations, repeat=5))
+
+    print(f"Avant (configparser) : {before / iterations * 1e9:8.1f} ns/événement")
+    print(f"Après (instantané)   : {after / iterations * 1e9:8.1f} ns/événement")
+    print(f"Gain                 : x{before / after:.1f}")
@@ -0,0 +1,47 @@
+# managers/flush_scheduler.py
+
+import threading
+import logging
+from typing import Optional
+
+from core.event_manager import event_manager
+from core.service_locator import service_locator
+
+logger = logging.getLogger(__name__)
+
+class FlushScheduler(threading.Thread):
+    """
+    Thread dédié au rythme d'écriture différée (write-behind).
+    Il publie périodiquement l'événement 'flush_requested' ; chaque manager abonné
+    persiste alors ses données en mémoire si elles ont changé depuis la dernière écriture.
+    """
+    def __init__(self):
+        super().__init__(daemon=True, name="FlushScheduler")
+
+        # Dépendances
+        self.event_manager = event_manager
+        self.config_manager = service_locator.get_service("config_manager")
+
+        # État interne
+        self._stop_event = threading.Event()
+        self.flush_interval = self.config_manager.get_app_config('STATS_FLUSH_INTERVAL_SECONDS', 60)
+        logger.info(f"FlushScheduler initialisé (intervalle : {self.flush_interval} s).")
+
+    def run(self):
+        """Boucle principale du thread : publie 'flush_requested' à chaque intervalle."""
+        logger.info("Le thread du FlushScheduler démarre.")
+        while not self._stop_event.wait(self.flush_interval):
+            self.event_manager.publish('flush_requested', reason='interval')
+        logger.info("Le thread du FlushScheduler s'est arrêté proprement.")
+
+    def stop(self, timeout: Optional[float] = 5.0):
+        """
+        Signale au thread de s'arrêter et attend (au plus `timeout` secondes) la fin du cycle
+        d'écriture en cours. La sauvegarde finale est faite par chaque manager à sa fermeture.
+        """
+        logger.info("Demande d'arrêt du FlushScheduler.")
+        self._stop_event.set()
+        if self.is_alive() and threading.current_thread() is not self:
+            self.join(timeout)
+            if self.is_alive():
+                logger.warning(f"Le thread du FlushScheduler ne s'est pas arrêté en {timeout} s.")
@@ -1,9 +1,12 @@
 # managers/input_manager.py
 
+import time
+import threading
 import logging
 from pynput.mouse import Listener, Button
 from core.event_manager import event_manager
 from core.service_locator import service_locator
+from managers.input_pipeline import MoveRingBuffer, MoveDecimator
 
 logger = logging.getLogger(__name__)
 
@@ -11,6 +14,7 @@ class InputManager:
     """
     Manages global mouse input events (movements and clicks) using pynput.
     It publishes these events using the EventManager.
+    In batch mode, movements are buffered and published as 'mouse_moved_batch' events.
     """
     def __init__(self):
         self.mouse_listener = None
@@ -19,17 +23,54 @@ class InputManager:
         self.event_manager = event_manager
         self.config_manager = service_locator.get_service("config_manager")
 
+        # --- Pipeline d'ingestion par lots des mouvements ---
+        self.batch_mode = False
+        self._move_buffer = None
+        self._drain_thread = None
+        self._drain_stop_event = threading.Event()
+        self._decimator = None
+
         if not self.config_manager:
             logger.error("ConfigManager non disponible. InputManager ne sera pas fonctionnel.")
         else:
+            # Instantané des préférences lu par les callbacks, rafraîchi via 'preferences_changed'
+            self._preferences = self.config_manager.hot_preferences
+            self.event_manager.subscribe('preferences_changed', self._on_preferences_changed)
+            self.batch_mode = self.config_manager.get_app_config('MOUSE_BATCH_MODE_ENABLED', False)
+            self._batch_interval = self.config_manager.get_app_config('MOUSE_BATCH_INTERVAL_MS', 50) / 1000.0
+            if self.batch_mode:
+                capacity = self.config_manager.get_app_config('MOUSE_RING_BUFFER_CAPACITY', 4096)
+                self._move_buffer = MoveRingBuffer(capacity)
+            if self.config_manager.get_app_config('RAW_EVENT_LOG_ENABLED', False):
+                # Le journal brut doit recevoir tous les mouvements : pas de décimation en amont
+                if self.config_manager.get_app_config('MOUSE_DECIMATION_ENABLED', False):
+                    logger.info("Journal brut activé : décimation des mouvements désactivée.")
+            elif self.config_manager.get_app_config('MOUSE_DECIMATION_ENABLED', False):
+                self._decimator = MoveDecimator(
+                    merge_window_ms=self.config_manager.get_app_config('MOUSE_DECIMATION_MERGE_WINDOW_MS', 0),
+                    merge_radius_px=self.config_manager.get_app_config('MOUSE_DECIMATION_MERGE_RADIUS_PX', 1)
+                )
             self.is_ready = True
-            logger.info("InputManager initialisé.")
+            logger.info(f"InputManager initialisé (mode lot : {self.batch_mode}).")
+
+    def _on_preferences_changed(self, preferences, **kwargs):
+        """Swaps the cached preference snapshot read by the input callbacks."""
+        self._preferences = preferences
 
     def _on_move(self, x, y):
         """Callback for mouse movement events. Publishes a 'mouse_moved' event."""
         try:
-            if self.is_ready and self.config_manager.get_track_mouse_distance():
-                self.event_manager.publish('mouse_moved', x=x, y=y)
+            if self.is_ready and self._preferences.track_mouse_distance:
+                t = time.time()
+                x = int(x)
+                y = int(y)
+                if self._decimator is not None and not self._decimator.accept(t, x, y):
+                    return
+                if self._move_buffer is not None:
+                    # Mode lot : le thread du listener se contente d'écrire dans le tampon.
+                    self._move_buffer.push(t, x, y)
+                else:
+                    self.event_manager.publish('mouse_moved', x=x, y=y)
         except Exception as e:
             logger.error(
                 "Une erreur est survenue dans un abonné à l'événement 'mouse_moved'", 
@@ -39,7 +80,7 @@ class InputManager:
     def _on_click(self, x, y, button: Button, pressed: bool):
         """Callback for mouse click events. Publishes a 'mouse_clicked' event on press."""
         try:
-            if pressed and self.is_ready and self.config_manager.get_track_mouse_clicks():
+            if pressed and self.is_ready and self._preferences.track_mouse_clicks:
                 button_name = button.name if hasattr(button, 'name') else 'unknown'
                 logger.debug(f"Clic détecté : {button_name}")
                 self.event_manager.publish('mouse_clicked', button=button, x=x, y=y) # Note: ajout de x, y
@@ -49,12 +90,48 @@ class InputManager:
                 exc_info=True
             )
 
+    def get_decimation_stats(self) -> dict:
+        """Returns the decimation counters (suppressed events and distance error bound)."""
+        if self._decimator is None:
+            return {}
+        return self._decimator.get_stats()
+
+    def _publish_pending_moves(self):
+        """Drains the ring buffer and publishes a single 'mouse_moved_batch' event."""
+        batch = self._move_buffer.drain()
+        if batch is None:
+            return
+        ts, xs, ys = batch
+        try:
+            self.event_manager.publish('mouse_moved_batch', ts=ts, xs=xs, ys=ys)
+        except Exception as e:
+            logger.error(
+                "Une erreur est survenue dans un abonné à l'événement 'mouse_moved_batch'",
+                exc_info=True
+            )
+
+    def _drain_loop(self):
+        """Consumer thread loop: publishes buffered movements every batch interval."""
+        logger.info("Le thread de vidage des mouvements démarre.")
+        while not self._drain_stop_event.wait(self._batch_interval):
+            self._publish_pending_moves()
+        # Dernier vidage pour ne perdre aucun mouvement à l'arrêt
+        self._publish_pending_moves()
+        if self._move_buffer.overflow_count:
+            logger.warning(f"{self._move_buffer.overflow_count} mouvements perdus (tampon circulaire plein).")
+        logger.info("Le thread de vidage des mouvements s'est arrêté proprement.")
+
     def start_tracking(self):
         """Starts the pynput mouse listener in a separate thread."""
         if not self.is_ready:
             logger.warning("Démarrage du tracking impossible, InputManager non prêt.")
             return
 
+        if self.batch_mode and (self._drain_thread is None or not self._drain_thread.is_alive()):
+            self._drain_stop_event.clear()
+            self._drain_thread = threading.Thread(target=self._drain_loop, name="MouseMoveDrain", daemon=True)
+            self._drain_thread.start()
+
         if self.mouse_listener is None or not self.mouse_listener.is_alive():
             logger.info("Démarrage de l'écoute des événements souris...")
             self.mouse_listener = Listener(
@@ -69,4 +146,11 @@ class InputManager:
             logger.info("Arrêt de l'écoute des événements souris.")
             self.mouse_listener.stop()
             self.mouse_listener.join()
-            self.mouse_listener = None
\ No newline at end of file
+            self.mouse_listener = None
+            if self._decimator is not None:
+                logger.info(f"Décimation des mouvements : {self._decimator.get_stats()}")
+
+        if self._drain_thread and self._drain_thread.is_alive():
+            self._drain_stop_event.set()
+            self._drain_thread.join()
+            self._drain_thread = None
@@ -0,0 +1,137 @@
+# managers/input_pipeline.py
+
+"""
+Briques du pipeline d'ingestion des mouvements de la souris.
+Le thread du listener pynput ne fait qu'écrire dans un tampon circulaire
+préalloué ; un thread consommateur le vide périodiquement.
+"""
+
+import math
+from array import array
+from typing import Any, Dict, Optional, Tuple
+
+MoveBatch = Tuple[array, array, array]
+
+
+class MoveRingBuffer:
+    """
+    Tampon circulaire préalloué de positions (t, x, y), prévu pour un seul
+    producteur (thread du listener) et un seul consommateur (thread de vidage).
+    Chaque index n'est modifié que par un seul thread : aucun verrou n'est nécessaire.
+    """
+    __slots__ = ('capacity', '_mask', '_ts', '_xs', '_ys', '_write_index', '_read_index', 'overflow_count')
+
+    def __init__(self, capacity: int = 4096):
+        # La capacité est arrondie à la puissance de 2 supérieure pour remplacer le modulo par un masque.
+        capacity = max(2, int(capacity))
+        self.capacity = 1 << (capacity - 1).bit_length()
+        self._mask = self.capacity - 1
+        self._ts = array('d', [0.0]) * self.capacity
+        self._xs = array('i', [0]) * self.capacity
+        self._ys = array('i', [0]) * self.capacity
+        # Index monotones : le nombre d'éléments en attente est leur différence.
+        self._write_index = 0
+        self._read_index = 0
+        self.overflow_count = 0
+
+    def push(self, t: float, x: int, y: int) -> bool:
+        """
+        Ajoute une position. Appelée depuis le thread du listener.
+        Retourne False (et compte un débordement) si le tampon est plein.
+        """
+        w = self._write_index
+        if w - self._read_index > self._mask:
+            self.overflow_count += 1
+            return False
+        i = w & self._mask
+        self._ts[i] = t
+        self._xs[i] = x
+        self._ys[i] = y
+        # La publication de l'index se fait en dernier, une fois les données écrites.
+        self._write_index = w + 1
+        return True
+
+    def drain(self) -> Optional[MoveBatch]:
+        """
+        Récupère toutes les positions en attente sous forme de trois tableaux contigus
+        (ts, xs, ys). Retourne None si le tampon est vide.
+        """
+        r = self._read_index
+        w = self._write_index
+        count = w - r
+        if count <= 0:
+            return None
+
+        start = r & self._mask
+        end = start + count
+        if end <= self.capacity:
+            batch = (self._ts[start:end], self._xs[start:end], self._ys[start:end])
+        else:
+            wrapped_end = end - self.capacity
+            batch = (
+                self._ts[start:] + self._ts[:wrapped_end],
+                self._xs[start:] + self._xs[:wrapped_end],
+                self._ys[start:] + self._ys[:wrapped_end],
+            )
+        self._read_index = w
+        return batch
+
+    def __len__(self) -> int:
+        return self._write_index - self._read_index
+
+
+class MoveDecimator:
+    """
+    Étage de décimation placé avant la publication des mouvements.
+
+    - Les mouvements de longueur nulle (coordonnées identiques) sont toujours supprimés :
+      cette étape est sans perte.
+    - Si une fenêtre de fusion est définie, un point arrivé moins de `merge_window_s` après
+      le dernier point conservé et situé à moins de `merge_radius_px` (distance de Chebyshev)
+      de celui-ci est fusionné dans le segment suivant.
+
+    Borne d'erreur : chaque point fusionné raccourcit le tracé d'au plus 2·√2·r pixels
+    (r = merge_radius_px), par inégalité triangulaire. La distance cumulée ne peut
+    qu'être sous-estimée, jamais surestimée.
+    """
+    __slots__ = ('merge_window_s', 'merge_radius_px', '_last_t', '_last_x', '_last_y',
+                 'received_count', 'duplicate_count', 'merged_count')
+
+    def __init__(self, merge_window_ms: float = 0, merge_radius_px: int = 1):
+        self.merge_window_s = max(0.0, merge_window_ms / 1000.0)
+        self.merge_radius_px = max(0, int(merge_radius_px))
+        self._last_t = float('-inf')
+        self._last_x: Optional[int] = None
+        self._last_y: Optional[int] = None
+        self.received_count = 0
+        self.duplicate_count = 0
+        self.merged_count = 0
+
+    def accept(self, t: float, x: int, y: int) -> bool:
+        """Retourne True si le point doit être transmis, False s'il est supprimé."""
+        self.received_count += 1
+        last_x = self._last_x
+        last_y = self._last_y
+        if x == last_x and y == last_y:
+            self.duplicate_count += 1
+            return False
+        if (t - self._last_t) < self.merge_window_s \
+                and abs(x - last_x) <= self.merge_radius_px and abs(y - last_y) <= self.merge_radius_px:
+            self.merged_count += 1
+            return False
+        self._last_t = t
+        self._last_x = x
+        self._last_y = y
+        return True
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Retourne les compteurs de suppression et la borne d'erreur cumulée sur la distance."""
+        suppressed = self.duplicate_count + self.merged_count
+        return {
+            'received': self.received_count,
+            'duplicates_dropped': self.duplicate_count,
+            'merged': self.merged_count,
+            'suppressed': suppressed,
+            'suppressed_ratio': suppressed / self.received_count if self.received_count else 0.0,
+            'max_distance_error_pixels': self.merged_count * 2 * math.sqrt(2) * self.merge_radius_px,
+        }
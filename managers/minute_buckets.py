@@ -0,0 +1,124 @@
+# managers/minute_buckets.py
+
+"""
+Accumulateur en mémoire des compteurs par minute, alimentant la table 'minute_stats'.
+Une minute est « fermée » dès que l'horloge l'a dépassée : ses compteurs ne bougeront plus
+et peuvent être écrits en lot par le cycle d'écriture différée.
+"""
+
+import datetime
+import threading
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# Format de la clé d'une minute (heure locale), triable lexicographiquement.
+# Les préfixes de longueur 10 et 13 donnent respectivement le jour et l'heure.
+MINUTE_KEY_FORMAT = '%Y-%m-%dT%H:%M'
+
+MinuteRow = Tuple  # (minute, date, *compteurs dans l'ordre des colonnes)
+
+
+def minute_key(epoch_minute: int) -> str:
+    """Convertit un numéro de minute depuis l'époque Unix en clé 'AAAA-MM-JJTHH:MM' (heure locale)."""
+    return datetime.datetime.fromtimestamp(epoch_minute * 60).strftime(MINUTE_KEY_FORMAT)
+
+
+class MinuteBucketAccumulator:
+    """
+    Regroupe les incréments de compteurs par minute.
+
+    Le chemin critique (add) ne prend aucun verrou : une division entière, une lecture dans la
+    table des seaux et une addition dans une liste. La conversion en clé texte n'a lieu qu'au vidage.
+
+    Comme pour MoveRingBuffer, chaque case n'a qu'un seul écrivain : chaque colonne est alimentée
+    par un seul thread (listener pour les clics, vidage des mouvements pour la distance, tracker
+    d'activité pour les temps), et un seau est créé par setdefault, atomique. Le consommateur
+    (drain, snapshot, restore, sérialisés par un verrou qu'add ne prend jamais) ne modifie pas
+    les seaux : il les retire de la table et en copie les valeurs. Un incrément tardif dans un
+    seau déjà retiré est rattrapé au vidage suivant, par différence avec la copie. Les lignes
+    réintégrées après un échec d'écriture sont gardées à part, hors de portée des producteurs.
+    """
+    __slots__ = ('columns', '_column_index', '_buckets', '_carried', '_handed_off', '_lock')
+
+    def __init__(self, columns: Iterable[str]):
+        self.columns: Tuple[str, ...] = tuple(columns)
+        self._column_index: Dict[str, int] = {column: i for i, column in enumerate(self.columns)}
+        # Numéro de minute -> compteurs (dans l'ordre de self.columns), alimentés par add()
+        self._buckets: Dict[int, List[float]] = {}
+        # Compteurs à réécrire au prochain vidage (lignes réintégrées, incréments tardifs) : consommateur seul
+        self._carried: Dict[int, List[float]] = {}
+        # Seaux retirés au dernier vidage et copie de leurs valeurs à cet instant
+        self._handed_off: List[Tuple[int, List[float], List[float]]] = []
+        self._lock = threading.Lock()
+
+    def add(self, column: str, value: float = 1, now: Optional[float] = None):
+        """Ajoute `value` au compteur `column` de la minute courante (ou de l'instant `now`)."""
+        epoch_minute = int((time.time() if now is None else now) // 60)
+        bucket = self._buckets.get(epoch_minute)
+        if bucket is None:
+            bucket = self._buckets.setdefault(epoch_minute, [0] * len(self.columns))
+        bucket[self._column_index[column]] += value
+
+    def drain(self, include_open: bool = False, now: Optional[float] = None) -> List[MinuteRow]:
+        """
+        Retire et retourne les seaux fermés sous forme de lignes prêtes pour executemany.
+        Avec include_open=True, la minute en cours est aussi vidée (fermeture, changement de jour) ;
+        les lignes sont écrites en addition, un vidage partiel reste donc correct.
+        """
+        current_minute = int((time.time() if now is None else now) // 60)
+        with self._lock:
+            pending = self._carried
+            self._carried = {}
+            # Incréments arrivés dans les seaux du vidage précédent après leur copie
+            for epoch_minute, bucket, copied in self._handed_off:
+                late = [value - previous for value, previous in zip(bucket, copied)]
+                if any(late):
+                    self._merge(pending, epoch_minute, late)
+            self._handed_off = []
+            # Copie de la table en une opération : add() peut y ajouter un seau pendant le tri
+            ready = sorted(m for m in self._buckets.copy() if include_open or m < current_minute)
+            for epoch_minute in ready:
+                bucket = self._buckets.pop(epoch_minute)
+                copied = list(bucket)
+                self._handed_off.append((epoch_minute, bucket, copied))
+                self._merge(pending, epoch_minute, copied)
+        return self._to_rows(pending)
+
+    def snapshot(self) -> List[MinuteRow]:
+        """Retourne une copie des seaux non encore vidés (ouverts ou fermés), sans les retirer."""
+        with self._lock:
+            pending = {m: list(values) for m, values in self._carried.items()}
+            for epoch_minute, bucket, copied in self._handed_off:
+                late = [value - previous for value, previous in zip(bucket, copied)]
+                if any(late):
+                    self._merge(pending, epoch_minute, late)
+            for epoch_minute, bucket in self._buckets.copy().items():
+                self._merge(pending, epoch_minute, list(bucket))
+        return self._to_rows(pending)
+
+    def restore(self, rows: List[MinuteRow]):
+        """Réintègre des lignes issues de drain() dont l'écriture a échoué (réécrites au prochain vidage)."""
+        with self._lock:
+            for key, _date, *values in rows:
+                epoch_minute = int(time.mktime(time.strptime(key, MINUTE_KEY_FORMAT)) // 60)
+                self._merge(self._carried, epoch_minute, values)
+
+    def _merge(self, pending: Dict[int, List[float]], epoch_minute: int, values: List[float]):
+        """Ajoute `values` aux compteurs de `epoch_minute` dans `pending` (propre au consommateur)."""
+        target = pending.get(epoch_minute)
+        if target is None:
+            pending[epoch_minute] = list(values)
+        else:
+            for i, value in enumerate(values):
+                target[i] += value
+
+    @staticmethod
+    def _to_rows(pending: Dict[int, List[float]]) -> List[MinuteRow]:
+        rows = []
+        for epoch_minute in sorted(pending):
+            key = minute_key(epoch_minute)
+            rows.append((key, key[:10], *pending[epoch_minute]))
+        return rows
+
+    def __len__(self) -> int:
+        return len(self._buckets.copy().keys() | self._carried.keys())
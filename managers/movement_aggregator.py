@@ -0,0 +1,37 @@
+# managers/movement_aggregator.py
+
+import logging
+from typing import Optional
+
+from core.event_manager import event_manager
+from utils.math_utils import calculate_distance, calculate_path_length
+
+logger = logging.getLogger(__name__)
+
+class MovementAggregator:
+    """
+    Calcule une seule fois la distance parcourue par la souris et la partage
+    avec tous les abonnés via l'événement 'movement_delta'.
+    Il est la seule source de vérité pour la dernière position connue du curseur.
+    """
+    def __init__(self):
+        self.event_manager = event_manager
+        self.last_position: Optional[tuple[int, int]] = None
+
+        self.event_manager.subscribe('mouse_moved', self._on_mouse_moved)
+        self.event_manager.subscribe('mouse_moved_batch', self._on_mouse_moved_batch)
+        logger.info("MovementAggregator initialisé et abonné aux événements de mouvement.")
+
+    def _on_mouse_moved(self, x: int, y: int, **kwargs):
+        """Calcule le segment parcouru depuis la dernière position (mode par événement)."""
+        if self.last_position:
+            distance = calculate_distance(self.last_position, (x, y))
+            if distance > 0:
+                self.event_manager.publish('movement_delta', distance=distance)
+        self.last_position = (x, y)
+
+    def _on_mouse_moved_batch(self, xs, ys, **kwargs):
+        """Calcule la longueur totale d'un lot de positions (mode lot)."""
+        distance, self.last_position = calculate_path_length(xs, ys, self.last_position)
+        if distance > 0:
+            self.event_manager.publish('movement_delta', distance=distance)
@@ -0,0 +1,256 @@
+# managers/raw_event_log.py
+
+"""
+Format du journal brut des événements souris (rejeu, cartes de chaleur, recalculs).
+
+Un fichier segment par heure (UTC), en ajout seul :
+    - en-tête : signature + début de l'heure (secondes Unix) ;
+    - une suite de trames : en-tête de trame (décalage du premier enregistrement en ms,
+      nombre d'enregistrements, taille compressée) suivi de la charge utile zlib.
+
+La charge utile est une suite d'enregistrements de taille fixe (décalage en ms, x, y, bouton).
+Dans une trame, le premier enregistrement est absolu et les suivants sont stockés en écart
+par rapport au précédent : les petites valeurs répétitives se compressent très bien.
+
+Un index creux (.evidx) associe le décalage de la première milliseconde de chaque trame
+à sa position dans le segment, ce qui permet de sauter directement au début d'une plage.
+S'il manque ou qu'il est en retard sur le segment (arrêt brutal), le lecteur parcourt les trames.
+
+Les événements sont écrits dans l'ordre chronologique d'un appel à l'autre (un événement plus
+ancien que le dernier écrit est ramené à son horodatage) : les trames d'un segment sont donc
+ordonnées, ce qui rend valides la recherche dans l'index et l'arrêt à la première trame hors plage.
+Un segment dont l'index n'est pas ordonné est parcouru en entier, sans arrêt anticipé.
+"""
+
+import bisect
+import datetime
+import logging
+import os
+import struct
+import zlib
+from typing import Iterator, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+SEGMENT_SUFFIX = ".evlog"
+INDEX_SUFFIX = ".evidx"
+SEGMENT_MAGIC = b"TMMRAW1\0"
+
+SEGMENT_HEADER = struct.Struct('<8sq')  # signature, début de l'heure (s)
+FRAME_HEADER = struct.Struct('<iII')    # décalage du premier enregistrement (ms), nombre, taille compressée
+RECORD = struct.Struct('<iiiB')         # décalage (ms), x, y, bouton (écarts sauf pour le premier)
+INDEX_ENTRY = struct.Struct('<iQ')      # décalage du premier enregistrement (ms), position de la trame
+
+# Codes de bouton ; 0 désigne un simple mouvement
+BUTTON_MOVE = 0
+BUTTON_CODES = {'left': 1, 'right': 2, 'middle': 3}
+BUTTON_UNKNOWN = 255
+BUTTON_NAMES = {BUTTON_MOVE: 'move', **{code: name for name, code in BUTTON_CODES.items()}, BUTTON_UNKNOWN: 'unknown'}
+
+RawEvent = Tuple[float, int, int, int]  # (horodatage, x, y, code du bouton)
+
+HOUR_SECONDS = 3600
+
+
+def hour_start(timestamp: float) -> int:
+    """Retourne le début (secondes Unix) de l'heure UTC contenant `timestamp`."""
+    return int(timestamp // HOUR_SECONDS) * HOUR_SECONDS
+
+
+def segment_name(hour_start_s: int) -> str:
+    """Nom de base du segment d'une heure, ex. '20261016T14Z'."""
+    return datetime.datetime.fromtimestamp(hour_start_s, tz=datetime.timezone.utc).strftime('%Y%m%dT%HZ')
+
+
+def encode_frame(records: Sequence[Tuple[int, int, int, int]], compression_level: int = 6) -> bytes:
+    """Encode des enregistrements (décalage ms, x, y, bouton) en une trame compressée."""
+    pack = RECORD.pack
+    payload = bytearray()
+    prev_offset = prev_x = prev_y = 0
+    for offset_ms, x, y, button in records:
+        payload += pack(offset_ms - prev_offset, x - prev_x, y - prev_y, button)
+        prev_offset, prev_x, prev_y = offset_ms, x, y
+    compressed = zlib.compress(bytes(payload), compression_level)
+    return FRAME_HEADER.pack(records[0][0], len(records), len(compressed)) + compressed
+
+
+def decode_frame_payload(compressed: bytes) -> Iterator[Tuple[int, int, int, int]]:
+    """Décompresse une trame et reconstitue les valeurs absolues de ses enregistrements."""
+    offset_ms = x = y = 0
+    for d_offset, dx, dy, button in RECORD.iter_unpack(zlib.decompress(compressed)):
+        offset_ms += d_offset
+        x += dx
+        y += dy
+        yield offset_ms, x, y, button
+
+
+class RawSegmentWriter:
+    """
+    Écrit les trames d'un répertoire de segments. Les fichiers sont ouverts en ajout seul,
+    le temps d'une écriture : aucune trame déjà écrite n'est jamais modifiée.
+    """
+    def __init__(self, directory: str, chunk_records: int = 4096, compression_level: int = 6):
+        self.directory = directory
+        self.chunk_records = max(1, int(chunk_records))
+        self.compression_level = compression_level
+        self._last_timestamp: Optional[float] = None
+        os.makedirs(directory, exist_ok=True)
+
+    def write(self, events: Sequence[RawEvent]) -> int:
+        """
+        Écrit des événements triés par horodatage, répartis par heure et par trames
+        de `chunk_records` enregistrements. Retourne le nombre d'octets écrits.
+        Les événements plus anciens que le dernier écrit (arrivés en retard) sont ramenés
+        à son horodatage, afin que les trames restent ordonnées.
+        """
+        last = self._last_timestamp
+        if events and last is not None and events[0][0] < last:
+            late = sum(1 for event in events if event[0] < last)
+            logger.debug(f"{late} événement(s) en retard ramené(s) à l'horodatage {last:.3f}.")
+            events = [(max(t, last), x, y, button) for t, x, y, button in events]
+        if events:
+            self._last_timestamp = events[-1][0]
+
+        written = 0
+        start = 0
+        while start < len(events):
+            hour = hour_start(events[start][0])
+            end = start
+            while end < len(events) and events[end][0] < hour + HOUR_SECONDS:
+                end += 1
+            # Un horodatage qui recule (changement d'heure système) reste dans l'heure courante
+            end = max(end, start + 1)
+            written += self._write_hour(hour, events[start:end])
+            start = end
+        return written
+
+    def _write_hour(self, hour: int, events: Sequence[RawEvent]) -> int:
+        base = os.path.join(self.directory, segment_name(hour))
+        segment_path = base + SEGMENT_SUFFIX
+        written = 0
+        with open(segment_path, 'ab') as segment, open(base + INDEX_SUFFIX, 'ab') as index:
+            if segment.tell() == 0:
+                segment.write(SEGMENT_HEADER.pack(SEGMENT_MAGIC, hour))
+            for chunk_start in range(0, len(events), self.chunk_records):
+                chunk = events[chunk_start:chunk_start + self.chunk_records]
+                records = [(int((t - hour) * 1000), x, y, button) for t, x, y, button in chunk]
+                frame = encode_frame(records, self.compression_level)
+                position = segment.tell()
+                segment.write(frame)
+                # La trame est écrite avant son entrée d'index : l'index n'est jamais en avance
+                segment.flush()
+                index.write(INDEX_ENTRY.pack(records[0][0], position))
+                written += len(frame)
+        return written
+
+
+def _read_index(index_path: str) -> List[Tuple[int, int]]:
+    try:
+        with open(index_path, 'rb') as f:
+            data = f.read()
+    except OSError:
+        return []
+    usable = len(data) - len(data) % INDEX_ENTRY.size
+    return list(INDEX_ENTRY.iter_unpack(data[:usable]))
+
+
+def _iter_segment(segment_path: str, start_offset_ms: int, end_offset_ms: int) -> Iterator[Tuple[int, int, int, int]]:
+    """Parcourt les enregistrements d'un segment dont le décalage est dans [start, end)."""
+    entries = _read_index(segment_path[:-len(SEGMENT_SUFFIX)] + INDEX_SUFFIX)
+    firsts = [first for first, _ in entries]
+    # Sans index ordonné, rien ne garantit que les trames suivantes commencent après la plage
+    frames_ordered = bool(entries) and all(a <= b for a, b in zip(firsts, firsts[1:]))
+    with open(segment_path, 'rb') as f:
+        header = f.read(SEGMENT_HEADER.size)
+        if len(header) < SEGMENT_HEADER.size or SEGMENT_HEADER.unpack(header)[0] != SEGMENT_MAGIC:
+            logger.warning(f"Segment brut invalide ignoré : {segment_path}")
+            return
+
+        # Saut à la dernière trame indexée commençant strictement avant le début de la plage :
+        # la trame précédant une trame qui commence pile au début peut finir sur la même milliseconde
+        position = SEGMENT_HEADER.size
+        if frames_ordered:
+            i = bisect.bisect_left(firsts, start_offset_ms) - 1
+            if i >= 0:
+                position = entries[i][1]
+        f.seek(position)
+
+        while True:
+            frame_header = f.read(FRAME_HEADER.size)
+            if len(frame_header) < FRAME_HEADER.size:
+                return
+            first_offset_ms, _count, compressed_length = FRAME_HEADER.unpack(frame_header)
+            if first_offset_ms >= end_offset_ms:
+                if frames_ordered:
+                    return
+                f.seek(compressed_length, os.SEEK_CUR)  # Trame hors plage : charge utile non lue
+                continue
+            compressed = f.read(compressed_length)
+            if len(compressed) < compressed_length:
+                return  # Trame tronquée (arrêt brutal pendant l'écriture)
+            for record in decode_frame_payload(compressed):
+                if start_offset_ms <= record[0] < end_offset_ms:
+                    yield record
+
+
+def iter_raw_events(directory: str, start: Optional[float] = None, end: Optional[float] = None) -> Iterator[RawEvent]:
+    """
+    Générateur des événements bruts (horodatage, x, y, code du bouton) entre `start` (inclus)
+    et `end` (exclu), en secondes Unix. Seules les trames utiles sont lues et décompressées.
+    """
+    try:
+        names = sorted(name for name in os.listdir(directory) if name.endswith(SEGMENT_SUFFIX))
+    except FileNotFoundError:
+        return
+    first_name = segment_name(hour_start(start)) + SEGMENT_SUFFIX if start is not None else None
+    last_name = segment_name(hour_start(end)) + SEGMENT_SUFFIX if end is not None else None
+
+    for name in names:
+        if (first_name and name < first_name) or (last_name and name > last_name):
+            continue
+        path = os.path.join(directory, name)
+        with open(path, 'rb') as f:
+            header = f.read(SEGMENT_HEADER.size)
+        if len(header) < SEGMENT_HEADER.size:
+            continue
+        hour = SEGMENT_HEADER.unpack(header)[1]
+        start_offset_ms = int((start - hour) * 1000) if start is not None else -2**31
+        end_offset_ms = int((end - hour) * 1000) if end is not None else 2**31 - 1
+        for offset_ms, x, y, button in _iter_segment(path, start_offset_ms, end_offset_ms):
+            yield hour + offset_ms / 1000.0, x, y, button
+
+
+if __name__ == '__main__':
+    import random
+    import tempfile
+    import time
+
+    # Simulation d'une heure de mouvements à ~300 événements/s (≈ 1 million d'événements)
+    rng = random.Random(42)
+    t0 = float(hour_start(time.time()))
+    events = []
+    t, x, y = t0, 960, 540
+    while t < t0 + HOUR_SECONDS - 1:
+        t += rng.expovariate(300)
+        x += rng.randint(-3, 3)
+        y += rng.randint(-3, 3)
+        button = BUTTON_CODES['left'] if rng.random() < 0.0005 else BUTTON_MOVE
+        events.append((t, x, y, button))
+
+    with tempfile.TemporaryDirectory() as directory:
+        writer = RawSegmentWriter(directory)
+        start_time = time.perf_counter()
+        size = writer.write(events)
+        write_s = time.perf_counter() - start_time
+
+        start_time = time.perf_counter()
+        count = sum(1 for _ in iter_raw_events(directory))
+        read_s = time.perf_counter() - start_time
+
+        start_time = time.perf_counter()
+        window = sum(1 for _ in iter_raw_events(directory, t0 + 1800, t0 + 1860))
+        seek_s = time.perf_counter() - start_time
+
+    print(f"{len(events):,} événements -> {size / 1e6:.2f} Mo ({size / len(events):.2f} octets/événement)")
+    print(f"Écriture : {write_s:.2f} s, lecture complète : {read_s:.2f} s ({count:,} événements)")
+    print(f"Lecture d'une minute via l'index : {seek_s * 1000:.1f} ms ({window:,} événements)")
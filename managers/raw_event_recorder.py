@@ -0,0 +1,117 @@
+# managers/raw_event_recorder.py
+
+import bisect
+import threading
+import logging
+import time
+from collections import deque
+
+from core.event_manager import event_manager
+from core.service_locator import service_locator
+from managers.raw_event_log import RawSegmentWriter, iter_raw_events, BUTTON_CODES, BUTTON_MOVE, BUTTON_UNKNOWN
+from utils.paths import get_raw_events_dir
+
+logger = logging.getLogger(__name__)
+
+class RawEventRecorder(threading.Thread):
+    """
+    Enregistreur optionnel des événements bruts (horodatage, x, y, bouton) dans des segments
+    compressés en ajout seul, à côté de stats.db (voir managers/raw_event_log.py).
+
+    Les callbacks d'événements se contentent d'ajouter le lot reçu à une file ; l'encodage,
+    la compression et l'écriture sont faits par ce thread, à intervalle régulier.
+
+    Les mouvements sont ceux publiés par InputManager, qui désactive la décimation lorsque
+    le journal brut est activé (RAW_EVENT_LOG_ENABLED) : aucun mouvement n'est filtré en amont.
+
+    Les clics (thread du listener) et les lots de mouvements (thread de vidage) arrivent
+    avec un léger décalage : les événements de la dernière fenêtre de réordonnancement
+    sont retenus jusqu'au cycle suivant, pour que le journal reste trié d'un cycle à l'autre.
+    """
+    def __init__(self, directory: str = None):
+        super().__init__(daemon=True, name="RawEventRecorder")
+
+        # Dépendances
+        self.event_manager = event_manager
+        self.config_manager = service_locator.get_service("config_manager")
+
+        # État interne
+        self._stop_event = threading.Event()
+        self._pending = deque()
+        # Événements triés, retenus car plus récents que la fenêtre de réordonnancement
+        self._held_back = []
+        self.flush_interval = self.config_manager.get_app_config('RAW_EVENT_LOG_FLUSH_INTERVAL_SECONDS', 5)
+        self.reorder_window = self.config_manager.get_app_config('RAW_EVENT_LOG_REORDER_WINDOW_SECONDS', 1.0)
+        self.writer = RawSegmentWriter(
+            directory or get_raw_events_dir(),
+            chunk_records=self.config_manager.get_app_config('RAW_EVENT_LOG_CHUNK_RECORDS', 4096),
+            compression_level=self.config_manager.get_app_config('RAW_EVENT_LOG_COMPRESSION_LEVEL', 6)
+        )
+        self.recorded_count = 0
+        self.bytes_written = 0
+
+        self.event_manager.subscribe('mouse_moved_batch', self._on_mouse_moved_batch)
+        self.event_manager.subscribe('mouse_moved', self._on_mouse_moved)
+        self.event_manager.subscribe('mouse_clicked', self._on_mouse_clicked)
+        logger.info(f"RawEventRecorder initialisé (dossier : {self.writer.directory}).")
+
+    # --- Callbacks (chemin critique : un simple ajout en file) ---
+
+    def _on_mouse_moved_batch(self, ts, xs, ys, **kwargs):
+        self._pending.append((ts, xs, ys, BUTTON_MOVE))
+
+    def _on_mouse_moved(self, x, y, **kwargs):
+        self._pending.append(((time.time(),), (int(x),), (int(y),), BUTTON_MOVE))
+
+    def _on_mouse_clicked(self, button, x, y, **kwargs):
+        code = BUTTON_CODES.get(getattr(button, 'name', None), BUTTON_UNKNOWN)
+        self._pending.append(((time.time(),), (int(x),), (int(y),), code))
+
+    # --- Thread d'écriture ---
+
+    def _write_pending(self, final: bool = False):
+        """
+        Vide la file, trie les événements par horodatage et écrit en trames compressées ceux
+        qui sont antérieurs à la fenêtre de réordonnancement (tous avec final=True).
+        """
+        events = self._held_back
+        while self._pending:
+            ts, xs, ys, button = self._pending.popleft()
+            events.extend(zip(ts, xs, ys, [button] * len(ts)))
+        # Les clics (thread du listener) et les lots de mouvements (thread de vidage) s'entrelacent
+        events.sort(key=lambda event: event[0])
+        if final:
+            self._held_back = []
+        else:
+            split = bisect.bisect_right([event[0] for event in events], time.time() - self.reorder_window)
+            events, self._held_back = events[:split], events[split:]
+        if not events:
+            return
+        try:
+            self.bytes_written += self.writer.write(events)
+            self.recorded_count += len(events)
+        except OSError as e:
+            logger.error(f"Erreur d'écriture du journal brut ({len(events)} événements perdus) : {e}", exc_info=True)
+
+    def run(self):
+        """Boucle principale du thread : écrit les événements en attente à chaque intervalle."""
+        logger.info("Le thread du RawEventRecorder démarre.")
+        while not self._stop_event.wait(self.flush_interval):
+            self._write_pending()
+        # Dernière écriture pour ne perdre aucun événement à l'arrêt
+        self._write_pending(final=True)
+        logger.info(
+            f"Le thread du RawEventRecorder s'est arrêté proprement "
+            f"({self.recorded_count} événements, {self.bytes_written} octets écrits)."
+        )
+
+    def stop(self):
+        """Signale au thread de s'arrêter et attend la dernière écriture."""
+        logger.info("Demande d'arrêt du RawEventRecorder.")
+        self._stop_event.set()
+        if self.is_alive():
+            self.join()
+
+    def iter_events(self, start: float = None, end: float = None):
+        """Générateur des événements enregistrés entre `start` et `end` (secondes Unix)."""
+        return iter_raw_events(self.writer.directory, start, end)
@@ -0,0 +1,187 @@
+# managers/state_journal.py
+
+import logging
+import mmap
+import os
+import struct
+import zlib
+from typing import Any, Dict, Optional
+
+from core.event_manager import event_manager
+from modules.level.xp_repository import REPLAY_SOURCE
+from .stats_repository import DAILY_STAT_COLUMNS
+
+logger = logging.getLogger(__name__)
+
+JOURNAL_MAGIC = b"TMMJRNL2"
+JOURNAL_HEADER = struct.Struct('<8s')
+# Emplacement : séquence, date ISO, compteurs du jour (ordre de DAILY_STAT_COLUMNS), total de points XP
+# et génération du registre XP à laquelle ce total se rapporte
+SLOT_BODY = struct.Struct('<Q10s6xdqqqqqqq')
+SLOT_CRC = struct.Struct('<I')
+SLOT_SIZE = SLOT_BODY.size + SLOT_CRC.size
+SLOT_COUNT = 2
+JOURNAL_SIZE = JOURNAL_HEADER.size + SLOT_COUNT * SLOT_SIZE
+
+# Clé app_settings : séquence du dernier état du journal dont la BDD est certaine de contenir les valeurs
+JOURNAL_SEQ_SETTING = 'journal_seq'
+
+
+class StateJournal:
+    """
+    Journal d'état en mémoire partagée (mmap) des compteurs non encore persistés :
+    statistiques du jour et total de points XP, accompagnés d'un numéro de séquence.
+
+    Mis à jour sur chaque 'activity_tick' par une simple écriture en mémoire (struct.pack_into),
+    sans appel système : en cas de plantage, le système d'exploitation conserve les pages
+    modifiées ; 'flush_requested' force leur écriture sur disque (msync) contre les coupures.
+
+    Deux emplacements sont écrits en alternance et protégés par un CRC : une écriture
+    interrompue laisse toujours l'emplacement précédent intact.
+
+    Au démarrage, si la séquence du journal est plus récente que celle enregistrée en BDD,
+    ses valeurs sont rejouées dans daily_stats et user_progress. Les compteurs ne faisant
+    que croître, la fusion retient le maximum : un journal en retard ne peut rien effacer.
+    Le total de points n'est rejoué que si le registre XP n'a pas été remplacé depuis
+    (même génération) : un recalcul peut avoir abaissé total_points.
+    """
+    def __init__(self, path: str):
+        self.path = path
+        self.seq = 0
+        self._stats_manager = None
+        self._xp_manager = None
+        self._stats_repository = None
+
+        is_new = not os.path.exists(path) or os.path.getsize(path) != JOURNAL_SIZE
+        with open(path, 'a+b') as f:
+            if is_new:
+                f.truncate(0)
+                f.write(JOURNAL_HEADER.pack(JOURNAL_MAGIC) + b'\0' * (SLOT_COUNT * SLOT_SIZE))
+                f.flush()
+            self._mm = mmap.mmap(f.fileno(), JOURNAL_SIZE)
+
+        if JOURNAL_HEADER.unpack_from(self._mm, 0)[0] != JOURNAL_MAGIC:
+            logger.warning(f"Journal d'état invalide, réinitialisation : {path}")
+            self._mm[:] = JOURNAL_HEADER.pack(JOURNAL_MAGIC) + b'\0' * (SLOT_COUNT * SLOT_SIZE)
+
+        state = self.read_latest()
+        if state is not None:
+            self.seq = state['seq']
+        logger.info(f"Journal d'état ouvert : {path} (séquence {self.seq}).")
+
+    # --- Lecture / écriture des emplacements ---
+
+    def read_latest(self) -> Optional[Dict[str, Any]]:
+        """Retourne l'état valide le plus récent, ou None si le journal est vide."""
+        latest = None
+        for slot in range(SLOT_COUNT):
+            offset = JOURNAL_HEADER.size + slot * SLOT_SIZE
+            body = self._mm[offset:offset + SLOT_BODY.size]
+            (crc,) = SLOT_CRC.unpack_from(self._mm, offset + SLOT_BODY.size)
+            if zlib.crc32(body) != crc:
+                continue
+            seq, date, *values = SLOT_BODY.unpack(body)
+            if seq == 0 or (latest is not None and seq <= latest['seq']):
+                continue
+            latest = {'seq': seq, 'date': date.decode('ascii'), 'total_points': values[-2], 'ledger_generation': values[-1]}
+            latest.update(zip(DAILY_STAT_COLUMNS, values[:-2]))
+        return latest
+
+    def write(self, day_stats: Dict[str, Any], total_points: int, ledger_generation: int):
+        """Écrit un nouvel état dans l'emplacement le plus ancien (aucun appel système)."""
+        seq = self.seq + 1
+        offset = JOURNAL_HEADER.size + (seq % SLOT_COUNT) * SLOT_SIZE
+        body = SLOT_BODY.pack(
+            seq, day_stats['date'].encode('ascii'),
+            float(day_stats['distance_pixels']), *(int(day_stats[column]) for column in DAILY_STAT_COLUMNS[1:]),
+            int(total_points), int(ledger_generation)
+        )
+        self._mm[offset:offset + SLOT_BODY.size] = body
+        SLOT_CRC.pack_into(self._mm, offset + SLOT_BODY.size, zlib.crc32(body))
+        self.seq = seq
+
+    # --- Rejeu au démarrage ---
+
+    def replay(self, stats_repository, xp_repository) -> bool:
+        """
+        Rejoue le dernier état du journal dans la BDD s'il est plus récent que la séquence
+        enregistrée. Doit être appelée avant la construction de StatsManager et XPManager.
+        Retourne True si un rejeu a eu lieu.
+        """
+        state = self.read_latest()
+        if state is None:
+            return False
+        persisted_seq = int(stats_repository.get_app_setting(JOURNAL_SEQ_SETTING) or 0)
+        if state['seq'] <= persisted_seq:
+            logger.debug(f"Journal d'état à jour (séquence {state['seq']}), aucun rejeu.")
+            return False
+
+        logger.warning(
+            f"Arrêt non propre détecté : rejeu du journal d'état (séquence {state['seq']} > {persisted_seq}) "
+            f"pour le {state['date']}."
+        )
+        stats_repository.create_daily_stats_entry(state['date']).result()
+        db_stats = stats_repository.get_daily_stats(state['date']) or {}
+        merged = {column: max(db_stats.get(column) or 0, state[column]) for column in DAILY_STAT_COLUMNS}
+        merged['date'] = state['date']
+        stats_repository.update_daily_stats(merged).result()
+
+        db_points = xp_repository.get_total_points()
+        db_generation = xp_repository.get_ledger_generation()
+        if state['ledger_generation'] != db_generation:
+            # Registre remplacé depuis cet état : son total, calculé avec d'autres taux, n'est pas comparable
+            logger.info(
+                f"Points XP du journal ignorés : registre recalculé depuis "
+                f"(génération {state['ledger_generation']} -> {db_generation})."
+            )
+        elif state['total_points'] > db_points:
+            # Passe par le registre pour que total_points reste égal à la somme de xp_ledger
+            xp_repository.add_ledger_points(state['date'], {REPLAY_SOURCE: state['total_points'] - db_points}).result()
+            logger.info(f"Points XP restaurés depuis le journal : {db_points} -> {state['total_points']}.")
+
+        stats_repository.set_app_setting(JOURNAL_SEQ_SETTING, str(state['seq'])).result()
+        return True
+
+    # --- Mise à jour en fonctionnement ---
+
+    def attach(self, stats_manager, xp_manager):
+        """
+        Branche le journal sur les compteurs en mémoire des managers. À appeler une fois
+        StatsManager et XPManager abonnés : le journal doit être le dernier abonné d''activity_tick'.
+        """
+        self._stats_manager = stats_manager
+        self._xp_manager = xp_manager
+        self._stats_repository = stats_manager.stats_repository
+        event_manager.subscribe('activity_tick', self._on_activity_tick)
+        event_manager.subscribe('flush_requested', self._on_flush_requested)
+
+    def _on_activity_tick(self, **kwargs):
+        # Abonné après StatsManager et XPManager : statistiques et XP de cette seconde sont déjà comptés
+        self._write_current_state()
+
+    def _write_current_state(self):
+        """
+        Écrit l'état courant des managers. La génération est lue avant le total : un recalcul
+        concurrent donne au pire un état de l'ancienne génération, dont l'XP ne sera pas rejouée.
+        """
+        generation = self._xp_manager.ledger_generation
+        self.write(self._stats_manager.get_todays_stats(), self._xp_manager.total_points, generation)
+
+    def _on_flush_requested(self, **kwargs):
+        """Force l'écriture des pages du journal sur disque (hors chemin critique)."""
+        self._mm.flush()
+
+    def close(self):
+        """
+        Fermeture propre, après les sauvegardes finales des managers : l'état courant est
+        marqué comme persisté en BDD, il ne sera donc pas rejoué au prochain démarrage.
+        Les abonnements sont retirés avant la fermeture du mmap.
+        """
+        event_manager.unsubscribe('activity_tick', self._on_activity_tick)
+        event_manager.unsubscribe('flush_requested', self._on_flush_requested)
+        if self._stats_manager is not None:
+            self._write_current_state()
+            self._stats_repository.set_app_setting(JOURNAL_SEQ_SETTING, str(self.seq)).result()
+        self._mm.flush()
+        self._mm.close()
+        logger.info(f"Journal d'état fermé (séquence {self.seq}).")
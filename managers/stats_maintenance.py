@@ -0,0 +1,119 @@
+# managers/stats_maintenance.py
+
+"""
+Commandes de maintenance de la base de statistiques (stats.db).
+
+Usage :
+    python -m managers.stats_maintenance check-totals [--repair]
+    python -m managers.stats_maintenance check-rollups [--repair]
+    python -m managers.stats_maintenance check-xp [--repair]
+    python -m managers.stats_maintenance rollup-minutes AAAA-MM-JJ [AAAA-MM-JJ ...]
+"""
+
+import argparse
+import sys
+
+import config.app_config as app_config
+from core.database import Database
+from managers.stats_repository import StatsRepository
+from modules.level.xp_repository import XPRepository
+
+def _check_totals(repository: StatsRepository, repair: bool) -> int:
+    """Vérifie la table 'totals' par rapport à daily_stats ; la reconstruit si demandé."""
+    mismatches = repository.check_totals()
+    if not mismatches:
+        print("Totaux cohérents avec daily_stats.")
+        return 0
+
+    print("Incohérences détectées dans la table 'totals' :")
+    for column, values in mismatches.items():
+        print(f"  {column}: stocké={values['stored']} attendu={values['expected']}")
+
+    if repair:
+        repository.rebuild_totals()
+        print("Table 'totals' reconstruite depuis daily_stats.")
+        return 0
+    return 1
+
+def _check_rollups(repository: StatsRepository, repair: bool) -> int:
+    """Vérifie les tables de cumuls calendaires par rapport à daily_stats ; les reconstruit si demandé."""
+    mismatches = repository.check_rollups()
+    if not mismatches:
+        print("Cumuls hebdomadaires, mensuels et annuels cohérents avec daily_stats.")
+        return 0
+
+    print("Incohérences détectées dans les tables de cumuls :")
+    for table, periods in mismatches.items():
+        for period, columns in sorted(periods.items()):
+            for column, values in columns.items():
+                print(f"  {table}[{period}] {column}: stocké={values['stored']} attendu={values['expected']}")
+
+    if repair:
+        repository.rebuild_rollups()
+        print("Tables de cumuls reconstruites depuis daily_stats.")
+        return 0
+    return 1
+
+def _check_xp(repository: XPRepository, repair: bool) -> int:
+    """Vérifie total_points par rapport au registre xp_ledger ; le recalcule si demandé."""
+    mismatch = repository.check_total_points()
+    if not mismatch:
+        print("total_points cohérent avec xp_ledger.")
+        for source, points in sorted(repository.get_points_by_source().items()):
+            print(f"  {source}: {points}")
+        return 0
+
+    print(f"Incohérence : total_points stocké={mismatch['stored']} attendu={mismatch['expected']}")
+    if repair:
+        print(f"total_points recalculé depuis xp_ledger : {repository.rebuild_total_points()}.")
+        return 0
+    return 1
+
+def _rollup_minutes(repository: StatsRepository, dates) -> int:
+    """Reconstitue les lignes daily_stats des jours demandés à partir de minute_stats."""
+    status = 0
+    for date_iso in dates:
+        totals = repository.rollup_minute_stats_into_daily(date_iso)
+        if totals is None:
+            print(f"{date_iso} : aucune donnée dans minute_stats, ligne inchangée.")
+            status = 1
+        else:
+            print(f"{date_iso} : daily_stats reconstitué ({totals}).")
+    return status
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m managers.stats_maintenance", description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    totals_parser = subparsers.add_parser("check-totals", help="Vérifie (et répare) les totaux globaux.")
+    totals_parser.add_argument("--repair", action="store_true", help="Reconstruit les totaux en cas d'incohérence.")
+
+    rollups_parser = subparsers.add_parser("check-rollups", help="Vérifie (et répare) les cumuls par semaine/mois/année.")
+    rollups_parser.add_argument("--repair", action="store_true", help="Reconstruit les cumuls en cas d'incohérence.")
+
+    xp_parser = subparsers.add_parser("check-xp", help="Vérifie (et répare) le total de points par rapport au registre XP.")
+    xp_parser.add_argument("--repair", action="store_true", help="Recalcule total_points en cas d'incohérence.")
+
+    rollup_parser = subparsers.add_parser("rollup-minutes", help="Reconstitue daily_stats depuis minute_stats.")
+    rollup_parser.add_argument("dates", nargs="+", help="Jours à reconstituer (AAAA-MM-JJ), de préférence révolus.")
+
+    args = parser.parse_args(argv)
+
+    database = Database(pragmas=app_config.DB_PRAGMAS)
+    try:
+        repository = StatsRepository(database)
+        if args.command == "check-totals":
+            return _check_totals(repository, args.repair)
+        if args.command == "check-rollups":
+            return _check_rollups(repository, args.repair)
+        if args.command == "check-xp":
+            return _check_xp(XPRepository(database), args.repair)
+        if args.command == "rollup-minutes":
+            return _rollup_minutes(repository, args.dates)
+    finally:
+        database.close()
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,43 +1,77 @@
 # managers/stats_manager.py
 
+import bisect
 import datetime
 import logging 
+import threading
 from pynput.mouse import Button
 from typing import Optional, List, Dict, Any 
 
-from utils.math_utils import calculate_distance
 from core.service_locator import service_locator
 from core.event_manager import event_manager
-from .stats_repository import StatsRepository
+from .stats_repository import StatsRepository, StatsSeries, DAILY_STAT_COLUMNS, TIME_SERIES_RESOLUTIONS, calendar_period
+from .minute_buckets import MinuteBucketAccumulator
 
 logger = logging.getLogger(__name__)
 
+# Nombre de tentatives d'une lecture avant d'accepter un résultat chevauchant un cycle d'écriture
+READ_CONSISTENCY_ATTEMPTS = 3
+
 class StatsManager:
     """
     Gère la logique de suivi des statistiques en temps réel (clics, distance, activité).
     Délègue la persistance et la lecture des données à StatsRepository.
+    Les écritures sont différées (write-behind) : les compteurs du jour vivent en mémoire et
+    sont persistés sur 'flush_requested', au changement de jour et à la fermeture.
+    Les lectures fusionnent les lignes persistées avec les deltas non encore écrits.
+    Chaque incrément alimente aussi un seau par minute (table 'minute_stats') ; les minutes
+    fermées sont écrites en lot avec la ligne du jour, dans la même transaction.
+
+    Verrous : _write_lock sérialise les cycles d'écriture et reste détenu pendant l'attente du
+    thread d'écriture ; _flush_lock ne protège que de courtes copies en mémoire. Les lectures
+    ne prennent que _flush_lock et n'attendent donc jamais l'écrivain (voir _read_with_pending).
     """
 
     def __init__(self):
         logger.info("Initialisation de StatsManager...")
 
-        self.stats_repository = StatsRepository()
+        self.database = service_locator.get_service("database")
+        self.stats_repository = StatsRepository(self.database)
         service_locator.register_service("stats_repository", self.stats_repository)
 
         self.config_manager = service_locator.get_service("config_manager")
 
         # --- AJOUT : Abonnement aux événements ---
         self.event_manager = event_manager
-        self.event_manager.subscribe('mouse_moved', self._on_mouse_moved)
+        self.event_manager.subscribe('movement_delta', self._on_movement_delta)
         self.event_manager.subscribe('mouse_clicked', self._on_mouse_clicked)
         self.event_manager.subscribe('activity_tick', self._on_activity_tick)
         self.event_manager.subscribe('day_changed', self._on_day_changed)
+        self.event_manager.subscribe('flush_requested', self._on_flush_requested)
         # -----------------------------------------
         
         self.today = datetime.date.today().isoformat()
-        self.last_mouse_position: Optional[tuple[int, int]] = None
+        self._flush_lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        # Génération des cycles d'écriture : impaire tant qu'une écriture est en cours
+        self._flush_generation = 0
                         
         self._current_day_stats_in_memory: dict = self._get_or_create_todays_entry()
+        # Dernier état du jour effectivement écrit en BDD (référence pour le calcul des deltas)
+        self._persisted_today: dict = dict(self._current_day_stats_in_memory)
+        # Jours précédents dont l'écriture au changement de jour a échoué : (instantané, référence),
+        # réessayés au cycle d'écriture suivant. Protégé par _write_lock.
+        self._unsaved_previous_days: List[Tuple[dict, dict]] = []
+        # Compteurs par minute en attente d'écriture dans 'minute_stats'
+        self._minute_buckets = MinuteBucketAccumulator(DAILY_STAT_COLUMNS)
+
+        # Cache des records des jours précédents (hors jour courant), chargé une seule fois.
+        # Les seuils à battre sont comparés aux compteurs du jour au fil de leur progression.
+        self._previous_records: Dict[str, Optional[Dict[str, Any]]] = {
+            'distance_pixels': self.stats_repository.get_record_day_for_distance(exclude_date=self.today),
+            'active_time_seconds': self.stats_repository.get_record_day_for_activity(exclude_date=self.today),
+        }
+        self._reset_record_thresholds()
         self._initialize_app_settings() 
         
         logger.info("StatsManager initialisé et tracker d'activité démarré.")
@@ -56,23 +90,27 @@ class StatsManager:
         else:
             logger.debug("'first_launch_date' déjà présente dans la BDD.")
 
-    def _get_or_create_todays_entry(self) -> dict:
+    def _get_or_create_todays_entry(self, date_iso: Optional[str] = None) -> dict:
         """
-        Récupère ou crée les stats du jour via le repository.
+        Récupère ou crée les stats du jour (par défaut self.today) via le repository.
         """
-        todays_stats = self.stats_repository.get_daily_stats(self.today)
+        date_iso = date_iso or self.today
+        todays_stats = self.stats_repository.get_daily_stats(date_iso)
         if todays_stats is None:
-            logger.info(f"Aucune entrée pour {self.today}, création via le repository.")
-            self.stats_repository.create_daily_stats_entry(self.today)
-            todays_stats = self.stats_repository.get_daily_stats(self.today)
+            logger.info(f"Aucune entrée pour {date_iso}, création via le repository.")
+            self.stats_repository.create_daily_stats_entry(date_iso).result()
+            todays_stats = self.stats_repository.get_daily_stats(date_iso)
         
-        return todays_stats if todays_stats else self._get_initial_daily_stats_structure()
+        return todays_stats if todays_stats else self._get_initial_daily_stats_structure(date_iso)
     
     def _on_mouse_clicked(self, button: Button, **kwargs):
         """Incrémente un clic en mémoire."""
-        if button == Button.left: self._current_day_stats_in_memory['left_clicks'] += 1
-        elif button == Button.right: self._current_day_stats_in_memory['right_clicks'] += 1
-        elif button == Button.middle: self._current_day_stats_in_memory['middle_clicks'] += 1
+        if button == Button.left: column = 'left_clicks'
+        elif button == Button.right: column = 'right_clicks'
+        elif button == Button.middle: column = 'middle_clicks'
+        else: return
+        self._current_day_stats_in_memory[column] += 1
+        self._minute_buckets.add(column)
         
     def _on_activity_tick(self, status: str):
         """
@@ -81,54 +119,144 @@ class StatsManager:
         """
         if status == 'active':
             self._current_day_stats_in_memory['active_time_seconds'] += 1
+            self._minute_buckets.add('active_time_seconds')
+            if self._current_day_stats_in_memory['active_time_seconds'] > self._activity_record_to_beat:
+                self._on_record_broken('active_time_seconds')
         elif status == 'inactive':
             self._current_day_stats_in_memory['inactive_time_seconds'] += 1
+            self._minute_buckets.add('inactive_time_seconds')
 
     def _on_day_changed(self, old_date: str, new_date: str):
         """
         Gère le changement de jour détecté par l'ActivityTracker.
-        Sauvegarde les stats de la veille et réinitialise pour le nouveau jour.
+        Tout le basculement a lieu sous _write_lock : aucun cycle d'écriture ne peut calculer
+        de deltas entre le compteur de la veille et la référence du nouveau jour. Les compteurs
+        du nouveau jour sont installés (sous _flush_lock) avant l'instantané de la veille, de sorte
+        que les incréments concurrents vont au nouveau jour au lieu d'être perdus.
+
+        Si l'écriture de la veille échoue, son instantané et sa référence sont conservés et
+        réessayés au cycle d'écriture suivant ; le cache des records est mis à jour dans tous les cas.
         """
         logger.info(f"Événement 'day_changed' reçu. Sauvegarde pour {old_date} et réinitialisation pour {new_date}.")
-        self.save_changes() 
-        self.today = new_date
-        self._current_day_stats_in_memory = self._get_or_create_todays_entry()
-
-    def _on_mouse_moved(self, x: int, y: int, **kwargs):
-        """Met à jour la distance en mémoire en utilisant l'outil de calcul."""
-        # --- MODIFIÉ : Remplacement du calcul manuel par l'appel à l'outil ---
-        if self.last_mouse_position:
-            # On passe les deux points (l'ancien et le nouveau) à notre fonction utilitaire
-            distance = calculate_distance(self.last_mouse_position, (x, y))
-            self._current_day_stats_in_memory['distance_pixels'] += distance
-        
-        # On met à jour la dernière position connue
-        self.last_mouse_position = (x, y)
+        with self._write_lock:
+            new_day_stats = self._get_or_create_todays_entry(new_date)
+            with self._flush_lock:
+                self.today = new_date
+                previous_day_stats = self._current_day_stats_in_memory
+                previous_persisted = self._persisted_today
+                self._current_day_stats_in_memory = new_day_stats
+                self._persisted_today = dict(new_day_stats)
+                previous_snapshot = dict(previous_day_stats)
+                minute_rows = self._begin_flush_locked(include_open_minute=False)
+            try:
+                self._write_changes(previous_snapshot, previous_persisted, minute_rows, force=False)
+            except Exception:
+                logger.error(f"Échec de l'écriture des statistiques du {old_date} : nouvel essai au prochain cycle.", exc_info=True)
+                self._unsaved_previous_days.append((previous_snapshot, previous_persisted))
+            finally:
+                with self._flush_lock:
+                    self._flush_generation += 1
+                self._fold_day_into_previous_records(dict(previous_day_stats))
+                self._reset_record_thresholds()
+
+    def _on_flush_requested(self, **kwargs):
+        """Écrit les statistiques du jour si elles ont changé depuis la dernière écriture."""
+        self.save_changes()
+
+    def _on_movement_delta(self, distance: float, **kwargs):
+        """Ajoute en mémoire la distance calculée par le MovementAggregator."""
+        self._current_day_stats_in_memory['distance_pixels'] += distance
+        self._minute_buckets.add('distance_pixels', distance)
+        if self._current_day_stats_in_memory['distance_pixels'] > self._distance_record_to_beat:
+            self._on_record_broken('distance_pixels')
+
+    # --- Records ---
+
+    def _reset_record_thresholds(self):
+        """
+        Recalcule les seuils à battre pour la journée. Sans record précédent ou une fois
+        le record battu, le seuil vaut l'infini : la comparaison du chemin critique échoue toujours.
+        """
+        thresholds = {}
+        for metric, record in self._previous_records.items():
+            if record is None or record.get(metric, 0) < self._current_day_stats_in_memory.get(metric, 0):
+                thresholds[metric] = float('inf')
+            else:
+                thresholds[metric] = record.get(metric, 0)
+        self._distance_record_to_beat = thresholds['distance_pixels']
+        self._activity_record_to_beat = thresholds['active_time_seconds']
+
+    def _on_record_broken(self, metric: str):
+        """Publie 'record_broken' la première fois que le jour courant dépasse le record précédent."""
+        if metric == 'distance_pixels':
+            self._distance_record_to_beat = float('inf')
+        else:
+            self._activity_record_to_beat = float('inf')
+        previous_record = self._previous_records.get(metric) or {}
+        logger.info(f"Nouveau record pour '{metric}' : l'ancien record du {previous_record.get('date')} est battu.")
+        self.event_manager.publish(
+            'record_broken',
+            metric=metric,
+            previous_record=previous_record,
+            todays_stats=dict(self._current_day_stats_in_memory)
+        )
+
+    def _fold_day_into_previous_records(self, day_stats: Dict[str, Any]):
+        """Intègre la journée qui se termine au cache des records, sans requête en BDD."""
+        for metric, record in self._previous_records.items():
+            if day_stats.get(metric, 0) > 0 and (record is None or day_stats[metric] > record.get(metric, 0)):
+                self._previous_records[metric] = day_stats
         
     def get_todays_stats(self) -> dict:
         """Retourne les statistiques du jour courant depuis la mémoire."""
         return self._current_day_stats_in_memory
 
+    def _get_unflushed_deltas(self) -> Dict[str, Any]:
+        """Retourne, pour chaque compteur, la part du jour pas encore écrite en BDD."""
+        persisted = self._persisted_today
+        memory = self._current_day_stats_in_memory
+        return {column: memory.get(column, 0) - persisted.get(column, 0) for column in DAILY_STAT_COLUMNS}
+
+    def _read_with_pending(self, query, pending):
+        """
+        Exécute la lecture `query()` sans verrou et la complète par `pending()`, la part encore en
+        mémoire, copiée sous _flush_lock. Retourne (résultat, part en mémoire, date du jour).
+
+        La lecture n'attend jamais le thread d'écriture. Elle est cohérente si aucun cycle
+        d'écriture n'a commencé ni ne s'est terminé pendant la requête (génération paire et
+        inchangée) ; sinon elle est recommencée, puis acceptée telle quelle après
+        READ_CONSISTENCY_ATTEMPTS tentatives : l'écart transitoire disparaît à la lecture suivante.
+        """
+        for _ in range(READ_CONSISTENCY_ATTEMPTS):
+            with self._flush_lock:
+                generation = self._flush_generation
+                extra = pending()
+                today = self.today
+            result = query()
+            if generation % 2 == 0 and generation == self._flush_generation:
+                break
+        return result, extra, today
+
     def get_global_stats(self) -> dict:
         """
         Demande au repository de calculer les statistiques globales et 
         mappe les résultats dans un format attendu par l'application.
+        Les deltas du jour non encore écrits sont ajoutés aux totaux persistés.
         """
         logger.debug("Récupération et mappage des statistiques globales.")
-        self.save_changes() 
-        
-        repo_stats = self.stats_repository.get_global_stats()
+        repo_stats, deltas, _today = self._read_with_pending(
+            self.stats_repository.get_global_stats, self._get_unflushed_deltas)
         
         if not repo_stats:
             return self._get_empty_global_stats_structure()
-            
+
         mapped_stats = {
-            'total_distance_pixels': repo_stats.get('total_distance_pixels') or 0.0,
-            'left_clicks': repo_stats.get('total_left_clicks') or 0,
-            'right_clicks': repo_stats.get('total_right_clicks') or 0,
-            'middle_clicks': repo_stats.get('total_middle_clicks') or 0,
-            'total_active_time_seconds': repo_stats.get('total_active_time_seconds') or 0,
-            'total_inactive_time_seconds': repo_stats.get('total_inactive_time_seconds') or 0,
+            'total_distance_pixels': (repo_stats.get('total_distance_pixels') or 0.0) + deltas['distance_pixels'],
+            'left_clicks': (repo_stats.get('total_left_clicks') or 0) + deltas['left_clicks'],
+            'right_clicks': (repo_stats.get('total_right_clicks') or 0) + deltas['right_clicks'],
+            'middle_clicks': (repo_stats.get('total_middle_clicks') or 0) + deltas['middle_clicks'],
+            'total_active_time_seconds': (repo_stats.get('total_active_time_seconds') or 0) + deltas['active_time_seconds'],
+            'total_inactive_time_seconds': (repo_stats.get('total_inactive_time_seconds') or 0) + deltas['inactive_time_seconds'],
         }
         return mapped_stats
 
@@ -137,45 +265,184 @@ class StatsManager:
         return self.stats_repository.get_app_setting('first_launch_date')
 
     def get_last_n_days_stats(self, num_days: int) -> List[Dict[str, Any]]:
-        """Récupère l'historique des N derniers jours via le repository."""
-        self.save_changes()
-        return self.stats_repository.get_last_n_days_stats(num_days)
+        """Récupère l'historique des N derniers jours ; la ligne du jour provient de la mémoire."""
+        rows = self.stats_repository.get_last_n_days_stats(num_days)
+        todays_stats = dict(self._current_day_stats_in_memory)
+        return [todays_stats if row.get('date') == self.today else row for row in rows]
     
+    def get_stats_between(self, start: str, end: str, group_by: str = 'day') -> StatsSeries:
+        """
+        Historique agrégé par jour, semaine, mois ou année (voir StatsRepository.get_stats_between) ;
+        les deltas du jour non encore écrits sont ajoutés à la période qui contient aujourd'hui.
+        """
+        series, deltas, today = self._read_with_pending(
+            lambda: self.stats_repository.get_stats_between(start, end, group_by), self._get_unflushed_deltas)
+        if start <= today <= end:
+            self._add_deltas_to_series(series, deltas, today)
+        return series
+
+    def get_rollup_series(self, group_by: str, start_period: Optional[str] = None,
+                          end_period: Optional[str] = None) -> StatsSeries:
+        """Cumuls par semaine, mois ou année lus dans les tables de cumuls, deltas du jour inclus."""
+        series, deltas, today = self._read_with_pending(
+            lambda: self.stats_repository.get_rollup_series(group_by, start_period, end_period),
+            self._get_unflushed_deltas)
+        current_period = calendar_period(today, group_by)
+        if (start_period or '') <= current_period <= (end_period or '\uffff'):
+            self._add_deltas_to_series(series, deltas, today)
+        return series
+
+    def _add_deltas_to_series(self, series: StatsSeries, deltas: Dict[str, Any], today: str):
+        """
+        Ajoute les deltas non écrits à la période de la série qui contient `today`. Une table
+        de cumuls n'a pas encore de ligne pour une période commencée depuis le dernier cycle
+        d'écriture : la période est alors insérée à sa place (les périodes sont triées).
+        """
+        if not any(deltas.values()):
+            return
+        period = calendar_period(today, series.group_by)
+        index = bisect.bisect_left(series.periods, period)
+        if index == len(series.periods) or series.periods[index] != period:
+            series.periods.insert(index, period)
+            for values in series.columns.values():
+                values.insert(index, 0)
+        for column, delta in deltas.items():
+            series.columns[column][index] += delta
+
     def get_record_day_for_distance(self) -> Optional[Dict[str, Any]]:
         """
-        Demande au repository le jour record pour la distance, après avoir sauvegardé l'état actuel.
+        Retourne le jour record pour la distance depuis le cache, comparé aux compteurs du jour en mémoire.
         """
-        logger.debug("Passerelle StatsManager: demande du record de distance.")
-        self.save_changes()
-        return self.stats_repository.get_record_day_for_distance()
+        return self._merge_today_into_record('distance_pixels')
 
     def get_record_day_for_activity(self) -> Optional[Dict[str, Any]]:
         """
-        Demande au repository le jour record pour l'activité, après avoir sauvegardé l'état actuel.
+        Retourne le jour record pour l'activité depuis le cache, comparé aux compteurs du jour en mémoire.
         """
-        logger.debug("Passerelle StatsManager: demande du record d'activité.")
-        self.save_changes()
-        return self.stats_repository.get_record_day_for_activity()
+        return self._merge_today_into_record('active_time_seconds')
+
+    def _merge_today_into_record(self, metric: str) -> Optional[Dict[str, Any]]:
+        """Retourne le record des jours précédents, ou le jour courant (en mémoire) s'il le dépasse."""
+        record = self._previous_records.get(metric)
+        todays_stats = dict(self._current_day_stats_in_memory)
+        if record is not None and record.get(metric, 0) >= todays_stats.get(metric, 0):
+            return record
+        return todays_stats if todays_stats.get(metric, 0) > 0 else None
+
+    def get_time_series(self, start: str, end: str, resolution: str = 'hour') -> List[Dict[str, Any]]:
+        """
+        Retourne les compteurs agrégés par minute, heure ou jour entre `start` (inclus) et `end` (exclu),
+        en ajoutant aux lignes persistées les minutes encore en mémoire.
+        """
+        prefix_length = TIME_SERIES_RESOLUTIONS.get(resolution)
+        if prefix_length is None:
+            raise ValueError(f"Résolution inconnue : '{resolution}'")
+        rows, pending, _today = self._read_with_pending(
+            lambda: self.stats_repository.get_minute_stats_between(start, end, resolution),
+            self._minute_buckets.snapshot)
+
+        series = {row['period']: row for row in rows}
+        for key, _date, *values in pending:
+            if not (start <= key < end):
+                continue
+            period = key[:prefix_length]
+            row = series.get(period)
+            if row is None:
+                row = series[period] = {'period': period, **dict.fromkeys(DAILY_STAT_COLUMNS, 0)}
+            for column, value in zip(DAILY_STAT_COLUMNS, values):
+                row[column] += value
+        return [series[period] for period in sorted(series)]
+
+    def save_changes(self, force: bool = False, include_open_minute: bool = False) -> bool:
+        """
+        Demande au repository d'ajouter aux statistiques du jour les deltas accumulés en mémoire
+        depuis la dernière écriture (jamais de valeurs absolues : une copie en mémoire périmée
+        ne peut pas écraser les ajouts d'un autre écrivain), ainsi que les minutes fermées,
+        le tout dans une seule transaction. force=True écrit même sans changement détecté.
+        Avec include_open_minute=True, la minute en cours est également écrite (fermeture).
+        Retourne True si une écriture a eu lieu.
+
+        _flush_lock n'est pas détenu pendant l'attente du thread d'écriture : seuls l'instantané
+        et la mise à jour de la référence persistée sont faits sous ce verrou.
+        """
+        with self._write_lock:
+            self._retry_unsaved_previous_days()
+            with self._flush_lock:
+                snapshot = dict(self._current_day_stats_in_memory)
+                persisted = self._persisted_today
+                minute_rows = self._begin_flush_locked(include_open_minute)
+            written = False
+            try:
+                written = self._write_changes(snapshot, persisted, minute_rows, force)
+            finally:
+                with self._flush_lock:
+                    if written:
+                        self._persisted_today = snapshot
+                    self._flush_generation += 1
+            return written
+
+    def _retry_unsaved_previous_days(self):
+        """
+        Réécrit les jours précédents restés en attente après un échec au changement de jour.
+        Un nouvel échec est journalisé et le jour reste en attente. L'appelant détient _write_lock.
+        """
+        while self._unsaved_previous_days:
+            snapshot, persisted = self._unsaved_previous_days[0]
+            try:
+                self._write_changes(snapshot, persisted, [], force=False)
+            except Exception:
+                logger.error(f"Nouvel échec de l'écriture des statistiques du {snapshot.get('date')}.", exc_info=True)
+                return
+            self._unsaved_previous_days.pop(0)
+
+    def _begin_flush_locked(self, include_open_minute: bool) -> list:
+        """
+        Ouvre un cycle d'écriture (génération impaire) et retire les minutes à écrire de
+        l'accumulateur. L'appelant détient _write_lock et _flush_lock.
+        """
+        self._flush_generation += 1
+        return self._minute_buckets.drain(include_open=include_open_minute)
+
+    def _write_changes(self, snapshot: Dict[str, Any], persisted: Dict[str, Any],
+                       minute_rows: list, force: bool) -> bool:
+        """
+        Écrit la différence `snapshot` - `persisted` (datée par snapshot['date']) et les minutes
+        retirées de l'accumulateur. L'appelant détient _write_lock. Retourne True si une écriture a eu lieu.
+        """
+        day_changed = force or snapshot != persisted
+        if not day_changed and not minute_rows:
+            return False
+        logger.debug(f"Sauvegarde des changements via le repository ({len(minute_rows)} minute(s)).")
+        deltas = None
+        if day_changed:
+            deltas = {column: snapshot.get(column, 0) - persisted.get(column, 0) for column in DAILY_STAT_COLUMNS}
+        try:
+            # Une seule commande pour le thread d'écriture : jour et minutes dans la même transaction
+            self.database.execute(self._write_changes_command, snapshot.get('date', self.today), deltas, minute_rows)
+        except Exception:
+            # Les minutes retirées de l'accumulateur seront réécrites au prochain cycle
+            self._minute_buckets.restore(minute_rows)
+            raise
+        return True
 
-    def save_changes(self):
-        """Demande au repository de sauvegarder les statistiques en mémoire du jour courant."""
-        logger.debug("Sauvegarde des changements via le repository.")
-        self.stats_repository.update_daily_stats(self._current_day_stats_in_memory)
-        self.stats_repository.save_changes()
+    def _write_changes_command(self, conn, date_iso: str, deltas: Optional[Dict[str, Any]], minute_rows: list):
+        """Commande exécutée par le thread d'écriture : les écritures imbriquées s'y exécutent directement."""
+        if deltas is not None:
+            self.stats_repository.increment_daily_stats(date_iso, deltas)
+        self.stats_repository.add_minute_stats(minute_rows)
 
     def close(self):
-        """Arrête le thread, sauvegarde les changements et ferme la connexion du repository."""
+        """Effectue la sauvegarde finale. La connexion est fermée par le service Database."""
         logger.info("Demande de fermeture de StatsManager.")
                 
         logger.info("Sauvegarde finale des changements avant fermeture.")
-        self.save_changes() 
-        self.stats_repository.close()
-        logger.info("StatsManager et son repository sont fermés.")
+        self.save_changes(include_open_minute=True)
+        logger.info("StatsManager fermé.")
 
-    def _get_initial_daily_stats_structure(self) -> dict:
+    def _get_initial_daily_stats_structure(self, date_iso: Optional[str] = None) -> dict:
         """Retourne un dictionnaire représentant l'état initial des statistiques journalières."""
         return {
-            'date': self.today, 'distance_pixels': 0.0, 'left_clicks': 0, 'right_clicks': 0,
+            'date': date_iso or self.today, 'distance_pixels': 0.0, 'left_clicks': 0, 'right_clicks': 0,
             'middle_clicks': 0, 'active_time_seconds': 0, 'inactive_time_seconds': 0
         }
 
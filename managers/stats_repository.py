@@ -1,44 +1,88 @@
 # managers/stats_repository.py
 
+import datetime
 import sqlite3
 import logging
-from typing import Optional, List, Dict, Any
+from array import array
+from concurrent.futures import Future
+from dataclasses import dataclass
+from typing import Optional, List, Dict, Any, Tuple
 
-from utils.paths import get_db_path
+from core.database import Database
+
+# Colonnes de compteurs de la table daily_stats (hors clé 'date')
+DAILY_STAT_COLUMNS = (
+    'distance_pixels', 'left_clicks', 'right_clicks', 'middle_clicks',
+    'active_time_seconds', 'inactive_time_seconds'
+)
+
+# Regroupements calendaires -> expression SQL de la clé de période, appliquée à une colonne date {d}
+# (la semaine est identifiée par la date de son lundi)
+CALENDAR_GROUPINGS = {
+    'day': "{d}",
+    'week': "date({d}, '-' || ((CAST(strftime('%w', {d}) AS INTEGER) + 6) % 7) || ' days')",
+    'month': "substr({d}, 1, 7)",
+    'year': "substr({d}, 1, 4)",
+}
+
+# Tables de cumuls calendaires maintenues par deltas, comme la table 'totals'
+ROLLUP_TABLES = {'week': 'weekly_stats', 'month': 'monthly_stats', 'year': 'yearly_stats'}
+
+def calendar_period(date_iso: str, group_by: str) -> str:
+    """Clé de période d'une date ISO, identique à celle calculée en SQL par CALENDAR_GROUPINGS."""
+    if group_by == 'week':
+        day = datetime.date.fromisoformat(date_iso)
+        return (day - datetime.timedelta(days=day.weekday())).isoformat()
+    return date_iso[:{'day': 10, 'month': 7, 'year': 4}[group_by]]
+
+@dataclass(frozen=True, slots=True)
+class StatsSeries:
+    """
+    Résultat colonnaire d'une requête d'historique : `periods[i]` est la clé de la i-ème période
+    et `columns[colonne][i]` la valeur correspondante (tableaux parallèles, sans dictionnaire par ligne).
+    """
+    group_by: str
+    periods: List[str]
+    columns: Dict[str, array]
+
+    def __len__(self) -> int:
+        return len(self.periods)
+
+    def __getitem__(self, column: str) -> array:
+        return self.columns[column]
+
+    def row(self, index: int) -> Dict[str, Any]:
+        """Reconstitue une ligne sous forme de dictionnaire (pour l'affichage ponctuel)."""
+        row = {'period': self.periods[index]}
+        row.update((column, values[index]) for column, values in self.columns.items())
+        return row
+
+# Résolutions de la série temporelle -> longueur du préfixe de la clé 'AAAA-MM-JJTHH:MM'
+TIME_SERIES_RESOLUTIONS = {'minute': 16, 'hour': 13, 'day': 10}
 
 class StatsRepository:
     """
     Couche d'accès aux données (Repository) pour toutes les opérations
     liées à la base de données de statistiques (stats.db).
-    Cette classe gère la connexion, le curseur, et toutes les requêtes SQL.
+    Les écritures sont soumises au thread d'écriture du service Database (les méthodes
+    d'écriture retournent un Future), les lectures passent par son pool de connexions
+    en lecture seule.
     """
-    def __init__(self):
+    def __init__(self, database: Database):
         self.logger = logging.getLogger(__name__)
-        self.db_path = get_db_path()
-        self._conn: Optional[sqlite3.Connection] = None
-        self._cursor: Optional[sqlite3.Cursor] = None
-        self._connect_db()
-
-    def _connect_db(self):
-        """Établit la connexion à la base de données et crée les tables si elles n'existent pas."""
-        self.logger.info(f"Repository : Connexion à la base de données : {self.db_path}")
-        try:
-            self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
-            self._conn.row_factory = sqlite3.Row
-            self._cursor = self._conn.cursor()
-            self._create_tables()
-            self.logger.info("Repository : Connexion à la BDD établie et tables vérifiées.")
-        except (sqlite3.Error, OSError) as e:
-            self.logger.critical(f"Repository : Erreur critique lors de la connexion à la BDD '{self.db_path}': {e}", exc_info=True)
-            raise
+        self._db = database
+        self.db_path = database.db_path
+        self._create_tables()
+        self.logger.info("Repository : Tables vérifiées.")
 
     def _create_tables(self):
-        """Crée les tables 'daily_stats' et 'app_settings' si elles n'existent pas."""
-        if not self._cursor:
-            self.logger.error("Repository : Impossible de créer les tables, curseur non disponible.")
-            return
+        """Crée les tables 'daily_stats', 'app_settings', 'totals' et 'minute_stats' si elles n'existent pas."""
         self.logger.debug("Repository : Vérification/création des tables.")
-        self._cursor.execute('''
+        self._db.execute(self._create_tables_command)
+
+    def _create_tables_command(self, conn: sqlite3.Connection):
+        """Commande d'écriture : création des tables et index, initialisation de 'totals'."""
+        conn.execute('''
             CREATE TABLE IF NOT EXISTS daily_stats (
                 date TEXT PRIMARY KEY,
                 distance_pixels REAL DEFAULT 0.0,
@@ -49,104 +93,349 @@ class StatsRepository:
                 inactive_time_seconds INTEGER DEFAULT 0
             )
         ''')
-        self._cursor.execute('''
+        conn.execute('''
             CREATE TABLE IF NOT EXISTS app_settings (
                 key TEXT PRIMARY KEY,
                 value TEXT
             )
         ''')
-        if self._conn:
-            self._conn.commit()
+        # Totaux globaux maintenus par deltas à chaque écriture d'une ligne de daily_stats
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS totals (
+                id INTEGER PRIMARY KEY CHECK (id = 1),
+                distance_pixels REAL NOT NULL DEFAULT 0.0,
+                left_clicks INTEGER NOT NULL DEFAULT 0,
+                right_clicks INTEGER NOT NULL DEFAULT 0,
+                middle_clicks INTEGER NOT NULL DEFAULT 0,
+                active_time_seconds INTEGER NOT NULL DEFAULT 0,
+                inactive_time_seconds INTEGER NOT NULL DEFAULT 0
+            )
+        ''')
+        # Cumuls par semaine (clé = lundi), mois ('AAAA-MM') et année ('AAAA')
+        for table in ROLLUP_TABLES.values():
+            conn.execute(f'''
+                CREATE TABLE IF NOT EXISTS {table} (
+                    period TEXT PRIMARY KEY,
+                    distance_pixels REAL NOT NULL DEFAULT 0.0,
+                    left_clicks INTEGER NOT NULL DEFAULT 0,
+                    right_clicks INTEGER NOT NULL DEFAULT 0,
+                    middle_clicks INTEGER NOT NULL DEFAULT 0,
+                    active_time_seconds INTEGER NOT NULL DEFAULT 0,
+                    inactive_time_seconds INTEGER NOT NULL DEFAULT 0
+                ) WITHOUT ROWID
+            ''')
+        # Série temporelle à la minute (clé 'AAAA-MM-JJTHH:MM', heure locale) ; la colonne
+        # 'date' permet de regrouper par jour et de reconstituer daily_stats
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS minute_stats (
+                minute TEXT PRIMARY KEY,
+                date TEXT NOT NULL,
+                distance_pixels REAL NOT NULL DEFAULT 0.0,
+                left_clicks INTEGER NOT NULL DEFAULT 0,
+                right_clicks INTEGER NOT NULL DEFAULT 0,
+                middle_clicks INTEGER NOT NULL DEFAULT 0,
+                active_time_seconds INTEGER NOT NULL DEFAULT 0,
+                inactive_time_seconds INTEGER NOT NULL DEFAULT 0
+            ) WITHOUT ROWID
+        ''')
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_minute_stats_date ON minute_stats (date)")
+        # Index sur les métriques de record : évite le tri complet de la table
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_daily_stats_distance ON daily_stats (distance_pixels)")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_daily_stats_active_time ON daily_stats (active_time_seconds)")
+        if conn.execute("SELECT 1 FROM totals WHERE id = 1").fetchone() is None:
+            self.logger.info("Repository : Table 'totals' vide, initialisation depuis daily_stats.")
+            self.rebuild_totals()
+        if conn.execute("SELECT 1 FROM yearly_stats LIMIT 1").fetchone() is None \
+                and conn.execute("SELECT 1 FROM daily_stats LIMIT 1").fetchone() is not None:
+            self.logger.info("Repository : Tables de cumuls vides, initialisation depuis daily_stats.")
+            self.rebuild_rollups()
 
     def get_daily_stats(self, date_iso: str) -> Optional[Dict[str, Any]]:
         """Récupère les statistiques pour une date spécifique."""
-        if not self._cursor: return None
         self.logger.debug(f"Repository : Récupération des stats pour la date : {date_iso}")
-        self._cursor.execute("SELECT * FROM daily_stats WHERE date = ?", (date_iso,))
-        row = self._cursor.fetchone()
+        with self._db.read_connection() as conn:
+            row = conn.execute("SELECT * FROM daily_stats WHERE date = ?", (date_iso,)).fetchone()
         return dict(row) if row else None
 
-    def create_daily_stats_entry(self, date_iso: str):
+    def create_daily_stats_entry(self, date_iso: str) -> Future:
         """Crée une nouvelle entrée pour un jour donné dans la table daily_stats."""
-        if not self._cursor or not self._conn: return
         self.logger.info(f"Repository : Création d'une nouvelle entrée pour la date : {date_iso}")
-        self._cursor.execute("INSERT INTO daily_stats (date) VALUES (?)", (date_iso,))
-        self._conn.commit()
+        return self._db.submit(
+            lambda conn: conn.execute("INSERT OR IGNORE INTO daily_stats (date) VALUES (?)", (date_iso,))
+        )
+
+    def increment_daily_stats(self, date_iso: str, deltas: Dict[str, Any]) -> Future:
+        """
+        Ajoute des deltas aux compteurs d'un jour (la ligne est créée au besoin) par un UPSERT
+        additif, puis aux totaux et aux cumuls calendaires, dans la même transaction.
+        Aucune valeur absolue n'est écrite : plusieurs écrivains (agent sans interface, import,
+        fusion d'une autre machine) peuvent alimenter le même jour sans se contredire.
+        """
+        values = [deltas.get(column, 0) for column in DAILY_STAT_COLUMNS]
+        self.logger.debug(f"Repository : Incrément des stats pour la date : {date_iso}")
+        return self._db.submit(self._increment_daily_stats_command, date_iso, values)
+
+    def _increment_daily_stats_command(self, conn: sqlite3.Connection, date_iso: str, values: List[Any]):
+        """Commande d'écriture de increment_daily_stats() (deltas dans l'ordre de DAILY_STAT_COLUMNS)."""
+        if not any(values):
+            return
+        columns = ", ".join(DAILY_STAT_COLUMNS)
+        placeholders = ", ".join("?" for _ in DAILY_STAT_COLUMNS)
+        increments = ", ".join(f"{column} = {column} + excluded.{column}" for column in DAILY_STAT_COLUMNS)
+        conn.execute(
+            f"INSERT INTO daily_stats (date, {columns}) VALUES (?, {placeholders}) "
+            f"ON CONFLICT(date) DO UPDATE SET {increments}",
+            (date_iso, *values)
+        )
+        self._add_to_totals(conn, values)
+        self._add_to_rollups(conn, date_iso, values)
 
-    def update_daily_stats(self, stats_dict: Dict[str, Any]):
-        """Met à jour une entrée de statistiques journalières."""
-        if not self._cursor or not self._conn: return
+    def update_daily_stats(self, stats_dict: Dict[str, Any]) -> Future:
+        """
+        Remplace les valeurs d'une entrée de statistiques journalières et reporte la différence
+        avec l'ancienne ligne dans la table 'totals', dans la même transaction.
+        Réservé aux corrections (rejeu du journal, reconstitution depuis minute_stats) :
+        le flux normal passe par increment_daily_stats().
+        """
         self.logger.debug(f"Repository : Mise à jour des stats pour la date : {stats_dict.get('date')}")
-        self._cursor.execute('''
+        return self._db.submit(self._update_daily_stats_command, dict(stats_dict))
+
+    def _update_daily_stats_command(self, conn: sqlite3.Connection, stats_dict: Dict[str, Any]):
+        """Commande d'écriture de update_daily_stats()."""
+        new_values = [stats_dict.get(column, 0) for column in DAILY_STAT_COLUMNS]
+        old_row = conn.execute("SELECT * FROM daily_stats WHERE date = ?", (stats_dict.get('date'),)).fetchone()
+        if old_row is None:
+            return
+        conn.execute('''
             UPDATE daily_stats
             SET distance_pixels = ?, left_clicks = ?, right_clicks = ?, middle_clicks = ?,
                 active_time_seconds = ?, inactive_time_seconds = ?
             WHERE date = ?
-        ''', (
-            stats_dict.get('distance_pixels', 0.0),
-            stats_dict.get('left_clicks', 0),
-            stats_dict.get('right_clicks', 0),
-            stats_dict.get('middle_clicks', 0),
-            stats_dict.get('active_time_seconds', 0),
-            stats_dict.get('inactive_time_seconds', 0),
-            stats_dict.get('date')
-        ))
+        ''', (*new_values, stats_dict.get('date')))
+        deltas = [new - (old_row[column] or 0) for new, column in zip(new_values, DAILY_STAT_COLUMNS)]
+        self._add_to_totals(conn, deltas)
+        self._add_to_rollups(conn, stats_dict.get('date'), deltas)
+
+    def _add_to_totals(self, conn: sqlite3.Connection, deltas: List[Any]):
+        """Ajoute des deltas (dans l'ordre de DAILY_STAT_COLUMNS) aux totaux globaux."""
+        if not any(deltas):
+            return
+        assignments = ", ".join(f"{column} = {column} + ?" for column in DAILY_STAT_COLUMNS)
+        conn.execute(f"UPDATE totals SET {assignments} WHERE id = 1", deltas)
+
+    def _add_to_rollups(self, conn: sqlite3.Connection, date_iso: str, deltas: List[Any]):
+        """Ajoute des deltas (dans l'ordre de DAILY_STAT_COLUMNS) aux cumuls de la semaine, du mois et de l'année."""
+        if not any(deltas):
+            return
+        columns = ", ".join(DAILY_STAT_COLUMNS)
+        placeholders = ", ".join("?" for _ in DAILY_STAT_COLUMNS)
+        increments = ", ".join(f"{column} = {column} + excluded.{column}" for column in DAILY_STAT_COLUMNS)
+        for group_by, table in ROLLUP_TABLES.items():
+            conn.execute(
+                f"INSERT INTO {table} (period, {columns}) VALUES (?, {placeholders}) "
+                f"ON CONFLICT(period) DO UPDATE SET {increments}",
+                (calendar_period(date_iso, group_by), *deltas)
+            )
 
     def get_app_setting(self, key: str) -> Optional[str]:
         """Récupère une valeur depuis la table app_settings."""
-        if not self._cursor: return None
-        self._cursor.execute("SELECT value FROM app_settings WHERE key = ?", (key,))
-        row = self._cursor.fetchone()
+        with self._db.read_connection() as conn:
+            row = conn.execute("SELECT value FROM app_settings WHERE key = ?", (key,)).fetchone()
         return row['value'] if row else None
 
-    def set_app_setting(self, key: str, value: str):
+    def set_app_setting(self, key: str, value: str) -> Future:
         """Définit une valeur dans la table app_settings."""
-        if not self._cursor or not self._conn: return
         self.logger.info(f"Repository : Définition du paramètre '{key}' à '{value}'.")
-        self._cursor.execute("INSERT OR REPLACE INTO app_settings (key, value) VALUES (?, ?)", (key, value))
-        self._conn.commit()
+        return self._db.submit(
+            lambda conn: conn.execute("INSERT OR REPLACE INTO app_settings (key, value) VALUES (?, ?)", (key, value))
+        )
     
     def get_global_stats(self) -> Optional[Dict[str, Any]]:
-        """Calcule et retourne les statistiques agrégées."""
-        if not self._cursor: return None
-        self.logger.debug("Repository : Calcul des statistiques globales.")
-        self._cursor.execute('''
-            SELECT
-                SUM(distance_pixels) AS total_distance_pixels,
-                SUM(left_clicks) AS total_left_clicks,
-                SUM(right_clicks) AS total_right_clicks,
-                SUM(middle_clicks) AS total_middle_clicks,
-                SUM(active_time_seconds) AS total_active_time_seconds,
-                SUM(inactive_time_seconds) AS total_inactive_time_seconds
-            FROM daily_stats
-        ''')
-        row = self._cursor.fetchone()
+        """Retourne les statistiques agrégées, lues en O(1) depuis la table 'totals'."""
+        self.logger.debug("Repository : Lecture des statistiques globales.")
+        with self._db.read_connection() as conn:
+            row = conn.execute('''
+                SELECT
+                    distance_pixels AS total_distance_pixels,
+                    left_clicks AS total_left_clicks,
+                    right_clicks AS total_right_clicks,
+                    middle_clicks AS total_middle_clicks,
+                    active_time_seconds AS total_active_time_seconds,
+                    inactive_time_seconds AS total_inactive_time_seconds
+                FROM totals WHERE id = 1
+            ''').fetchone()
         return dict(row) if row else None
 
+    def _compute_totals_from_daily_stats(self, conn: sqlite3.Connection) -> Dict[str, Any]:
+        """Recalcule les totaux par un SUM complet sur daily_stats (coûteux, réservé à la maintenance)."""
+        sums = ", ".join(f"COALESCE(SUM({column}), 0) AS {column}" for column in DAILY_STAT_COLUMNS)
+        row = conn.execute(f"SELECT {sums} FROM daily_stats").fetchone()
+        return dict(row)
+
+    def rebuild_totals(self) -> Dict[str, Any]:
+        """Reconstruit entièrement la table 'totals' depuis daily_stats et retourne les nouveaux totaux."""
+        totals = self._db.execute(self._rebuild_totals_command)
+        self.logger.info(f"Repository : Table 'totals' reconstruite : {totals}")
+        return totals
+
+    def _rebuild_totals_command(self, conn: sqlite3.Connection) -> Dict[str, Any]:
+        """Commande d'écriture de rebuild_totals()."""
+        totals = self._compute_totals_from_daily_stats(conn)
+        columns = ", ".join(DAILY_STAT_COLUMNS)
+        placeholders = ", ".join("?" for _ in DAILY_STAT_COLUMNS)
+        conn.execute(
+            f"INSERT OR REPLACE INTO totals (id, {columns}) VALUES (1, {placeholders})",
+            [totals[column] for column in DAILY_STAT_COLUMNS]
+        )
+        return totals
+
+    def rebuild_rollups(self):
+        """Reconstruit entièrement les tables de cumuls calendaires depuis daily_stats."""
+        self._db.execute(self._rebuild_rollups_command)
+        self.logger.info(f"Repository : Tables de cumuls reconstruites : {', '.join(ROLLUP_TABLES.values())}.")
+
+    def _rebuild_rollups_command(self, conn: sqlite3.Connection):
+        """Commande d'écriture de rebuild_rollups()."""
+        columns = ", ".join(DAILY_STAT_COLUMNS)
+        sums = ", ".join(f"COALESCE(SUM({column}), 0)" for column in DAILY_STAT_COLUMNS)
+        for group_by, table in ROLLUP_TABLES.items():
+            period_expression = CALENDAR_GROUPINGS[group_by].format(d='date')
+            conn.execute(f"DELETE FROM {table}")
+            conn.execute(
+                f"INSERT INTO {table} (period, {columns}) "
+                f"SELECT {period_expression} AS period, {sums} FROM daily_stats GROUP BY period"
+            )
+
+    def check_rollups(self, tolerance: float = 1e-6) -> Dict[str, Dict[str, Dict[str, Any]]]:
+        """
+        Compare les tables de cumuls aux sommes de daily_stats. Retourne, par table, les périodes
+        incohérentes ({table: {période: {colonne: {'stored': ..., 'expected': ...}}}}), vide si tout concorde.
+        """
+        sums = ", ".join(f"COALESCE(SUM({column}), 0) AS {column}" for column in DAILY_STAT_COLUMNS)
+        mismatches = {}
+        with self._db.read_connection() as conn:
+            for group_by, table in ROLLUP_TABLES.items():
+                period_expression = CALENDAR_GROUPINGS[group_by].format(d='date')
+                expected = {
+                    row['period']: dict(row) for row in
+                    conn.execute(f"SELECT {period_expression} AS period, {sums} FROM daily_stats GROUP BY period")
+                }
+                stored = {row['period']: dict(row) for row in conn.execute(f"SELECT * FROM {table}")}
+                table_mismatches = {}
+                for period in expected.keys() | stored.keys():
+                    expected_row = expected.get(period, {})
+                    stored_row = stored.get(period, {})
+                    for column in DAILY_STAT_COLUMNS:
+                        expected_value = expected_row.get(column, 0) or 0
+                        stored_value = stored_row.get(column, 0) or 0
+                        if abs(stored_value - expected_value) > tolerance * max(1.0, abs(expected_value)):
+                            table_mismatches.setdefault(period, {})[column] = {'stored': stored_value, 'expected': expected_value}
+                if table_mismatches:
+                    mismatches[table] = table_mismatches
+        return mismatches
+
+    def check_totals(self, tolerance: float = 1e-6) -> Dict[str, Dict[str, Any]]:
+        """
+        Compare la table 'totals' aux sommes de daily_stats.
+        Retourne les colonnes incohérentes ({colonne: {'stored': ..., 'expected': ...}}), vide si tout concorde.
+        """
+        with self._db.read_connection() as conn:
+            expected = self._compute_totals_from_daily_stats(conn)
+            stored_row = conn.execute("SELECT * FROM totals WHERE id = 1").fetchone()
+        stored = dict(stored_row) if stored_row else {}
+        mismatches = {}
+        for column in DAILY_STAT_COLUMNS:
+            stored_value = stored.get(column, 0) or 0
+            if abs(stored_value - expected[column]) > tolerance * max(1.0, abs(expected[column])):
+                mismatches[column] = {'stored': stored_value, 'expected': expected[column]}
+        return mismatches
+
     def get_last_n_days_stats(self, num_days: int) -> List[Dict[str, Any]]:
         """Récupère les statistiques des N derniers jours."""
-        if not self._cursor or num_days <= 0: return []
+        if num_days <= 0: return []
         self.logger.debug(f"Repository : Récupération des {num_days} derniers jours.")
         query = "SELECT * FROM daily_stats ORDER BY date DESC LIMIT ?"
-        self._cursor.execute(query, (num_days,))
-        rows = self._cursor.fetchall()
+        with self._db.read_connection() as conn:
+            rows = conn.execute(query, (num_days,)).fetchall()
         return [dict(row) for row in rows]
 
+    def get_stats_between(self, start: str, end: str, group_by: str = 'day') -> StatsSeries:
+        """
+        Agrège en SQL les statistiques des jours `start` à `end` (inclus, dates ISO) par jour, semaine
+        (clé = lundi), mois ('AAAA-MM') ou année ('AAAA'). Un calendrier généré par une CTE récursive
+        garantit une période à zéro pour les jours sans données.
+        """
+        period_expression = CALENDAR_GROUPINGS.get(group_by)
+        if period_expression is None:
+            raise ValueError(f"Regroupement inconnu : '{group_by}'")
+        sums = ", ".join(f"COALESCE(SUM(s.{column}), 0) AS {column}" for column in DAILY_STAT_COLUMNS)
+        query = f'''
+            WITH RECURSIVE calendar(d) AS (
+                SELECT date(?) WHERE date(?) <= date(?)
+                UNION ALL
+                SELECT date(d, '+1 day') FROM calendar WHERE d < date(?)
+            )
+            SELECT {period_expression.format(d='d')} AS period, {sums}
+            FROM calendar LEFT JOIN daily_stats AS s ON s.date = calendar.d
+            GROUP BY period ORDER BY period
+        '''
+        self.logger.debug(f"Repository : Agrégation des stats du {start} au {end} par '{group_by}'.")
+        with self._db.read_connection() as conn:
+            rows = conn.execute(query, (start, start, end, end)).fetchall()
+
+        periods = [row[0] for row in rows]
+        columns = {
+            column: array('d' if column == 'distance_pixels' else 'q', [row[i] for row in rows])
+            for i, column in enumerate(DAILY_STAT_COLUMNS, start=1)
+        }
+        return StatsSeries(group_by, periods, columns)
+
+    def get_daily_stats_series(self) -> StatsSeries:
+        """Retourne tout l'historique de daily_stats en colonnes (jours enregistrés uniquement, ordre chronologique)."""
+        query = f"SELECT date, {', '.join(DAILY_STAT_COLUMNS)} FROM daily_stats ORDER BY date"
+        with self._db.read_connection() as conn:
+            rows = conn.execute(query).fetchall()
+
+        periods = [row[0] for row in rows]
+        columns = {
+            column: array('d' if column == 'distance_pixels' else 'q', [row[i] or 0 for row in rows])
+            for i, column in enumerate(DAILY_STAT_COLUMNS, start=1)
+        }
+        return StatsSeries('day', periods, columns)
+
+    def get_rollup_series(self, group_by: str, start_period: Optional[str] = None,
+                          end_period: Optional[str] = None) -> StatsSeries:
+        """
+        Lit directement une table de cumuls ('week', 'month' ou 'year') entre deux clés de période
+        incluses : quelques lignes, quel que soit le nombre d'années de données.
+        Seules les périodes enregistrées sont retournées.
+        """
+        table = ROLLUP_TABLES.get(group_by)
+        if table is None:
+            raise ValueError(f"Regroupement sans table de cumuls : '{group_by}'")
+        columns = ", ".join(DAILY_STAT_COLUMNS)
+        query = f"SELECT period, {columns} FROM {table} WHERE period >= ? AND period <= ? ORDER BY period"
+        with self._db.read_connection() as conn:
+            rows = conn.execute(query, (start_period or '', end_period or '\uffff')).fetchall()
+
+        periods = [row[0] for row in rows]
+        series_columns = {
+            column: array('d' if column == 'distance_pixels' else 'q', [row[i] for row in rows])
+            for i, column in enumerate(DAILY_STAT_COLUMNS, start=1)
+        }
+        return StatsSeries(group_by, periods, series_columns)
+
     # --- AJOUT DES NOUVELLES MÉTHODES POUR LES RECORDS ---
 
-    def get_record_day_for_distance(self) -> Optional[Dict[str, Any]]:
+    def get_record_day_for_distance(self, exclude_date: Optional[str] = None) -> Optional[Dict[str, Any]]:
         """
-        Récupère le jour avec la plus grande distance parcourue.
+        Récupère le jour avec la plus grande distance parcourue (en excluant éventuellement une date).
         """
-        if not self._cursor:
-            self.logger.error("Repository: Impossible de récupérer le record de distance, curseur non disponible.")
-            return None
-        
-        query = "SELECT * FROM daily_stats ORDER BY distance_pixels DESC LIMIT 1"
+        query = "SELECT * FROM daily_stats WHERE date IS NOT ? ORDER BY distance_pixels DESC LIMIT 1"
         try:
             self.logger.debug("Repository: Recherche du jour record pour la distance.")
-            self._cursor.execute(query)
-            row = self._cursor.fetchone()
+            with self._db.read_connection() as conn:
+                row = conn.execute(query, (exclude_date,)).fetchone()
             # Un record n'est valide que si la distance est supérieure à zéro
             if row and row['distance_pixels'] > 0:
                 self.logger.info(f"Repository: Jour record pour la distance trouvé: {dict(row)}")
@@ -158,19 +447,15 @@ class StatsRepository:
             self.logger.error(f"Repository: Erreur SQLite lors de la recherche du record de distance: {e}", exc_info=True)
             return None
 
-    def get_record_day_for_activity(self) -> Optional[Dict[str, Any]]:
+    def get_record_day_for_activity(self, exclude_date: Optional[str] = None) -> Optional[Dict[str, Any]]:
         """
-        Récupère le jour avec le plus grand temps d'activité.
+        Récupère le jour avec le plus grand temps d'activité (en excluant éventuellement une date).
         """
-        if not self._cursor:
-            self.logger.error("Repository: Impossible de récupérer le record d'activité, curseur non disponible.")
-            return None
-
-        query = "SELECT * FROM daily_stats ORDER BY active_time_seconds DESC LIMIT 1"
+        query = "SELECT * FROM daily_stats WHERE date IS NOT ? ORDER BY active_time_seconds DESC LIMIT 1"
         try:
             self.logger.debug("Repository: Recherche du jour record pour l'activité.")
-            self._cursor.execute(query)
-            row = self._cursor.fetchone()
+            with self._db.read_connection() as conn:
+                row = conn.execute(query, (exclude_date,)).fetchone()
             # Un record n'est valide que si le temps d'activité est supérieur à zéro
             if row and row['active_time_seconds'] > 0:
                 self.logger.info(f"Repository: Jour record pour l'activité trouvé: {dict(row)}")
@@ -184,16 +469,79 @@ class StatsRepository:
 
     # --- FIN DE L'AJOUT ---
 
-    def save_changes(self):
-        """Valide (commit) les transactions en attente sur la base de données."""
-        if self._conn:
-            self.logger.debug("Repository : Sauvegarde des changements (commit).")
-            self._conn.commit()
-
-    def close(self):
-        """Ferme la connexion à la base de données."""
-        if self._conn:
-            self.logger.info("Repository : Fermeture de la connexion à la BDD.")
-            self.save_changes() 
-            self._conn.close()
-            self._conn = None
\ No newline at end of file
+    # --- Série temporelle à la minute ---
+
+    def add_minute_stats(self, rows: List[Tuple]) -> Optional[Future]:
+        """
+        Ajoute en lot des seaux (minute, date, *compteurs dans l'ordre de DAILY_STAT_COLUMNS)
+        avec un seul executemany. Les valeurs s'additionnent à une minute déjà présente,
+        ce qui permet d'écrire une minute encore ouverte en plusieurs fois.
+        """
+        if not rows:
+            return None
+        columns = ", ".join(DAILY_STAT_COLUMNS)
+        placeholders = ", ".join("?" for _ in DAILY_STAT_COLUMNS)
+        increments = ", ".join(f"{column} = {column} + excluded.{column}" for column in DAILY_STAT_COLUMNS)
+        self.logger.debug(f"Repository : Écriture de {len(rows)} minute(s) dans minute_stats.")
+        return self._db.submit(
+            lambda conn: conn.executemany(
+                f"INSERT INTO minute_stats (minute, date, {columns}) VALUES (?, ?, {placeholders}) "
+                f"ON CONFLICT(minute) DO UPDATE SET {increments}",
+                list(rows)
+            )
+        )
+
+    def get_minute_stats_between(self, start: str, end: str, resolution: str = 'minute') -> List[Dict[str, Any]]:
+        """
+        Retourne les compteurs agrégés en SQL entre `start` (inclus) et `end` (exclu), bornes au
+        format 'AAAA-MM-JJ[THH[:MM]]'. `resolution` vaut 'minute', 'hour' ou 'day' ; chaque ligne
+        a une clé 'period' tronquée à cette résolution. Les périodes sans données sont absentes.
+        """
+        prefix_length = TIME_SERIES_RESOLUTIONS.get(resolution)
+        if prefix_length is None:
+            raise ValueError(f"Résolution inconnue : '{resolution}'")
+        sums = ", ".join(f"SUM({column}) AS {column}" for column in DAILY_STAT_COLUMNS)
+        query = (
+            f"SELECT substr(minute, 1, {prefix_length}) AS period, {sums} FROM minute_stats "
+            f"WHERE minute >= ? AND minute < ? GROUP BY period ORDER BY period"
+        )
+        with self._db.read_connection() as conn:
+            rows = conn.execute(query, (start, end)).fetchall()
+        return [dict(row) for row in rows]
+
+    def get_daily_totals_from_minutes(self, date_iso: str) -> Optional[Dict[str, Any]]:
+        """Recalcule les compteurs d'un jour à partir de minute_stats (None si aucune minute n'est enregistrée)."""
+        with self._db.read_connection() as conn:
+            return self._daily_totals_from_minutes(conn, date_iso)
+
+    def _daily_totals_from_minutes(self, conn: sqlite3.Connection, date_iso: str) -> Optional[Dict[str, Any]]:
+        sums = ", ".join(f"COALESCE(SUM({column}), 0) AS {column}" for column in DAILY_STAT_COLUMNS)
+        row = conn.execute(
+            f"SELECT COUNT(*) AS minutes, {sums} FROM minute_stats WHERE date = ?", (date_iso,)
+        ).fetchone()
+        if not row or not row['minutes']:
+            return None
+        totals = {column: row[column] for column in DAILY_STAT_COLUMNS}
+        totals['date'] = date_iso
+        return totals
+
+    def rollup_minute_stats_into_daily(self, date_iso: str) -> Optional[Dict[str, Any]]:
+        """
+        Remplace la ligne daily_stats d'un jour par la somme de ses minutes (les totaux globaux
+        sont ajustés du même delta). Sans minute enregistrée pour ce jour, rien n'est modifié.
+        À réserver aux jours révolus : le jour courant est tenu en mémoire par StatsManager.
+        """
+        totals = self._db.execute(self._rollup_minute_stats_command, date_iso)
+        if totals is None:
+            return None
+        self.logger.info(f"Repository : daily_stats du {date_iso} reconstitué depuis minute_stats.")
+        return totals
+
+    def _rollup_minute_stats_command(self, conn: sqlite3.Connection, date_iso: str) -> Optional[Dict[str, Any]]:
+        """Commande d'écriture de rollup_minute_stats_into_daily() (lecture et mise à jour atomiques)."""
+        totals = self._daily_totals_from_minutes(conn, date_iso)
+        if totals is None:
+            return None
+        conn.execute("INSERT OR IGNORE INTO daily_stats (date) VALUES (?)", (date_iso,))
+        self._update_daily_stats_command(conn, totals)
+        return totals
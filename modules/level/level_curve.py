@@ -0,0 +1,77 @@
+# modules/level/level_curve.py
+
+import bisect
+import math
+import threading
+from typing import List, Tuple
+
+class LevelCurve:
+    """
+    Table des seuils cumulés de la courbe de niveaux, en points entiers.
+
+    XP requis pour passer du niveau i au niveau i+1 = base_xp * i ^ exponent.
+    Le seuil `_table[1][k]` est le nombre minimal de points pour atteindre le niveau k+1
+    (le niveau 1 commence à 0). Les sommes sont faites dans le même ordre que l'ancienne
+    boucle, puis arrondies à l'entier supérieur en points : pour des points entiers,
+    `points >= seuil` équivaut exactement à `points / facteur >= xp cumulé`.
+
+    La table est construite une fois puis prolongée à la demande : la recherche
+    d'un niveau est un bisect, quel que soit le niveau atteint. La courbe est partagée
+    entre threads (XPManager, interface, recalcul) : un prolongement construit de nouvelles
+    listes sous verrou puis les publie par une seule affectation du couple `_table`, si bien
+    qu'un lecteur voit toujours deux listes complètes et cohérentes entre elles.
+    """
+    __slots__ = ('base_xp', 'exponent', 'scaling_factor', '_table', '_extend_lock')
+
+    def __init__(self, base_xp: float, exponent: float, scaling_factor: int, initial_levels: int = 64):
+        self.base_xp = base_xp
+        self.exponent = exponent
+        self.scaling_factor = scaling_factor
+        self._table: Tuple[List[float], List[int]] = ([0.0], [0])
+        self._extend_lock = threading.Lock()
+        self._extend_to(initial_levels)
+
+    @classmethod
+    def from_config(cls, config: dict) -> 'LevelCurve':
+        """Construit la courbe à partir du contenu de xp_config.json."""
+        formula = config['leveling_formula']
+        return cls(formula['base_xp'], formula['exponent'], config.get("xp_unit_scaling_factor", 10000))
+
+    def _extend_to(self, level: int) -> Tuple[List[float], List[int]]:
+        """Prolonge la table jusqu'au seuil du niveau `level` inclus et retourne la table publiée."""
+        table = self._table
+        if len(table[1]) >= level:
+            return table
+        with self._extend_lock:
+            table = self._table
+            if len(table[1]) >= level:
+                return table
+            # Copies locales : les listes déjà publiées ne sont jamais modifiées
+            cumulative_xp = list(table[0])
+            thresholds = list(table[1])
+            while len(thresholds) < level:
+                i = len(thresholds)
+                cumulative_xp.append(cumulative_xp[-1] + self.base_xp * (i ** self.exponent))
+                thresholds.append(math.ceil(cumulative_xp[-1] * self.scaling_factor))
+            table = (cumulative_xp, thresholds)
+            self._table = table
+            return table
+
+    def cumulative_xp_for_level(self, level: int) -> float:
+        """XP total requis pour atteindre `level`."""
+        if level <= 1:
+            return 0
+        return self._extend_to(level)[0][level - 1]
+
+    def threshold_for_level(self, level: int) -> int:
+        """Nombre minimal de points (entier) pour atteindre `level`."""
+        if level <= 1:
+            return 0
+        return self._extend_to(level)[1][level - 1]
+
+    def level_for_points(self, points: int) -> int:
+        """Niveau correspondant à un total de points (recherche dichotomique)."""
+        thresholds = self._table[1]
+        while thresholds[-1] <= points:
+            thresholds = self._extend_to(len(thresholds) * 2)[1]
+        return bisect.bisect_right(thresholds, points)
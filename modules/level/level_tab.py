@@ -4,6 +4,10 @@ import tkinter as tk
 from tkinter import ttk
 import logging
 from core.service_locator import service_locator
+from modules.level.xp_repository import XP_SOURCES, LEGACY_SOURCE, REPLAY_SOURCE
+
+# Sources affichées dans la répartition de l'XP (les sources sans points sont masquées)
+BREAKDOWN_SOURCES = XP_SOURCES + (LEGACY_SOURCE, REPLAY_SOURCE)
 
 class LevelTab(ttk.Frame):
     """
@@ -19,8 +23,13 @@ class LevelTab(ttk.Frame):
         self.xp_manager = service_locator.get_service("xp_manager")
         self.event_manager = service_locator.get_service("event_manager")
 
-        # S'abonner à l'événement de level up pour des mises à jour spéciales
-        self.event_manager.subscribe("level_up", self._on_level_up)
+        # S'abonner à l'événement de level up pour des mises à jour spéciales.
+        # Référence faible : l'abonnement disparaît avec l'onglet.
+        self._level_up_subscription = self.event_manager.subscribe("level_up", self._on_level_up, weak=True)
+        self._recompute_subscription = self.event_manager.subscribe("xp_recompute_finished", self._on_xp_recomputed, weak=True)
+        self._recompute_progress_subscription = self.event_manager.subscribe(
+            "xp_recompute_progress", self._on_xp_recompute_progress, weak=True
+        )
 
         self.columnconfigure(0, weight=1)
 
@@ -31,7 +40,7 @@ class LevelTab(ttk.Frame):
         """Crée et positionne tous les widgets de l'onglet avec un style personnalisé."""
         # --- Configuration de la grille pour centrer le contenu verticalement ---
         self.grid_rowconfigure(0, weight=1)
-        self.grid_rowconfigure(4, weight=1)
+        self.grid_rowconfigure(6, weight=1)
         self.grid_columnconfigure(0, weight=1)
 
         # --- Variables de contrôle pour les labels ---
@@ -69,6 +78,25 @@ class LevelTab(ttk.Frame):
         xp_text_label = ttk.Label(self, textvariable=self.xp_var, anchor="center")
         xp_text_label.grid(row=3, column=0, sticky="ew")
 
+        # Répartition de l'XP par source (registre xp_ledger)
+        self.breakdown_frame = ttk.LabelFrame(self)
+        self.breakdown_frame.grid(row=4, column=0, padx=50, pady=(20, 0), sticky="ew")
+        self.breakdown_frame.columnconfigure(1, weight=1)
+        self.breakdown_name_labels = {}
+        self.breakdown_vars = {}
+        self.breakdown_value_labels = {}
+        for i, source in enumerate(BREAKDOWN_SOURCES):
+            self.breakdown_name_labels[source] = ttk.Label(self.breakdown_frame)
+            self.breakdown_vars[source] = tk.StringVar(value="...")
+            self.breakdown_value_labels[source] = ttk.Label(self.breakdown_frame, textvariable=self.breakdown_vars[source], anchor="e")
+        self._update_breakdown_texts()
+
+        # Avancement d'un recalcul de l'XP depuis l'historique, masqué le reste du temps
+        self.recompute_var = tk.StringVar(value="")
+        self.recompute_label = ttk.Label(self, textvariable=self.recompute_var, anchor="center")
+        self.recompute_label.grid(row=5, column=0, pady=(10, 0), sticky="ew")
+        self.recompute_label.grid_remove()
+
     def update_display(self):
         """
         Met à jour les widgets de l'onglet avec les dernières données de XPManager.
@@ -87,18 +115,75 @@ class LevelTab(ttk.Frame):
         self.xp_var.set(details['current_xp_str'])
         
         self.progress_bar['value'] = details['progress_percentage']
+
+        self._update_breakdown(self.xp_manager.get_xp_breakdown())
+
+    def _update_breakdown(self, breakdown: dict):
+        """Affiche l'XP de chaque source ayant rapporté des points, dans l'ordre de BREAKDOWN_SOURCES."""
+        row = 0
+        for source in BREAKDOWN_SOURCES:
+            name_label = self.breakdown_name_labels[source]
+            value_label = self.breakdown_value_labels[source]
+            xp = breakdown.get(source, 0)
+            if xp <= 0:
+                name_label.grid_remove()
+                value_label.grid_remove()
+                continue
+            self.breakdown_vars[source].set(f"{xp:,.0f} XP")
+            name_label.grid(row=row, column=0, sticky="w", padx=(10, 20))
+            value_label.grid(row=row, column=1, sticky="e", padx=(0, 10))
+            row += 1
+
+    def _update_breakdown_texts(self):
+        """Met à jour le titre et les noms des sources de la répartition de l'XP."""
+        self.breakdown_frame.config(text=self.language_manager.get_text('xp_breakdown_title', "XP by source"))
+        for source, label in self.breakdown_name_labels.items():
+            label.config(text=self.language_manager.get_text(f'xp_source_{source}', source))
         
     def _on_level_up(self, new_level: int):
         """
-        Callback pour l'événement 'level_up'.
+        Callback pour l'événement 'level_up', appelé sur le thread de distribution des événements :
+        Tkinter n'étant pas thread-safe, le rafraîchissement est confié à la boucle principale.
         """
         # À FAIRE : Gérer l'affichage d'une notification de level up
         self.logger.info(f"Événement 'level_up' reçu. Nouveau niveau : {new_level}")
-        self.update_display()
+        self.after(0, self.update_display)
+
+    def _on_xp_recomputed(self, old_total: int, new_total: int):
+        """
+        Callback pour l'événement 'xp_recompute_finished' (thread de recalcul) : niveau et répartition
+        ont changé, le rafraîchissement est confié à la boucle principale de Tkinter.
+        """
+        self.logger.info(f"Événement 'xp_recompute_finished' reçu ({old_total} -> {new_total} points).")
+        self.after(0, self._show_recompute_progress, 1, 1)
+        self.after(0, self.update_display)
+
+    def _on_xp_recompute_progress(self, done: int, total: int):
+        """
+        Callback pour l'événement 'xp_recompute_progress' (thread de distribution, publications
+        fusionnées) : l'affichage de l'avancement est confié à la boucle principale de Tkinter.
+        """
+        self.after(0, self._show_recompute_progress, done, total)
+
+    def _show_recompute_progress(self, done: int, total: int):
+        """Affiche l'avancement du recalcul tant qu'il n'est pas terminé, puis masque le label."""
+        if total <= 0 or done >= total:
+            self.recompute_label.grid_remove()
+            return
+        text = self.language_manager.get_text('xp_recompute_progress', "Recalculating XP from history:")
+        self.recompute_var.set(f"{text} {done * 100 / total:.0f} %")
+        self.recompute_label.grid()
+
+    def destroy(self):
+        """Se désabonne des événements avant la destruction du widget."""
+        self._level_up_subscription.unsubscribe()
+        self._recompute_subscription.unsubscribe()
+        self._recompute_progress_subscription.unsubscribe()
+        super().destroy()
 
     def on_language_change(self):
         """
         Méthode pour mettre à jour les textes lors d'un changement de langue.
         """
-        # La méthode update_display récupère déjà le texte traduit, il suffit de l'appeler.
+        self._update_breakdown_texts()
         self.update_display()
\ No newline at end of file
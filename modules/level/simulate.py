@@ -0,0 +1,203 @@
+# modules/level/simulate.py
+
+"""
+Simulateur de progression et banc d'essai du système d'XP.
+
+Une journée type (profil d'utilisation) est jouée événement par événement à travers les
+callbacks d'un vrai XPManager, avec le xp_config.json courant : les points obtenus tiennent
+compte du seuil d'attribution des pixels exactement comme en fonctionnement. La progression
+est ensuite déroulée jour par jour via _check_for_level_up, et les passages de niveau sont
+relevés sur l'événement 'level_up'.
+
+Usage :
+    python -m modules.level.simulate [--pixels N] [--left-clicks N] [--right-clicks N]
+                                     [--middle-clicks N] [--active-seconds N] [--years N]
+                                     [--config CHEMIN] [--iterations N]
+
+Les écritures de l'XPManager vont dans une base temporaire : stats.db n'est jamais modifiée.
+"""
+
+import argparse
+import json
+import math
+import os
+import sys
+import tempfile
+import time
+import timeit
+from typing import Dict, List
+
+from pynput.mouse import Button
+
+import config.app_config as app_config
+from core.database import Database
+from core.event_manager import event_manager
+from core.service_locator import service_locator
+from modules.level.xp_manager import XPManager
+
+# Profil par défaut : une journée de travail de 4 heures d'activité
+DEFAULT_PROFILE = {
+    'pixels': 1_500_000,
+    'left_clicks': 3_000,
+    'right_clicks': 300,
+    'middle_clicks': 20,
+    'active_seconds': 4 * 3600,
+}
+
+# Niveaux du tableau « jours pour atteindre » et niveaux du banc d'essai
+MILESTONE_LEVELS = (2, 5, 10, 20, 30, 50, 75, 100, 150, 200, 500, 1000)
+BENCHMARK_LEVELS = (1, 100, 10_000)
+
+class _StaticConfig:
+    """
+    Accès en lecture à app_config.py pour l'XPManager simulé, sans PreferenceManager
+    (user_preferences.ini n'est pas touché). Rechargement à chaud et recalcul sont désactivés.
+    """
+    _OVERRIDES = {'XP_CONFIG_WATCH_ENABLED': False, 'XP_RECOMPUTE_ON_RATES_CHANGE': False}
+
+    def get_app_config(self, key: str, default=None):
+        if key in self._OVERRIDES:
+            return self._OVERRIDES[key]
+        return getattr(app_config, key, default)
+
+def _play_day(xp_manager: XPManager, profile: Dict[str, int]) -> Dict[str, float]:
+    """
+    Joue une journée du profil à travers les callbacks de l'XPManager (les mouvements sont
+    répartis sur les secondes actives, comme des deltas du MovementAggregator) et retourne
+    le coût CPU moyen par type d'événement, en nanosecondes.
+    """
+    active_seconds = max(1, profile['active_seconds'])
+    delta = profile['pixels'] / active_seconds
+    timings = {}
+
+    start = time.perf_counter_ns()
+    for _ in range(active_seconds):
+        xp_manager._on_movement_delta(delta)
+    timings['movement_delta'] = (time.perf_counter_ns() - start) / active_seconds
+
+    for button, key in ((Button.left, 'left_clicks'), (Button.right, 'right_clicks'), (Button.middle, 'middle_clicks')):
+        count = profile[key]
+        start = time.perf_counter_ns()
+        for _ in range(count):
+            xp_manager._on_mouse_clicked(button)
+        if count:
+            timings[f'mouse_clicked ({button.name})'] = (time.perf_counter_ns() - start) / count
+
+    start = time.perf_counter_ns()
+    for _ in range(profile['active_seconds']):
+        xp_manager._on_activity_tick('active')
+    if profile['active_seconds']:
+        timings['activity_tick'] = (time.perf_counter_ns() - start) / profile['active_seconds']
+    return timings
+
+def _simulate_progression(xp_manager: XPManager, points_per_day: int, days: int) -> Dict[int, int]:
+    """Déroule `days` jours à points constants ; retourne {niveau: jour où il est atteint}."""
+    reached: Dict[int, int] = {}
+    day = 0
+
+    def on_level_up(new_level: int):
+        # Plusieurs niveaux peuvent être franchis le même jour
+        for level in range(max(reached, default=1) + 1, new_level + 1):
+            reached[level] = day
+
+    subscription = event_manager.subscribe('level_up', on_level_up)
+    try:
+        for day in range(1, days + 1):
+            xp_manager.total_points += points_per_day
+            xp_manager._check_for_level_up()
+    finally:
+        subscription.unsubscribe()
+    return reached
+
+def _benchmark_levels(xp_manager: XPManager, levels, iterations: int) -> List[Dict[str, float]]:
+    """Mesure _check_for_level_up (chemin sans passage de niveau) et get_level_details à chaque niveau."""
+    results = []
+    curve = xp_manager.rates.level_curve
+    for level in levels:
+        xp_manager.total_points = curve.threshold_for_level(level)
+        xp_manager._initialize_level()
+        check_s = min(timeit.repeat(xp_manager._check_for_level_up, number=iterations, repeat=5))
+        details_s = min(timeit.repeat(xp_manager.get_level_details, number=iterations, repeat=5))
+        results.append({
+            'level': xp_manager.current_level,
+            'check_ns': check_s / iterations * 1e9,
+            'details_ns': details_s / iterations * 1e9,
+        })
+    return results
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m modules.level.simulate", description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pixels", type=int, default=DEFAULT_PROFILE['pixels'], help="Pixels parcourus par jour.")
+    parser.add_argument("--left-clicks", type=int, default=DEFAULT_PROFILE['left_clicks'], help="Clics gauches par jour.")
+    parser.add_argument("--right-clicks", type=int, default=DEFAULT_PROFILE['right_clicks'], help="Clics droits par jour.")
+    parser.add_argument("--middle-clicks", type=int, default=DEFAULT_PROFILE['middle_clicks'], help="Clics milieu par jour.")
+    parser.add_argument("--active-seconds", type=int, default=DEFAULT_PROFILE['active_seconds'], help="Secondes actives par jour.")
+    parser.add_argument("--years", type=int, default=10, help="Durée simulée, en années.")
+    parser.add_argument("--config", help="Autre fichier xp_config.json à simuler (par défaut : celui de l'application).")
+    parser.add_argument("--iterations", type=int, default=100_000, help="Itérations par mesure du banc d'essai.")
+    args = parser.parse_args(argv)
+
+    profile = {
+        'pixels': args.pixels, 'left_clicks': args.left_clicks, 'right_clicks': args.right_clicks,
+        'middle_clicks': args.middle_clicks, 'active_seconds': args.active_seconds,
+    }
+
+    with tempfile.TemporaryDirectory() as directory:
+        database = Database(os.path.join(directory, "simulation.db"))
+        service_locator.register_service("database", database)
+        service_locator.register_service("config_manager", _StaticConfig())
+        try:
+            xp_manager = XPManager(event_manager)
+            if args.config:
+                with open(args.config, 'r') as f:
+                    xp_manager._on_config_reloaded(json.load(f))
+            scaling_factor = xp_manager.rates.scaling_factor
+
+            # --- Journée type, jouée événement par événement ---
+            timings = _play_day(xp_manager, profile)
+            points_per_day = xp_manager.total_points
+            if points_per_day <= 0:
+                print("Le profil ne rapporte aucun point : rien à simuler.")
+                return 1
+
+            print(f"Profil : {profile}")
+            print(f"Gain quotidien : {points_per_day / scaling_factor:,.1f} XP ({points_per_day:,} points)")
+            for source, xp in sorted(xp_manager.get_xp_breakdown().items()):
+                print(f"  {source:<13} {xp:>12,.1f} XP ({xp * scaling_factor / points_per_day:6.1%})")
+
+            # --- Progression ---
+            days = args.years * 365
+            xp_manager.total_points = 0
+            xp_manager._initialize_level()
+            reached = _simulate_progression(xp_manager, points_per_day, days)
+
+            print(f"\nProgression sur {args.years} an(s) : niveau {xp_manager.current_level} atteint.")
+            print(f"{'niveau':>8} | {'XP cumulé':>16} | {'jours':>8} | {'années':>7}")
+            curve = xp_manager.rates.level_curve
+            for level in MILESTONE_LEVELS:
+                if level in reached:
+                    day = reached[level]
+                else:
+                    # Hors de la durée simulée : projection à gain constant
+                    day = math.ceil(curve.threshold_for_level(level) / points_per_day)
+                marker = "" if level in reached else " *"
+                print(f"{level:>8} | {curve.cumulative_xp_for_level(level):>16,.0f} | {day:>8,} | {day / 365:>7.1f}{marker}")
+            print("  * projection au-delà de la durée simulée")
+
+            # --- Coût CPU par événement ---
+            print("\nCoût CPU moyen par événement (journée type) :")
+            for event_name, ns in timings.items():
+                print(f"  {event_name:<22} {ns:>8,.0f} ns")
+
+            # --- Banc d'essai des méthodes de niveau ---
+            print(f"\nBanc d'essai ({args.iterations:,} itérations, meilleur de 5) :")
+            print(f"{'niveau':>8} | {'_check_for_level_up':>20} | {'get_level_details':>18}")
+            for result in _benchmark_levels(xp_manager, BENCHMARK_LEVELS, args.iterations):
+                print(f"{result['level']:>8,} | {result['check_ns']:>17,.0f} ns | {result['details_ns']:>15,.0f} ns")
+        finally:
+            database.close()
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,55 @@
+# modules/level/xp_config_watcher.py
+
+import json
+import logging
+import os
+import threading
+from typing import Callable
+
+logger = logging.getLogger(__name__)
+
+class XPConfigWatcher(threading.Thread):
+    """
+    Surveille xp_config.json (par scrutation de sa date de modification) et transmet
+    la nouvelle configuration au callback à chaque changement. Un fichier invalide
+    (JSON incorrect, clé manquante) est ignoré : l'ancienne configuration reste active
+    jusqu'à la modification suivante. Une erreur levée par le callback est journalisée
+    sans interrompre la surveillance.
+    """
+    def __init__(self, config_path: str, on_change: Callable[[dict], None], interval_seconds: float = 2.0):
+        super().__init__(daemon=True, name="XPConfigWatcher")
+        self.config_path = config_path
+        self._on_change = on_change
+        self.interval_seconds = interval_seconds
+        self._stop_event = threading.Event()
+        self._last_mtime = self._get_mtime()
+
+    def _get_mtime(self):
+        try:
+            return os.stat(self.config_path).st_mtime_ns
+        except OSError:
+            return None
+
+    def run(self):
+        """Boucle principale du thread : recharge le fichier quand sa date de modification change."""
+        logger.info(f"Surveillance de {self.config_path} démarrée.")
+        while not self._stop_event.wait(self.interval_seconds):
+            mtime = self._get_mtime()
+            if mtime is None or mtime == self._last_mtime:
+                continue
+            # Mémorisée même en cas d'échec : la prochaine tentative aura lieu à la prochaine modification
+            self._last_mtime = mtime
+            try:
+                with open(self.config_path, 'r') as f:
+                    config = json.load(f)
+                self._on_change(config)
+            except (OSError, ValueError, KeyError, TypeError) as e:
+                logger.warning(f"Rechargement de {self.config_path} impossible, configuration précédente conservée : {e}")
+            except Exception as e:
+                # Le thread ne doit pas mourir : la surveillance reprend à la modification suivante
+                logger.error(f"Erreur inattendue lors du rechargement de {self.config_path} : {e}", exc_info=True)
+        logger.info("Le thread XPConfigWatcher s'est arrêté proprement.")
+
+    def stop(self):
+        """Signale au thread de s'arrêter."""
+        self._stop_event.set()
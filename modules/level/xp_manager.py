@@ -2,140 +2,315 @@
 
 import os
 import json
+import datetime
 import logging
-from threading import Timer
-from typing import Optional
+import threading
+from dataclasses import dataclass
+from typing import Callable, Dict, Optional, Tuple
 from pynput.mouse import Button
 
 from utils.paths import resource_path
-from utils.math_utils import calculate_distance
-from modules.level.xp_repository import XPRepository
+from modules.level.xp_repository import XPRepository, XP_SOURCES
+from modules.level.xp_rates import XPRates
+from modules.level.xp_config_watcher import XPConfigWatcher
+from modules.level.xp_recompute import (
+    XP_RATES_FINGERPRINT_SETTING, XPRecomputeWorker, compute_points_by_source, ledger_rows, rates_fingerprint
+)
 from core.service_locator import service_locator
 
 logger = logging.getLogger(__name__)
 
+# Nom du bouton pynput -> source du registre XP
+_CLICK_SOURCES = {'left': 'left_click', 'right': 'right_click', 'middle': 'middle_click'}
+
+@dataclass(frozen=True, slots=True)
+class _LevelState:
+    """
+    Taux compilés, niveau courant et seuil (en points) du niveau suivant, publiés ensemble :
+    un lecteur qui ne lit que cette référence ne voit jamais un niveau et un seuil désaccordés.
+    """
+    rates: XPRates
+    level: int
+    next_level_threshold: int
+
+    @classmethod
+    def for_points(cls, rates: XPRates, points: int) -> '_LevelState':
+        level = rates.level_curve.level_for_points(points)
+        return cls(rates, level, rates.level_curve.threshold_for_level(level + 1))
+
 class XPManager:
     """
     Gère toute la logique de gain d'XP et de calcul des niveaux.
+    Les points gagnés sont comptés en mémoire par source ; à chaque 'flush_requested',
+    la différence avec la dernière écriture est ajoutée au registre xp_ledger du jour.
+
+    Verrous : _ledger_lock sérialise les écritures du registre et reste détenu pendant l'attente
+    du thread d'écriture ; _points_lock ne protège que de courtes opérations en mémoire sur les
+    compteurs (total_points, _earned) et sur la part déjà écrite (_persisted_earned,
+    _ledger_totals). Les lectures (get_xp_breakdown) ne prennent que _points_lock et n'attendent
+    donc jamais l'écrivain. Ordre d'acquisition : _ledger_lock puis _points_lock.
     """
     def __init__(self, event_manager):
         self._event_manager = event_manager
-        self._repository = XPRepository()
+        self._repository = XPRepository(service_locator.get_service("database"))
         self.config_manager = service_locator.get_service("config_manager")
         self._load_config()
+        self._config_watcher = None
+        self._recompute_worker = None
         
         # Attributs pour le suivi en temps réel
         self.total_points = self._repository.get_total_points()
-        self.current_level = 0
+        # Génération du registre en BDD, incrémentée à chaque recalcul (voir StateJournal)
+        self.ledger_generation = self._repository.get_ledger_generation()
         self.accumulated_pixels = 0.0
-        self.last_x: Optional[int] = None
-        self.last_y: Optional[int] = None
-        
-        self._save_timer = None
+        # Taux, courbe et niveau : remplacés d'un bloc lors d'un rechargement de xp_config.json
+        self._level_state = _LevelState.for_points(XPRates.compile(self.config), self.total_points)
 
-        # Initialisation du niveau de départ
-        self._initialize_level()
+        # Registre : points gagnés depuis le lancement par source, et part déjà écrite en BDD
+        self._earned: Dict[str, int] = dict.fromkeys(XP_SOURCES, 0)
+        self._persisted_earned: Dict[str, int] = dict(self._earned)
+        self._ledger_date = datetime.date.today().isoformat()
+        self._ledger_lock = threading.Lock()
+        self._points_lock = threading.Lock()
+        # Répartition par source déjà en BDD, lue une fois puis tenue à jour à chaque écriture
+        self._ledger_totals: Dict[str, int] = self._repository.get_points_by_source()
+
+        logger.info(f"Niveau initial de l'utilisateur : {self.current_level}")
 
     def _load_config(self):
         """Charge la configuration depuis xp_config.json."""
         relative_path_to_config = os.path.join("modules", "level", "xp_config.json")
-        config_path = resource_path(relative_path_to_config)
-        with open(config_path, 'r') as f:
+        self._config_path = resource_path(relative_path_to_config)
+        with open(self._config_path, 'r') as f:
             self.config = json.load(f)
 
+    def _on_config_reloaded(self, config: dict):
+        """
+        Appelée par le XPConfigWatcher : compile la nouvelle configuration, recalcule le niveau
+        sur la nouvelle courbe, puis substitue taux, niveau et seuil d'un bloc (sous _points_lock,
+        comme les gains) sans publier 'level_up'.
+        """
+        rates = XPRates.compile(config)
+        with self._points_lock:
+            previous_level = self.current_level
+            self._level_state = _LevelState.for_points(rates, self.total_points)
+        self.config = config
+        logger.info(f"xp_config.json rechargé (niveau {previous_level} -> {self.current_level}).")
+        self._check_rates_fingerprint()
+
+    @property
+    def rates(self) -> XPRates:
+        """Taux et courbe compilés actuellement en vigueur."""
+        return self._level_state.rates
+
+    @property
+    def current_level(self) -> int:
+        """Niveau courant (dernier niveau publié)."""
+        return self._level_state.level
+
     def start(self):
-        """Démarre le manager : s'abonne aux événements et lance le timer de sauvegarde."""
-        self._event_manager.subscribe('mouse_moved', self._on_mouse_moved)
+        """Démarre le manager : s'abonne aux événements et au cycle d'écriture différée."""
+        self._event_manager.subscribe('movement_delta', self._on_movement_delta)
         self._event_manager.subscribe('mouse_clicked', self._on_mouse_clicked)
         self._event_manager.subscribe('activity_tick', self._on_activity_tick)
+        self._event_manager.subscribe('flush_requested', self._on_flush_requested)
+        self._event_manager.subscribe('day_changed', self._on_day_changed)
         
-        self._schedule_next_save()
+        if self.config_manager.get_app_config('XP_CONFIG_WATCH_ENABLED', False):
+            self._config_watcher = XPConfigWatcher(
+                self._config_path, self._on_config_reloaded,
+                self.config_manager.get_app_config('XP_CONFIG_WATCH_INTERVAL_SECONDS', 2)
+            )
+            self._config_watcher.start()
+        self._check_rates_fingerprint()
         logger.info("XPManager démarré.")
 
     def stop(self):
-        """Arrête le manager : sauvegarde finale et arrêt du timer."""
-        if self._save_timer:
-            self._save_timer.cancel()
+        """Arrête le manager : sauvegarde finale du registre."""
+        if self._config_watcher:
+            self._config_watcher.stop()
+        if self._recompute_worker and self._recompute_worker.is_alive():
+            self._recompute_worker.join()
         self.save_progress()
-        self._repository.close()
         logger.info("XPManager arrêté.")
 
-    def save_progress(self):
-        """Sauvegarde la progression actuelle dans la base de données."""
-        self._repository.save_total_points(self.total_points)
+    def save_progress(self) -> bool:
+        """
+        Ajoute au registre du jour les points gagnés depuis la dernière écriture (par source) ;
+        total_points est incrémenté dans la même transaction. Retourne True si une écriture a eu lieu.
+        """
+        with self._ledger_lock:
+            return self._save_progress_locked()
 
-    def _schedule_next_save(self):
-        """Planifie la prochaine sauvegarde automatique."""
-        save_interval = self.config_manager.get_app_config('XP_SAVE_INTERVAL_SECONDS', 3600)
-        self._save_timer = Timer(save_interval, self._periodic_save)
-        self._save_timer.daemon = True
-        self._save_timer.start()
+    def _save_progress_locked(self) -> bool:
+        """
+        Corps de save_progress ; l'appelant détient _ledger_lock. _points_lock n'est pas détenu
+        pendant l'attente du thread d'écriture : la part écrite et la répartition en BDD ne sont
+        substituées, d'un bloc, qu'une fois l'écriture validée.
+        """
+        with self._points_lock:
+            snapshot = dict(self._earned)
+            persisted = self._persisted_earned
+        deltas = {source: snapshot[source] - persisted[source] for source in XP_SOURCES}
+        future = self._repository.add_ledger_points(self._ledger_date, deltas)
+        if future is None:
+            return False
+        future.result()
+        ledger_totals = dict(self._ledger_totals)
+        for source, points in deltas.items():
+            ledger_totals[source] = ledger_totals.get(source, 0) + points
+        with self._points_lock:
+            self._persisted_earned = snapshot
+            self._ledger_totals = ledger_totals
+        return True
 
-    def _periodic_save(self):
-        """Méthode appelée par le timer pour sauvegarder périodiquement."""
+    def _on_flush_requested(self, **kwargs):
+        """Écrit le registre XP sur le cycle d'écriture différée partagé."""
         self.save_progress()
-        self._schedule_next_save()
+
+    def _on_day_changed(self, old_date: str, new_date: str):
+        """Clôt le registre de la veille puis attribue les points suivants au nouveau jour."""
+        # Écriture et bascule sous le même verrou : aucun cycle d'écriture ne s'intercale entre les deux
+        with self._ledger_lock:
+            self._save_progress_locked()
+            self._ledger_date = new_date
+
+    def get_xp_breakdown(self) -> Dict[str, float]:
+        """
+        Retourne l'XP total par source (registre en BDD + points non encore écrits),
+        sans requête : la répartition en BDD est tenue à jour en mémoire. Ne prend que
+        _points_lock : une écriture en attente du thread d'écriture ne la bloque pas.
+        """
+        with self._points_lock:
+            points = dict(self._ledger_totals)
+            persisted = self._persisted_earned
+            earned = dict(self._earned)
+        for source in XP_SOURCES:
+            points[source] = points.get(source, 0) + earned[source] - persisted[source]
+        scaling_factor = self.rates.scaling_factor
+        return {source: value / scaling_factor for source, value in points.items() if value}
+
+    # --- Recalcul depuis l'historique ---
+
+    def _check_rates_fingerprint(self):
+        """
+        Compare l'empreinte des taux actuels à celle de l'historique et lance un recalcul si elles
+        diffèrent. Sans empreinte enregistrée (première exécution), l'historique est réputé
+        crédité avec les taux actuels.
+        """
+        if not self.config_manager.get_app_config('XP_RECOMPUTE_ON_RATES_CHANGE', False):
+            return
+        stats_repository = service_locator.get_service("stats_manager").stats_repository
+        stored = stats_repository.get_app_setting(XP_RATES_FINGERPRINT_SETTING)
+        current = rates_fingerprint(self.rates)
+        if stored is None:
+            stats_repository.set_app_setting(XP_RATES_FINGERPRINT_SETTING, current)
+        elif stored != current:
+            logger.info("Les taux de gain d'XP ont changé : recalcul de l'historique.")
+            self.request_recompute()
+
+    def request_recompute(self) -> bool:
+        """Lance le recalcul de l'XP en arrière-plan ; retourne False si un recalcul est déjà en cours."""
+        if self._recompute_worker and self._recompute_worker.is_alive():
+            return False
+        self._recompute_worker = XPRecomputeWorker(self, self._event_manager)
+        self._recompute_worker.start()
+        return True
+
+    def recompute_from_history(self, rates: XPRates,
+                               on_progress: Optional[Callable[[int, int], None]] = None) -> Tuple[int, int]:
+        """
+        Recalcule le registre XP à partir de daily_stats avec `rates`, puis remplace le registre
+        et total_points en une seule transaction. Retourne (ancien total, nouveau total) en points.
+
+        Les statistiques et les points en mémoire sont d'abord écrits. Le calcul se fait hors de
+        tout verrou ; _ledger_lock n'est pris que pour lire l'historique et pour le remplacement
+        final, dont l'attente ne bloque pas les lecteurs (voir _save_progress_locked). Les points écrits par un cycle pendant le calcul sont effacés par le remplacement :
+        la référence _persisted_earned revient donc à sa valeur au moment de la lecture, et ces
+        points, comme ceux gagnés pendant le calcul, seront ajoutés au registre au cycle suivant.
+        """
+        stats_manager = service_locator.get_service("stats_manager")
+        chunk_days = max(1, int(self.config_manager.get_app_config('XP_RECOMPUTE_CHUNK_DAYS', 366)))
+        stats_manager.save_changes()
+        with self._ledger_lock:
+            self._save_progress_locked()
+            series = stats_manager.stats_repository.get_daily_stats_series()
+            with self._points_lock:
+                persisted_at_read = self._persisted_earned
+                old_total = sum(self._ledger_totals.values())
+
+        rows = []
+        for start in range(0, len(series), chunk_days):
+            stop = min(start + chunk_days, len(series))
+            rows.extend(ledger_rows(series.periods[start:stop], compute_points_by_source(rates, series.columns, start, stop)))
+            if on_progress:
+                on_progress(stop, len(series))
+
+        with self._ledger_lock:
+            new_totals, generation = self._repository.replace_ledger(rows).result()
+            new_total = sum(new_totals.values())
+            with self._points_lock:
+                self._ledger_totals = new_totals
+                self._persisted_earned = persisted_at_read
+                # Décalage plutôt qu'affectation : les points gagnés en mémoire depuis la lecture sont conservés
+                self.total_points += new_total - old_total
+                # Après total_points : qui lit la nouvelle génération lit aussi le nouveau total
+                self.ledger_generation = generation
+                self._initialize_level()
+        # Hors transaction : une interruption ici ne fait que relancer un recalcul idempotent
+        stats_manager.stats_repository.set_app_setting(XP_RATES_FINGERPRINT_SETTING, rates_fingerprint(rates)).result()
+        return old_total, new_total
 
     # --- Logique de gain de points ---
 
-    def _on_mouse_moved(self, x: int, y: int, **kwargs):
-        """Appelée par l'EventManager lorsque la souris bouge."""
-        if self.last_x is not None and self.last_y is not None:
-            distance = calculate_distance((self.last_x, self.last_y), (x, y))
-            self.accumulated_pixels += distance
-        
-        self.last_x, self.last_y = x, y
+    def _on_movement_delta(self, distance: float, **kwargs):
+        """Appelée par l'EventManager avec la distance calculée par le MovementAggregator."""
+        self.accumulated_pixels += distance
+        self._award_accumulated_pixels()
 
-        # On lit le seuil depuis le fichier de configuration.
-        pixel_award_threshold = self.config.get("pixel_award_threshold", 1000)
+    def _award_accumulated_pixels(self):
+        """Convertit les pixels accumulés en points une fois le seuil atteint."""
+        # Une seule lecture de l'objet compilé : seuil et taux proviennent du même chargement
+        rates = self.rates
 
-        if self.accumulated_pixels >= pixel_award_threshold:
-            points_to_add = int(self.accumulated_pixels) * self.config['xp_gain_rates_scaled']['per_pixel']
-            self.total_points += points_to_add
+        if self.accumulated_pixels >= rates.pixel_award_threshold:
+            points_to_add = int(self.accumulated_pixels) * rates.per_pixel
             self.accumulated_pixels = 0.0
+            self._add_points('distance', points_to_add)
 
             logger.debug(f"Mouvement: +{points_to_add} points. Total = {self.total_points}")
-            
-            self._check_for_level_up()
 
     def _on_mouse_clicked(self, button: Button, **kwargs):
         """Appelée par l'EventManager lors d'un clic de souris."""
-        button_to_config_key = {
-            Button.left: 'per_left_click',
-            Button.right: 'per_right_click',
-            Button.middle: 'per_middle_click'
-        }
-        config_key = button_to_config_key.get(button)
+        button_name = getattr(button, 'name', None)
+        points_to_add = self.rates.points_per_button.get(button_name)
         
-        if config_key:
-            points_to_add = self.config['xp_gain_rates_scaled'].get(config_key, 0)
-            self.total_points += points_to_add
+        if points_to_add is not None:
+            self._add_points(_CLICK_SOURCES[button_name], points_to_add)
                         
             logger.debug(f"Clic '{button.name}': +{points_to_add} points. Total = {self.total_points}")
 
-            self._check_for_level_up()
-
     def _on_activity_tick(self, status: str, **kwargs):
         """Appelée par l'EventManager chaque seconde d'activité."""
         if status == 'active':
-            points_to_add = self.config['xp_gain_rates_scaled']['per_active_second']
-            self.total_points += points_to_add
-            self._check_for_level_up()
+            self._add_points('active_time', self.rates.per_active_second)
+
+    def _add_points(self, source: str, points: int):
+        """
+        Crédite `points` à `source` puis vérifie le passage de niveau. Seules les deux additions
+        sont faites sous _points_lock : les gains des différents threads et le décalage d'un
+        recalcul ne s'écrasent pas. La vérification du niveau se fait hors verrou.
+        """
+        with self._points_lock:
+            self.total_points += points
+            self._earned[source] += points
+        self._check_for_level_up()
     
     # --- Logique de calcul de niveau ---
 
     def _get_cumulative_xp_for_level(self, level: int) -> float:
-        """Outil interne pour calculer le total d'XP requis pour atteindre un niveau donné."""
-        if level <= 1:
-            return 0
-        
-        base_xp = self.config['leveling_formula']['base_xp']
-        exponent = self.config['leveling_formula']['exponent']
-        
-        total_xp_needed = 0
-        for i in range(1, level):
-            total_xp_needed += base_xp * (i ** exponent)
-        return total_xp_needed
+        """Outil interne pour obtenir le total d'XP requis pour atteindre un niveau donné."""
+        return self.rates.level_curve.cumulative_xp_for_level(level)
 
     def get_level_details(self) -> dict:
         """
@@ -143,16 +318,19 @@ class XPManager:
         nécessaires à l'affichage de la progression de l'utilisateur.
         C'est la méthode publique que l'interface (LevelTab) appellera.
         """
+        # Une seule lecture de l'objet compilé : courbe et facteur d'échelle du même chargement
+        rates = self.rates
+        total_points = self.total_points
+
         # Conversion des points en XP
-        scaling_factor = self.config.get("xp_unit_scaling_factor", 10000)
-        current_xp = self.total_points / scaling_factor
+        current_xp = total_points / rates.scaling_factor
         
         # Détermination du niveau actuel
-        level = self._get_level_from_points(self.total_points)
+        level = rates.level_curve.level_for_points(total_points)
 
         # Calcul des seuils d'XP pour le niveau actuel et le suivant
-        xp_start_of_current_level = self._get_cumulative_xp_for_level(level)
-        xp_to_reach_next_level = self._get_cumulative_xp_for_level(level + 1)
+        xp_start_of_current_level = rates.level_curve.cumulative_xp_for_level(level)
+        xp_to_reach_next_level = rates.level_curve.cumulative_xp_for_level(level + 1)
         
         # Calcul de la progression dans le niveau actuel
         xp_span_for_this_level = xp_to_reach_next_level - xp_start_of_current_level
@@ -167,34 +345,43 @@ class XPManager:
         }
 
     def _get_level_from_points(self, points: int) -> int:
-        """Calcule le niveau correspondant à un certain nombre de points."""
-        scaling_factor = self.config.get("xp_unit_scaling_factor", 10000)
-        current_xp = points / scaling_factor
-
-        base_xp = self.config['leveling_formula']['base_xp']
-        exponent = self.config['leveling_formula']['exponent']
-        
-        level = 1
-        total_xp_for_level_up = 0
-        while True:
-            xp_to_reach_next_level = base_xp * (level ** exponent)
-            total_xp_for_level_up += xp_to_reach_next_level
-            
-            if current_xp < total_xp_for_level_up:
-                return level
-            
-            level += 1
+        """Calcule le niveau correspondant à un certain nombre de points (bisect sur la table des seuils)."""
+        return self.rates.level_curve.level_for_points(points)
 
     def _initialize_level(self):
-        """Calcule le niveau de départ de l'utilisateur sans déclencher d'événement."""
-        self.current_level = self._get_level_from_points(self.total_points)
+        """
+        Recalcule le niveau à partir de total_points sans déclencher d'événement. L'appelant
+        détient _points_lock s'il peut être concurrent des gains (recalcul depuis l'historique).
+        """
+        self._level_state = _LevelState.for_points(self.rates, self.total_points)
         logger.info(f"Niveau initial de l'utilisateur : {self.current_level}")
 
     def _check_for_level_up(self):
-        """Vérifie si le total de points actuel résulte en un changement de niveau."""
-        calculated_level = self._get_level_from_points(self.total_points)
+        """
+        Vérifie si le total de points actuel résulte en un changement de niveau et publie 'level_up'.
+        Chemin critique sans verrou : une comparaison d'entiers avec le seuil de l'état immuable
+        _LevelState. Un état ou un total lu pendant un rechargement ou un recalcul ne fait au pire
+        que retarder la détection au gain suivant, ou mener au chemin lent, qui revérifie sous
+        _points_lock.
+        """
+        if self.total_points < self._level_state.next_level_threshold:
+            return
+        with self._points_lock:
+            new_level = self._advance_level_locked()
+        if new_level is not None:
+            self._event_manager.publish('level_up', new_level=new_level)
 
-        if calculated_level > self.current_level:
-            logger.info(f"BRAVO ! Vous êtes passé du niveau {self.current_level} au niveau {calculated_level} !")
-            self.current_level = calculated_level
-            self._event_manager.publish('level_up', new_level=self.current_level)
\ No newline at end of file
+    def _advance_level_locked(self) -> Optional[int]:
+        """
+        Passe au niveau correspondant à total_points s'il est supérieur au niveau courant et le
+        retourne (None sinon). L'appelant détient _points_lock ; 'level_up' est publié hors verrou.
+        """
+        state = self._level_state
+        if self.total_points < state.next_level_threshold:
+            return None
+        new_state = _LevelState.for_points(state.rates, self.total_points)
+        if new_state.level <= state.level:
+            return None
+        logger.info(f"BRAVO ! Vous êtes passé du niveau {state.level} au niveau {new_state.level} !")
+        self._level_state = new_state
+        return new_state.level
@@ -0,0 +1,38 @@
+# modules/level/xp_rates.py
+
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Mapping
+
+from modules.level.level_curve import LevelCurve
+
+@dataclass(frozen=True, slots=True)
+class XPRates:
+    """
+    Version compilée et immuable de xp_config.json, lue à chaque événement par XPManager.
+    Lors d'un rechargement, un nouvel objet est compilé puis substitué d'un bloc :
+    un callback voit toujours un jeu de taux et une courbe de niveaux cohérents.
+    """
+    pixel_award_threshold: float
+    per_pixel: int
+    per_active_second: int
+    points_per_button: Mapping[str, int]  # Nom du bouton pynput ('left', 'right', 'middle') -> points
+    scaling_factor: int
+    level_curve: LevelCurve
+
+    @classmethod
+    def compile(cls, config: dict) -> 'XPRates':
+        """Valide et compile le contenu de xp_config.json (KeyError/TypeError si une clé manque)."""
+        rates = config['xp_gain_rates_scaled']
+        return cls(
+            pixel_award_threshold=config.get("pixel_award_threshold", 1000),
+            per_pixel=rates['per_pixel'],
+            per_active_second=rates['per_active_second'],
+            points_per_button=MappingProxyType({
+                'left': rates.get('per_left_click', 0),
+                'right': rates.get('per_right_click', 0),
+                'middle': rates.get('per_middle_click', 0),
+            }),
+            scaling_factor=config.get("xp_unit_scaling_factor", 10000),
+            level_curve=LevelCurve.from_config(config),
+        )
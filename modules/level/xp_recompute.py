@@ -0,0 +1,152 @@
+# modules/level/xp_recompute.py
+
+"""
+Recalcul des points XP à partir de l'historique daily_stats, lorsque les taux de gain changent.
+
+Les taux étant linéaires en nombre d'événements, les points d'un jour se déduisent directement
+de ses compteurs : le calcul se fait colonne par colonne sur les tableaux d'une StatsSeries,
+sans dictionnaire par ligne. La distance est convertie par jour (partie entière des pixels),
+alors qu'en direct le reliquat sous le seuil d'attribution est perdu à chaque palier : l'écart
+reste inférieur à un pixel par palier et joue en faveur de l'utilisateur.
+
+Une empreinte des taux (app_settings) permet de détecter au démarrage ou lors d'un rechargement
+de xp_config.json que l'historique a été crédité avec d'autres taux.
+"""
+
+import hashlib
+import json
+import logging
+import threading
+from array import array
+from typing import Dict, List, Sequence, Tuple
+
+from modules.level.xp_rates import XPRates
+
+logger = logging.getLogger(__name__)
+
+# Clé app_settings : empreinte des taux avec lesquels le registre XP a été calculé
+XP_RATES_FINGERPRINT_SETTING = 'xp_rates_fingerprint'
+
+# Source du registre -> (colonne de daily_stats, nom du bouton dans points_per_button ou None)
+SOURCE_COLUMNS = {
+    'distance': ('distance_pixels', None),
+    'left_click': ('left_clicks', 'left'),
+    'right_click': ('right_clicks', 'right'),
+    'middle_click': ('middle_clicks', 'middle'),
+    'active_time': ('active_time_seconds', None),
+}
+
+
+def rates_fingerprint(rates: XPRates) -> str:
+    """Empreinte des paramètres qui déterminent les points gagnés (la courbe de niveaux n'en fait pas partie)."""
+    payload = json.dumps({
+        'per_pixel': rates.per_pixel,
+        'per_active_second': rates.per_active_second,
+        'points_per_button': dict(rates.points_per_button),
+        'scaling_factor': rates.scaling_factor,
+    }, sort_keys=True)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()[:16]
+
+
+def compute_points_by_source(rates: XPRates, columns: Dict[str, Sequence], start: int = 0, stop: int = None) -> Dict[str, array]:
+    """
+    Points par jour et par source pour les jours [start, stop) de colonnes daily_stats,
+    calculés colonne par colonne. Retourne des tableaux parallèles aux colonnes d'entrée.
+    """
+    per_pixel = rates.per_pixel
+    points = {'distance': array('q', [int(d) * per_pixel for d in columns['distance_pixels'][start:stop]])}
+    for source, (column, button) in SOURCE_COLUMNS.items():
+        if source == 'distance':
+            continue
+        rate = rates.points_per_button[button] if button else rates.per_active_second
+        points[source] = array('q', [n * rate for n in columns[column][start:stop]])
+    return points
+
+
+def ledger_rows(dates: Sequence[str], points_by_source: Dict[str, array]) -> List[Tuple[str, str, int]]:
+    """Convertit les tableaux de points en lignes (date, source, points) du registre, sans les zéros."""
+    rows = []
+    for source, points in points_by_source.items():
+        rows.extend((date, source, value) for date, value in zip(dates, points) if value)
+    return rows
+
+
+class XPRecomputeWorker(threading.Thread):
+    """
+    Thread de recalcul de l'XP à partir de l'historique (voir XPManager.recompute_from_history).
+
+    Publie 'xp_recompute_progress' (done, total) au fil du calcul, puis 'xp_recompute_finished'
+    (old_total, new_total). Si les taux ont encore changé pendant le calcul, il recommence avec
+    les nouveaux avant de rendre la main.
+    """
+    def __init__(self, xp_manager, event_manager):
+        super().__init__(daemon=True, name="XPRecomputeWorker")
+        self._xp_manager = xp_manager
+        self._event_manager = event_manager
+
+    def _on_progress(self, done: int, total: int):
+        self._event_manager.publish('xp_recompute_progress', done=done, total=total)
+
+    def run(self):
+        logger.info("Le thread de recalcul de l'XP démarre.")
+        try:
+            while True:
+                rates = self._xp_manager.rates
+                old_total, new_total = self._xp_manager.recompute_from_history(rates, self._on_progress)
+                if self._xp_manager.rates is rates:
+                    break
+                logger.info("Taux XP modifiés pendant le recalcul : nouveau passage.")
+        except Exception as e:
+            logger.error(f"Échec du recalcul de l'XP, registre inchangé : {e}", exc_info=True)
+            return
+        self._event_manager.publish('xp_recompute_finished', old_total=old_total, new_total=new_total)
+        logger.info(f"Recalcul de l'XP terminé : {old_total} -> {new_total} points.")
+
+
+if __name__ == '__main__':
+    import datetime
+    import os
+    import random
+    import sqlite3
+    import tempfile
+    import time
+
+    from core.database import Database
+    from managers.stats_repository import DAILY_STAT_COLUMNS, StatsRepository
+    from modules.level.xp_repository import XPRepository
+
+    with open(os.path.join(os.path.dirname(os.path.abspath(__file__)), "xp_config.json"), 'r') as f:
+        bench_rates = XPRates.compile(json.load(f))
+
+    # Dix ans d'historique journalier
+    rng = random.Random(42)
+    first_day = datetime.date.today() - datetime.timedelta(days=3650)
+    history = [
+        ((first_day + datetime.timedelta(days=i)).isoformat(), rng.uniform(0, 2e6),
+         rng.randint(0, 8000), rng.randint(0, 800), rng.randint(0, 50), rng.randint(0, 30000), rng.randint(0, 50000))
+        for i in range(3650)
+    ]
+
+    with tempfile.TemporaryDirectory() as directory:
+        db_path = os.path.join(directory, "bench.db")
+        database = Database(db_path)
+        stats_repository = StatsRepository(database)
+        xp_repository = XPRepository(database)
+        with sqlite3.connect(db_path) as conn:
+            conn.executemany(f"INSERT INTO daily_stats (date, {', '.join(DAILY_STAT_COLUMNS)}) VALUES (?, ?, ?, ?, ?, ?, ?)", history)
+
+        start_time = time.perf_counter()
+        series = stats_repository.get_daily_stats_series()
+        read_s = time.perf_counter() - start_time
+
+        start_time = time.perf_counter()
+        rows = ledger_rows(series.periods, compute_points_by_source(bench_rates, series.columns))
+        compute_s = time.perf_counter() - start_time
+
+        start_time = time.perf_counter()
+        totals, _generation = xp_repository.replace_ledger(rows).result()
+        write_s = time.perf_counter() - start_time
+        database.close()
+
+    print(f"{len(series):,} jours -> {len(rows):,} lignes de registre, {sum(totals.values()):,} points")
+    print(f"Lecture : {read_s * 1000:.1f} ms, calcul : {compute_s * 1000:.1f} ms, écriture : {write_s * 1000:.1f} ms")
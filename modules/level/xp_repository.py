@@ -1,49 +1,148 @@
 # modules/level/xp_repository.py
 
+import datetime
+import logging
 import sqlite3
-from utils.paths import get_db_path
+from concurrent.futures import Future
+from typing import Dict, Optional, Tuple
+
+from core.database import Database
+
+logger = logging.getLogger(__name__)
+
+# Sources de points enregistrées dans xp_ledger
+XP_SOURCES = ('distance', 'left_click', 'right_click', 'middle_click', 'active_time')
+# Source des points antérieurs au registre (total_points existant lors de sa création)
+LEGACY_SOURCE = 'legacy'
+# Source des points restaurés par le rejeu du journal d'état après un arrêt non propre
+REPLAY_SOURCE = 'replay'
 
 class XPRepository:
     """
-    Gère l'accès à la table user_progress dans la base de données.
+    Gère l'accès aux tables user_progress et xp_ledger dans la base de données.
+    Le registre xp_ledger compte les points gagnés par jour et par source ; total_points
+    est incrémenté dans la même commande d'écriture et reste égal à la somme du registre.
+    ledger_generation est incrémentée à chaque remplacement du registre (recalcul) : un état
+    antérieur (journal d'état) est ainsi reconnu comme périmé.
     """
-    def __init__(self):
-        """Initialise la connexion à la base de données."""
-        db_path = get_db_path()
-        
-        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+    def __init__(self, database: Database):
+        """Initialise le repository sur le service de base de données partagé."""
+        self._db = database
         self._create_table()
 
     def _create_table(self):
-        """Crée la table user_progress si elle n'existe pas."""
+        """Crée les tables user_progress et xp_ledger si elles n'existent pas."""
+        self._db.execute(self._create_table_command)
+
+    def _create_table_command(self, conn: sqlite3.Connection):
+        """Commande d'écriture : création des tables et initialisation du registre."""
         # La colonne unlocked_badges est prévue pour le futur.
-        query = """
+        conn.execute("""
         CREATE TABLE IF NOT EXISTS user_progress (
             id INTEGER PRIMARY KEY,
             total_points INTEGER NOT NULL DEFAULT 0,
             unlocked_badges TEXT
         );
-        """
-        with self._conn:
-            self._conn.execute(query)
+        """)
+        # Base antérieure au recalcul du registre : ajout de la génération
+        if 'ledger_generation' not in {row[1] for row in conn.execute("PRAGMA table_info(user_progress)")}:
+            conn.execute("ALTER TABLE user_progress ADD COLUMN ledger_generation INTEGER NOT NULL DEFAULT 0")
+        conn.execute("""
+        CREATE TABLE IF NOT EXISTS xp_ledger (
+            date TEXT NOT NULL,
+            source TEXT NOT NULL,
+            points INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (date, source)
+        ) WITHOUT ROWID;
+        """)
+        # Base existante : les points déjà acquis sont reportés une fois dans une ligne 'legacy'
+        if conn.execute("SELECT 1 FROM xp_ledger LIMIT 1").fetchone() is None:
+            row = conn.execute("SELECT total_points FROM user_progress WHERE id = 1").fetchone()
+            if row and row[0]:
+                conn.execute(
+                    "INSERT INTO xp_ledger (date, source, points) VALUES (?, ?, ?)",
+                    (datetime.date.today().isoformat(), LEGACY_SOURCE, row[0])
+                )
+                logger.info(f"Registre XP initialisé avec {row[0]} points existants (source '{LEGACY_SOURCE}').")
 
     def get_total_points(self) -> int:
         """Récupère le total des points de l'utilisateur."""
         # Nous nous attendons à n'avoir qu'une seule ligne pour l'utilisateur.
         query = "SELECT total_points FROM user_progress WHERE id = 1;"
-        cursor = self._conn.cursor()
-        cursor.execute(query)
-        result = cursor.fetchone()
+        with self._db.read_connection() as conn:
+            result = conn.execute(query).fetchone()
         return result[0] if result else 0
 
-    def save_total_points(self, points: int):
-        """Sauvegarde le total des points de l'utilisateur."""
-        # "INSERT OR IGNORE" pour la première fois, "UPDATE" ensuite.
-        # C'est une manière atomique de gérer l'insertion/mise à jour.
-        query = "INSERT INTO user_progress (id, total_points) VALUES (1, ?) ON CONFLICT(id) DO UPDATE SET total_points = excluded.total_points;"
-        with self._conn:
-            self._conn.execute(query, (points,))
-
-    def close(self):
-        """Ferme la connexion à la base de données."""
-        self._conn.close()
\ No newline at end of file
+    def get_ledger_generation(self) -> int:
+        """Récupère la génération du registre (nombre de remplacements)."""
+        with self._db.read_connection() as conn:
+            result = conn.execute("SELECT ledger_generation FROM user_progress WHERE id = 1;").fetchone()
+        return result[0] if result else 0
+
+    def add_ledger_points(self, date_iso: str, points_by_source: Dict[str, int]) -> Optional[Future]:
+        """
+        Ajoute au registre les points gagnés pour un jour, par source, et incrémente total_points
+        du même montant, dans une seule commande d'écriture. Retourne None s'il n'y a rien à écrire.
+        """
+        rows = [(date_iso, source, points) for source, points in points_by_source.items() if points]
+        if not rows:
+            return None
+        return self._db.submit(self._add_ledger_points_command, rows, sum(points for _, _, points in rows))
+
+    def _add_ledger_points_command(self, conn: sqlite3.Connection, rows, total: int):
+        conn.executemany(
+            "INSERT INTO xp_ledger (date, source, points) VALUES (?, ?, ?) "
+            "ON CONFLICT(date, source) DO UPDATE SET points = points + excluded.points",
+            rows
+        )
+        conn.execute(
+            "INSERT INTO user_progress (id, total_points) VALUES (1, ?) "
+            "ON CONFLICT(id) DO UPDATE SET total_points = total_points + excluded.total_points",
+            (total,)
+        )
+
+    def get_points_by_source(self, start: Optional[str] = None, end: Optional[str] = None) -> Dict[str, int]:
+        """Retourne les points du registre par source, éventuellement entre deux dates incluses."""
+        query = "SELECT source, SUM(points) FROM xp_ledger WHERE date >= ? AND date <= ? GROUP BY source"
+        with self._db.read_connection() as conn:
+            rows = conn.execute(query, (start or '', end or '9999-12-31')).fetchall()
+        return {source: points for source, points in rows}
+
+    def replace_ledger(self, rows) -> Future:
+        """
+        Remplace tout le registre par `rows` (date, source, points), recalcule total_points et
+        incrémente ledger_generation, dans une seule transaction. Le Future donne
+        (nouveaux points par source, nouvelle génération).
+        """
+        return self._db.submit(self._replace_ledger_command, rows)
+
+    def _replace_ledger_command(self, conn: sqlite3.Connection, rows) -> Tuple[Dict[str, int], int]:
+        conn.execute("DELETE FROM xp_ledger")
+        conn.executemany("INSERT INTO xp_ledger (date, source, points) VALUES (?, ?, ?)", rows)
+        self._rebuild_total_points_command(conn)
+        conn.execute("UPDATE user_progress SET ledger_generation = ledger_generation + 1 WHERE id = 1")
+        generation = conn.execute("SELECT ledger_generation FROM user_progress WHERE id = 1").fetchone()[0]
+        points_by_source = {source: points for source, points in
+                            conn.execute("SELECT source, SUM(points) FROM xp_ledger GROUP BY source").fetchall()}
+        return points_by_source, generation
+
+    def check_total_points(self) -> Optional[Dict[str, int]]:
+        """Compare total_points à la somme du registre ; retourne {'stored', 'expected'} en cas d'écart, sinon None."""
+        with self._db.read_connection() as conn:
+            expected = conn.execute("SELECT COALESCE(SUM(points), 0) FROM xp_ledger").fetchone()[0]
+            row = conn.execute("SELECT total_points FROM user_progress WHERE id = 1").fetchone()
+        stored = row[0] if row else 0
+        return None if stored == expected else {'stored': stored, 'expected': expected}
+
+    def rebuild_total_points(self) -> int:
+        """Recalcule total_points à partir du registre et retourne la nouvelle valeur."""
+        return self._db.execute(self._rebuild_total_points_command)
+
+    def _rebuild_total_points_command(self, conn: sqlite3.Connection) -> int:
+        total = conn.execute("SELECT COALESCE(SUM(points), 0) FROM xp_ledger").fetchone()[0]
+        conn.execute(
+            "INSERT INTO user_progress (id, total_points) VALUES (1, ?) "
+            "ON CONFLICT(id) DO UPDATE SET total_points = excluded.total_points",
+            (total,)
+        )
+        return total
@@ -0,0 +1,65 @@
+# tests/conftest.py
+
+import os
+import sys
+
+import pytest
+
+# Les modules de l'application sont importés depuis la racine du dépôt (pas de paquet installé)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# pynput ouvre une connexion au serveur d'affichage à l'import : le backend factice suffit aux tests
+os.environ.setdefault('PYNPUT_BACKEND', 'dummy')
+
+from core.database import Database  # noqa: E402  (après l'ajout de la racine au chemin)
+
+
+@pytest.fixture
+def database(tmp_path):
+    """Service Database sur une base temporaire (thread d'écriture et pool de lecture réels)."""
+    db = Database(str(tmp_path / "stats.db"))
+    yield db
+    db.close()
+
+
+class StaticTestConfig:
+    """
+    Configuration des managers sous test : constantes de app_config.py, sans PreferenceManager
+    (user_preferences.ini n'est pas touché). Les threads optionnels sont désactivés.
+    """
+    OVERRIDES = {'XP_CONFIG_WATCH_ENABLED': False, 'XP_RECOMPUTE_ON_RATES_CHANGE': False}
+
+    def __init__(self, **overrides):
+        self.overrides = {**self.OVERRIDES, **overrides}
+
+    def get_app_config(self, key, default=None):
+        import config.app_config as app_config
+        if key in self.overrides:
+            return self.overrides[key]
+        return getattr(app_config, key, default)
+
+    def get_first_launch_date(self):
+        return "2026-01-01"
+
+
+@pytest.fixture
+def app_services(database):
+    """
+    Enregistre la base temporaire et la configuration de test dans le service locator, et
+    rétablit à la fin les abonnements de l'EventManager global et les services enregistrés.
+    """
+    from core.event_manager import event_manager
+    from core.service_locator import service_locator
+
+    saved_services = dict(service_locator._services)
+    saved_subscribers = dict(event_manager._subscribers)
+    config = StaticTestConfig()
+    service_locator.register_service("database", database)
+    service_locator.register_service("config_manager", config)
+    service_locator.register_service("event_manager", event_manager)
+    yield config
+    with event_manager._registry_lock:
+        event_manager._subscribers.clear()
+        event_manager._subscribers.update(saved_subscribers)
+    service_locator._services.clear()
+    service_locator._services.update(saved_services)
@@ -0,0 +1,118 @@
+# tests/test_database.py
+
+import sqlite3
+import threading
+
+import pytest
+
+
+def _create_table(conn):
+    conn.execute("CREATE TABLE items (value INTEGER NOT NULL)")
+
+
+def _insert(conn, value):
+    conn.execute("INSERT INTO items (value) VALUES (?)", (value,))
+    return value
+
+
+def _insert_then_fail(conn, value):
+    conn.execute("INSERT INTO items (value) VALUES (?)", (value,))
+    raise ValueError("échec volontaire")
+
+
+def _values(database):
+    with database.read_connection() as conn:
+        return [row[0] for row in conn.execute("SELECT value FROM items ORDER BY value")]
+
+
+def test_failing_command_does_not_roll_back_its_batch_neighbours(database):
+    database.execute(_create_table)
+    started = threading.Event()
+    release = threading.Event()
+
+    def hold_writer(conn):
+        started.set()
+        release.wait(5)
+
+    transactions_before = database.committed_transactions
+    # Le thread d'écriture est occupé : les commandes suivantes sont regroupées dans un même lot
+    blocker = database.submit(hold_writer)
+    assert started.wait(5)
+    futures = [
+        database.submit(_insert, 1),
+        database.submit(_insert_then_fail, 2),
+        database.submit(_insert, 3),
+    ]
+    release.set()
+    blocker.result(5)
+
+    assert futures[0].result(5) == 1
+    with pytest.raises(ValueError):
+        futures[1].result(5)
+    assert futures[2].result(5) == 3
+    assert _values(database) == [1, 3]
+    assert database.committed_transactions == transactions_before + 2  # Lot du bloqueur, puis les trois commandes
+    assert database.failed_commands == 1
+
+
+def test_nested_submit_runs_inline_in_the_enclosing_transaction(database):
+    database.execute(_create_table)
+
+    def outer(conn):
+        inner = database.submit(_insert, 7)
+        assert inner.done()
+        _insert_then_fail(conn, 8)
+
+    with pytest.raises(ValueError):
+        database.execute(outer)
+    # Le SAVEPOINT de la commande englobante annule aussi l'écriture imbriquée
+    assert _values(database) == []
+
+
+def test_result_is_visible_to_readers_once_resolved(database):
+    database.execute(_create_table)
+    for value in range(20):
+        database.submit(_insert, value)
+    database.execute(_insert, 20)
+    assert _values(database) == list(range(21))
+
+
+def test_read_connections_are_read_only(database):
+    """Les lecteurs sont ouverts en 'mode=ro' : une écriture hors du thread d'écriture échoue."""
+    database.execute(_create_table)
+    with database.read_connection() as conn:
+        with pytest.raises(sqlite3.OperationalError):
+            conn.execute("INSERT INTO items (value) VALUES (1)")
+
+
+def test_read_connections_are_pooled(database):
+    with database.read_connection() as first:
+        pass
+    with database.read_connection() as second:
+        assert second is first
+
+
+def test_submit_after_close_is_refused(database):
+    database.close()
+    with pytest.raises(RuntimeError):
+        database.submit(_create_table)
+
+
+
+def test_command_accepted_while_closing_is_executed(database, monkeypatch):
+    database.execute(_create_table)
+    put = database._write_queue.put
+    closer = threading.Thread(target=database.close)
+
+    def put_while_closing(item, *args, **kwargs):
+        # La fermeture démarre entre la vérification de _closed et la mise en file
+        if item is not None and closer.ident is None:
+            closer.start()
+            closer.join(0.5)
+        put(item, *args, **kwargs)
+
+    monkeypatch.setattr(database._write_queue, 'put', put_while_closing)
+    future = database.submit(_insert, 7)
+    closer.join(5)
+
+    assert future.result(timeout=5) == 7
@@ -0,0 +1,167 @@
+# tests/test_event_manager.py
+
+import gc
+import threading
+
+import pytest
+
+from core.event_manager import EventManager, POLICY_BLOCK
+
+
+@pytest.fixture
+def manager():
+    """Instance isolée : le singleton de l'application n'est pas partagé entre les tests."""
+    instance = object.__new__(EventManager)
+    instance.__init__()
+    yield instance
+    instance.shutdown()
+
+
+def test_publish_calls_subscribers_in_subscription_order(manager):
+    calls = []
+    manager.subscribe('tick', lambda value: calls.append(('a', value)))
+    manager.subscribe('tick', lambda value: calls.append(('b', value)))
+    manager.publish('tick', value=1)
+    assert calls == [('a', 1), ('b', 1)]
+
+
+def test_failing_callback_does_not_prevent_the_others(manager):
+    calls = []
+
+    def failing(**kwargs):
+        raise RuntimeError("échec volontaire")
+
+    manager.subscribe('tick', failing)
+    manager.subscribe('tick', lambda **kwargs: calls.append('after'))
+    manager.publish('tick')
+    manager.publish('tick')
+    assert calls == ['after', 'after']
+
+
+def test_unsubscribe_and_subscription_handle(manager):
+    calls = []
+    callback = lambda: calls.append('callback')
+    handle = manager.subscribe('tick', lambda: calls.append('handle'))
+    manager.subscribe('tick', callback)
+
+    assert manager.unsubscribe('tick', callback)
+    assert not manager.unsubscribe('tick', callback)
+    handle.unsubscribe()
+    handle.unsubscribe()  # Sans effet la seconde fois
+    manager.publish('tick')
+
+    assert calls == []
+    assert not handle.active
+    assert manager.get_subscriber_count('tick') == 0
+
+
+def test_weak_subscription_is_removed_after_collection(manager):
+    calls = []
+
+    class Owner:
+        def on_tick(self):
+            calls.append('owner')
+
+    owner = Owner()
+    handle = manager.subscribe('tick', owner.on_tick, weak=True)
+    manager.publish('tick')
+    assert calls == ['owner']
+
+    del owner
+    gc.collect()
+    manager.publish('tick')
+    assert calls == ['owner']
+    assert not handle.active
+    assert manager.get_subscriber_count('tick') == 0
+
+
+def test_concurrent_subscribe_unsubscribe_and_publish(manager):
+    """Les (dés)abonnements concurrents ne perdent aucun abonné stable ni ne font échouer publish()."""
+    stable_calls = []
+    stable_lock = threading.Lock()
+
+    def stable():
+        with stable_lock:
+            stable_calls.append(1)
+
+    manager.subscribe('tick', stable)
+    errors = []
+    stop = threading.Event()
+    barrier = threading.Barrier(6)
+
+    def churn_with_handles():
+        barrier.wait()
+        while not stop.is_set():
+            handle = manager.subscribe('tick', lambda: None)
+            handle.unsubscribe()
+
+    def churn_with_callbacks():
+        barrier.wait()
+        while not stop.is_set():
+            callback = lambda: None
+            manager.subscribe('tick', callback)
+            if not manager.unsubscribe('tick', callback):
+                errors.append("abonnement introuvable")
+
+    publish_count = 2000
+
+    def publisher():
+        barrier.wait()
+        try:
+            for _ in range(publish_count):
+                manager.publish('tick')
+        except Exception as e:  # pragma: no cover - échec du test
+            errors.append(e)
+
+    churners = [threading.Thread(target=churn_with_handles) for _ in range(2)]
+    churners += [threading.Thread(target=churn_with_callbacks) for _ in range(2)]
+    publishers = [threading.Thread(target=publisher) for _ in range(2)]
+    for thread in churners + publishers:
+        thread.start()
+    for thread in publishers:
+        thread.join()
+    stop.set()
+    for thread in churners:
+        thread.join()
+
+    assert errors == []
+    assert len(stable_calls) == 2 * publish_count
+    assert manager.get_subscriber_count('tick') == 1
+
+
+def test_async_topic_preserves_publication_order(manager):
+    received = []
+    done = threading.Event()
+    manager.configure_async('tick', maxsize=4, policy=POLICY_BLOCK)
+
+    def on_tick(value):
+        received.append(value)
+        if value == 99:
+            done.set()
+
+    manager.subscribe('tick', on_tick)
+    for value in range(100):
+        manager.publish('tick', value=value)
+
+    assert done.wait(5)
+    assert received == list(range(100))
+
+
+def test_blocked_publisher_woken_by_shutdown_still_delivers(manager):
+    received = []
+    release = threading.Event()
+    manager.configure_async('tick', maxsize=1, policy=POLICY_BLOCK)
+    manager.subscribe('tick', lambda value: (release.wait(5), received.append(value)))
+
+    manager.publish('tick', value=0)  # Occupé par le thread de distribution
+    manager.publish('tick', value=1)  # Remplit la file
+    publisher = threading.Thread(target=manager.publish, args=('tick',), kwargs={'value': 2})
+    publisher.start()
+
+    stopper = threading.Thread(target=manager.shutdown)
+    stopper.start()
+    release.set()
+    publisher.join(5)
+    stopper.join(5)
+
+    assert sorted(received) == [0, 1, 2]
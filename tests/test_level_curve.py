@@ -0,0 +1,79 @@
+# tests/test_level_curve.py
+
+import random
+import threading
+
+import pytest
+
+from modules.level.level_curve import LevelCurve
+
+BASE_XP = 100
+EXPONENT = 1.5
+SCALING_FACTOR = 10000
+
+
+def _linear_level_for_points(points: int) -> int:
+    """Ancienne boucle linéaire de l'XPManager, servant de référence."""
+    current_xp = points / SCALING_FACTOR
+    level = 1
+    total_xp_for_level_up = 0
+    while True:
+        total_xp_for_level_up += BASE_XP * (level ** EXPONENT)
+        if current_xp < total_xp_for_level_up:
+            return level
+        level += 1
+
+
+def _linear_cumulative_xp(level: int) -> float:
+    total_xp_needed = 0
+    for i in range(1, level):
+        total_xp_needed += BASE_XP * (i ** EXPONENT)
+    return total_xp_needed
+
+
+@pytest.fixture
+def curve():
+    return LevelCurve(BASE_XP, EXPONENT, SCALING_FACTOR, initial_levels=4)
+
+
+def test_level_for_points_matches_linear_loop(curve):
+    rng = random.Random(7)
+    samples = [0, 1, SCALING_FACTOR * 100 - 1, SCALING_FACTOR * 100]
+    samples += [rng.randrange(0, 10**11) for _ in range(300)]
+    for level in (2, 3, 10, 64, 65, 500):
+        threshold = curve.threshold_for_level(level)
+        samples += [threshold - 1, threshold, threshold + 1]
+
+    for points in samples:
+        assert curve.level_for_points(points) == _linear_level_for_points(points), points
+
+
+def test_cumulative_xp_matches_linear_loop(curve):
+    for level in (0, 1, 2, 5, 64, 200):
+        assert curve.cumulative_xp_for_level(level) == _linear_cumulative_xp(level)
+
+
+def test_concurrent_extension_is_consistent():
+    curve = LevelCurve(BASE_XP, EXPONENT, SCALING_FACTOR, initial_levels=2)
+    reference = LevelCurve(BASE_XP, EXPONENT, SCALING_FACTOR, initial_levels=2)
+    points_samples = [reference.threshold_for_level(level) for level in range(2, 3000, 7)]
+    expected = [reference.level_for_points(points) for points in points_samples]
+    barrier = threading.Barrier(8)
+    errors = []
+
+    def worker(offset: int):
+        barrier.wait()
+        for i in range(len(points_samples)):
+            index = (i + offset * 37) % len(points_samples)
+            level = curve.level_for_points(points_samples[index])
+            if level != expected[index]:
+                errors.append((points_samples[index], level, expected[index]))
+
+    threads = [threading.Thread(target=worker, args=(n,)) for n in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    assert curve.threshold_for_level(3000) == reference.threshold_for_level(3000)
@@ -0,0 +1,79 @@
+# tests/test_minute_stats.py
+
+import threading
+import time
+
+from managers.minute_buckets import MinuteBucketAccumulator, MINUTE_KEY_FORMAT
+from managers.stats_repository import DAILY_STAT_COLUMNS, StatsRepository
+
+
+def _row(minute, **values):
+    return (minute, minute[:10], *(values.get(column, 0) for column in DAILY_STAT_COLUMNS))
+
+
+def test_accumulator_drains_closed_minutes_only():
+    buckets = MinuteBucketAccumulator(DAILY_STAT_COLUMNS)
+    now = time.mktime(time.strptime("2026-10-16T10:05", MINUTE_KEY_FORMAT)) + 30
+    buckets.add('left_clicks', now=now - 60)
+    buckets.add('left_clicks', now=now - 60)
+    buckets.add('distance_pixels', 12.5, now=now)
+
+    closed = buckets.drain(now=now)
+    assert [row[:2] for row in closed] == [("2026-10-16T10:04", "2026-10-16")]
+    assert closed[0][2 + DAILY_STAT_COLUMNS.index('left_clicks')] == 2
+    assert len(buckets) == 1
+
+    buckets.restore(closed)
+    assert len(buckets.drain(include_open=True, now=now)) == 2
+    assert len(buckets) == 0
+
+
+
+def test_lock_free_add_loses_nothing_while_draining():
+    buckets = MinuteBucketAccumulator(DAILY_STAT_COLUMNS)
+    columns = ('left_clicks', 'distance_pixels', 'active_time_seconds')
+    per_producer = 20000
+
+    def produce(column):
+        # Une colonne par thread, comme le listener, le vidage des mouvements et le tracker
+        for i in range(per_producer):
+            buckets.add(column, now=60.0 * (i // 500))
+
+    producers = [threading.Thread(target=produce, args=(column,)) for column in columns]
+    for thread in producers:
+        thread.start()
+    rows = []
+    while any(thread.is_alive() for thread in producers):
+        rows += buckets.drain(include_open=True, now=0.0)
+    rows += buckets.drain(include_open=True, now=0.0)
+    rows += buckets.drain(include_open=True, now=0.0)
+
+    for column in columns:
+        index = 2 + DAILY_STAT_COLUMNS.index(column)
+        assert sum(row[index] for row in rows) == per_producer, column
+    assert len(buckets) == 0
+
+def test_minute_rows_are_additive_and_aggregate_by_resolution(database):
+    repository = StatsRepository(database)
+    repository.add_minute_stats([_row("2026-10-16T10:04", left_clicks=2), _row("2026-10-16T10:05", left_clicks=1)]).result()
+    repository.add_minute_stats([_row("2026-10-16T10:05", left_clicks=3), _row("2026-10-16T11:00", distance_pixels=5.0)]).result()
+
+    by_minute = repository.get_minute_stats_between("2026-10-16", "2026-10-17", 'minute')
+    assert [(row['period'], row['left_clicks']) for row in by_minute] == [
+        ("2026-10-16T10:04", 2), ("2026-10-16T10:05", 4), ("2026-10-16T11:00", 0)
+    ]
+    by_hour = repository.get_minute_stats_between("2026-10-16", "2026-10-17", 'hour')
+    assert [(row['period'], row['left_clicks']) for row in by_hour] == [("2026-10-16T10", 6), ("2026-10-16T11", 0)]
+
+
+def test_rollup_minutes_rebuilds_daily_row_and_totals(database):
+    repository = StatsRepository(database)
+    repository.increment_daily_stats("2026-10-15", {'left_clicks': 1}).result()
+    repository.add_minute_stats([_row("2026-10-15T09:00", left_clicks=4, active_time_seconds=60)]).result()
+
+    totals = repository.rollup_minute_stats_into_daily("2026-10-15")
+
+    assert totals['left_clicks'] == 4
+    assert repository.get_daily_stats("2026-10-15")['active_time_seconds'] == 60
+    assert repository.check_totals() == {}
+    assert repository.rollup_minute_stats_into_daily("2026-10-14") is None
@@ -0,0 +1,54 @@
+# tests/test_raw_event_log.py
+
+from core.event_manager import event_manager
+from managers.input_manager import InputManager
+from managers.raw_event_log import RawSegmentWriter, hour_start, iter_raw_events, BUTTON_CODES, BUTTON_MOVE
+
+HOUR = float(hour_start(1_800_000_000))
+
+
+def test_range_query_returns_events_of_unordered_frames(tmp_path):
+    """Segment écrit avant le réordonnancement : un lot de mouvements arrivé après un clic plus récent."""
+    writer = RawSegmentWriter(str(tmp_path), chunk_records=2)
+    writer.write([(HOUR + 10.0, 1, 1, BUTTON_CODES['left']), (HOUR + 20.0, 2, 2, BUTTON_MOVE)])
+    writer._last_timestamp = None  # Comportement antérieur : aucun ordre garanti entre deux écritures
+    writer.write([(HOUR + 5.0, 3, 3, BUTTON_MOVE), (HOUR + 15.0, 4, 4, BUTTON_MOVE)])
+
+    events = list(iter_raw_events(str(tmp_path), HOUR + 12.0, HOUR + 16.0))
+    assert [(x, y) for _, x, y, _ in events] == [(4, 4)]
+    assert len(list(iter_raw_events(str(tmp_path)))) == 4
+
+
+def test_late_events_are_clamped_to_keep_frames_ordered(tmp_path):
+    writer = RawSegmentWriter(str(tmp_path), chunk_records=2)
+    writer.write([(HOUR + 10.0, 1, 1, BUTTON_MOVE), (HOUR + 20.0, 2, 2, BUTTON_MOVE)])
+    writer.write([(HOUR + 15.0, 3, 3, BUTTON_CODES['left']), (HOUR + 30.0, 4, 4, BUTTON_MOVE)])
+
+    timestamps = [t for t, _, _, _ in iter_raw_events(str(tmp_path))]
+    assert timestamps == sorted(timestamps)
+    assert timestamps == [HOUR + 10.0, HOUR + 20.0, HOUR + 20.0, HOUR + 30.0]
+    # La recherche dans l'index et l'arrêt anticipé restent exacts
+    assert [x for _, x, _, _ in iter_raw_events(str(tmp_path), HOUR + 20.0, HOUR + 25.0)] == [2, 3]
+
+
+class _HotPreferences:
+    track_mouse_distance = True
+    track_mouse_clicks = True
+
+
+def test_raw_logging_disables_move_decimation(app_services):
+    app_services.overrides.update(RAW_EVENT_LOG_ENABLED=True, MOUSE_DECIMATION_ENABLED=True, MOUSE_BATCH_MODE_ENABLED=True)
+    app_services.hot_preferences = _HotPreferences()
+    input_manager = InputManager()
+    assert input_manager._decimator is None
+
+    # Mouvements répétés au même point : tous publiés pour le journal brut
+    received = []
+    subscription = event_manager.subscribe('mouse_moved_batch', lambda ts, xs, ys: received.extend(zip(xs, ys)))
+    try:
+        for _ in range(3):
+            input_manager._on_move(5, 5)
+        input_manager._publish_pending_moves()
+    finally:
+        subscription.unsubscribe()
+    assert received == [(5, 5)] * 3
@@ -0,0 +1,118 @@
+# tests/test_state_journal.py
+
+import copy
+
+from pynput.mouse import Button
+
+from core.database import Database
+from core.event_manager import event_manager
+from core.service_locator import service_locator
+from managers.state_journal import StateJournal
+from managers.stats_manager import StatsManager
+from managers.stats_repository import DAILY_STAT_COLUMNS, StatsRepository
+from modules.level.xp_manager import XPManager
+from modules.level.xp_rates import XPRates
+from modules.level.xp_repository import XPRepository
+
+
+def _start_session(journal_path):
+    """Reproduit l'ordre de l'AppBuilder : managers construits et démarrés, puis journal branché."""
+    stats_manager = StatsManager()
+    service_locator.register_service("stats_manager", stats_manager)
+    xp_manager = XPManager(event_manager)
+    xp_manager.start()
+    journal = StateJournal(str(journal_path))
+    journal.attach(stats_manager, xp_manager)
+    return stats_manager, xp_manager, journal
+
+
+def _play_activity():
+    for _ in range(3):
+        event_manager.publish('mouse_clicked', button=Button.left, x=0, y=0)
+    event_manager.publish('movement_delta', distance=2500.0)
+    for _ in range(120):
+        event_manager.publish('activity_tick', status='active')
+
+
+def test_replay_after_crash_restores_stats_and_xp(app_services, database, tmp_path):
+    journal_path = tmp_path / "state.journal"
+    stats_manager, xp_manager, journal = _start_session(journal_path)
+    _play_activity()
+    expected_stats = stats_manager.get_todays_stats()
+    expected_points = xp_manager.total_points
+
+    # Plantage : rien n'a été écrit en BDD, seules les pages du journal survivent
+    journal._mm.flush()
+    journal._mm.close()
+    database.close()
+
+    restarted = Database(database.db_path)
+    try:
+        replayed = StateJournal(str(journal_path)).replay(StatsRepository(restarted), XPRepository(restarted))
+        assert replayed
+
+        restored = StatsRepository(restarted).get_daily_stats(expected_stats['date'])
+        for column in DAILY_STAT_COLUMNS:
+            assert restored[column] == expected_stats[column], column
+        xp_repository = XPRepository(restarted)
+        assert xp_repository.get_total_points() == expected_points
+        assert xp_repository.check_total_points() is None
+    finally:
+        restarted.close()
+
+
+
+def test_recompute_lowering_total_points_is_not_undone_by_replay(app_services, database, tmp_path):
+    journal_path = tmp_path / "state.journal"
+    stats_manager, xp_manager, journal = _start_session(journal_path)
+    _play_activity()
+    stats_manager.save_changes()
+    xp_manager.save_progress()
+
+    # Taux abaissés : le recalcul réduit total_points, le journal garde l'ancien total
+    config = copy.deepcopy(xp_manager.config)
+    config['xp_gain_rates_scaled']['per_active_second'] //= 2
+    old_total, new_total = xp_manager.recompute_from_history(XPRates.compile(config))
+    assert new_total < old_total
+    assert journal.read_latest()['total_points'] == old_total
+
+    # Plantage avant le tick suivant
+    journal._mm.flush()
+    journal._mm.close()
+    database.close()
+
+    restarted = Database(database.db_path)
+    try:
+        StateJournal(str(journal_path)).replay(StatsRepository(restarted), XPRepository(restarted))
+        xp_repository = XPRepository(restarted)
+        assert xp_repository.get_total_points() == new_total
+        assert xp_repository.check_total_points() is None
+    finally:
+        restarted.close()
+
+def test_clean_shutdown_is_not_replayed(app_services, database, tmp_path):
+    journal_path = tmp_path / "state.journal"
+    stats_manager, xp_manager, journal = _start_session(journal_path)
+    _play_activity()
+
+    xp_manager.stop()
+    stats_manager.close()
+    journal.close()
+
+    reopened = StateJournal(str(journal_path))
+    assert not reopened.replay(StatsRepository(database), XPRepository(database))
+    assert XPRepository(database).get_total_points() == xp_manager.total_points
+
+
+def test_close_unsubscribes_before_closing_the_mapping(app_services, database, tmp_path):
+    stats_manager, xp_manager, journal = _start_session(tmp_path / "state.journal")
+    xp_manager.stop()
+    stats_manager.close()
+    journal.close()
+    seq = journal.seq
+
+    # Un tick ou un cycle d'écriture tardif n'atteint plus le mmap fermé
+    event_manager.publish('activity_tick', status='active')
+    event_manager.publish('flush_requested', reason='interval')
+    assert journal.seq == seq
+    assert journal._on_activity_tick not in [entry.resolve() for entry in event_manager._subscribers.get('activity_tick', ())]
@@ -0,0 +1,122 @@
+# tests/test_stats_manager.py
+
+import datetime
+import threading
+import time
+
+import pytest
+from pynput.mouse import Button
+
+from core.event_manager import event_manager
+from managers.stats_manager import StatsManager
+from managers.stats_repository import calendar_period
+
+
+@pytest.fixture
+def stats_manager(app_services):
+    manager = StatsManager()
+    yield manager
+
+
+@pytest.mark.parametrize("group_by", ['week', 'month', 'year'])
+def test_rollup_series_includes_unflushed_deltas_of_a_new_period(stats_manager, group_by):
+    for _ in range(4):
+        event_manager.publish('mouse_clicked', button=Button.left, x=0, y=0)
+
+    # Aucun cycle d'écriture : la table de cumuls n'a pas encore de ligne pour la période en cours
+    series = stats_manager.get_rollup_series(group_by)
+
+    assert series.periods == [calendar_period(stats_manager.today, group_by)]
+    assert list(series['left_clicks']) == [4]
+    assert len(series['distance_pixels']) == 1
+
+
+def test_rollup_series_out_of_range_ignores_today(stats_manager):
+    event_manager.publish('mouse_clicked', button=Button.left, x=0, y=0)
+    series = stats_manager.get_rollup_series('year', end_period='2000')
+    assert len(series) == 0
+
+
+def test_flushes_write_additive_deltas(stats_manager):
+    repository = stats_manager.stats_repository
+    for _ in range(3):
+        event_manager.publish('mouse_clicked', button=Button.right, x=0, y=0)
+    assert stats_manager.save_changes()
+    assert not stats_manager.save_changes()
+
+    # Un autre écrivain alimente le même jour : ses ajouts ne sont pas écrasés
+    repository.increment_daily_stats(stats_manager.today, {'right_clicks': 10}).result()
+    event_manager.publish('mouse_clicked', button=Button.right, x=0, y=0)
+    stats_manager.save_changes()
+
+    assert repository.get_daily_stats(stats_manager.today)['right_clicks'] == 3 + 10 + 1
+    assert repository.check_totals() == {}
+    assert repository.check_rollups() == {}
+
+
+def test_reads_do_not_wait_for_a_queued_flush(stats_manager, database):
+    started = threading.Event()
+    release = threading.Event()
+
+    def blocking_command(conn):
+        started.set()
+        release.wait(5)
+
+    # Le thread d'écriture est occupé : le cycle d'écriture suivant reste en file
+    blocker = database.submit(blocking_command)
+    assert started.wait(5)
+    for _ in range(2):
+        event_manager.publish('mouse_clicked', button=Button.middle, x=0, y=0)
+    flush = threading.Thread(target=stats_manager.save_changes)
+    flush.start()
+    try:
+        deadline = time.monotonic() + 5
+        while stats_manager._flush_generation % 2 == 0 and time.monotonic() < deadline:
+            time.sleep(0.001)
+
+        started_at = time.monotonic()
+        totals = stats_manager.get_global_stats()
+        series = stats_manager.get_stats_between(stats_manager.today, stats_manager.today)
+        assert time.monotonic() - started_at < 1
+        assert flush.is_alive()
+        assert totals['middle_clicks'] == 2
+        assert list(series['middle_clicks']) == [2]
+    finally:
+        release.set()
+        blocker.result()
+        flush.join(5)
+
+    assert stats_manager.get_global_stats()['middle_clicks'] == 2
+    assert stats_manager.stats_repository.get_daily_stats(stats_manager.today)['middle_clicks'] == 2
+
+
+def test_failed_day_change_write_is_retried_on_next_flush(stats_manager, monkeypatch):
+    repository = stats_manager.stats_repository
+    today = stats_manager.today
+    tomorrow = (datetime.date.fromisoformat(today) + datetime.timedelta(days=1)).isoformat()
+    for _ in range(3):
+        event_manager.publish('movement_delta', distance=500.0)
+        event_manager.publish('activity_tick', status='active')
+
+    # L'écriture de la veille échoue au changement de jour
+    increment = repository.increment_daily_stats
+    def failing_increment(date_iso, deltas):
+        if date_iso == today:
+            raise RuntimeError("écriture impossible")
+        return increment(date_iso, deltas)
+    monkeypatch.setattr(repository, 'increment_daily_stats', failing_increment)
+    event_manager.publish('day_changed', old_date=today, new_date=tomorrow)
+
+    # Le cache des records intègre tout de même la veille
+    assert stats_manager._previous_records['distance_pixels']['distance_pixels'] == 1500.0
+    assert repository.get_daily_stats(today)['distance_pixels'] == 0
+
+    monkeypatch.setattr(repository, 'increment_daily_stats', increment)
+    event_manager.publish('mouse_clicked', button=Button.left, x=0, y=0)
+    assert stats_manager.save_changes()
+
+    assert repository.get_daily_stats(today)['distance_pixels'] == 1500.0
+    assert repository.get_daily_stats(today)['active_time_seconds'] == 3
+    assert repository.get_daily_stats(tomorrow)['left_clicks'] == 1
+    assert stats_manager._unsaved_previous_days == []
+    assert repository.check_totals() == {}
@@ -0,0 +1,66 @@
+# tests/test_stats_repository.py
+
+from managers.stats_repository import StatsRepository
+
+
+def test_get_stats_between_zero_fills_missing_days(database):
+    repository = StatsRepository(database)
+    repository.increment_daily_stats("2026-10-12", {'left_clicks': 3, 'distance_pixels': 10.5}).result()
+    repository.increment_daily_stats("2026-10-15", {'left_clicks': 2}).result()
+
+    series = repository.get_stats_between("2026-10-11", "2026-10-16", 'day')
+
+    assert series.periods == ["2026-10-11", "2026-10-12", "2026-10-13", "2026-10-14", "2026-10-15", "2026-10-16"]
+    assert list(series['left_clicks']) == [0, 3, 0, 0, 2, 0]
+    assert list(series['distance_pixels']) == [0.0, 10.5, 0.0, 0.0, 0.0, 0.0]
+    assert series.row(1)['period'] == "2026-10-12"
+
+
+def test_get_stats_between_groups_by_calendar_period(database):
+    repository = StatsRepository(database)
+    repository.increment_daily_stats("2026-09-30", {'left_clicks': 1}).result()
+    repository.increment_daily_stats("2026-10-01", {'left_clicks': 2}).result()
+
+    by_week = repository.get_stats_between("2026-09-28", "2026-10-11", 'week')
+    assert by_week.periods == ["2026-09-28", "2026-10-05"]  # Semaines identifiées par leur lundi
+    assert list(by_week['left_clicks']) == [3, 0]
+
+    by_month = repository.get_stats_between("2026-09-29", "2026-10-02", 'month')
+    assert by_month.periods == ["2026-09", "2026-10"]
+    assert list(by_month['left_clicks']) == [1, 2]
+
+
+def test_totals_and_rollups_match_daily_stats_after_increments(database):
+    repository = StatsRepository(database)
+    days = ["2025-12-29", "2025-12-31", "2026-01-01", "2026-01-05", "2026-02-01"]
+    futures = [
+        repository.increment_daily_stats(day, {'left_clicks': i + 1, 'distance_pixels': 100.25 * (i + 1), 'active_time_seconds': 60})
+        for i, day in enumerate(days)
+    ]
+    futures.append(repository.increment_daily_stats(days[1], {'right_clicks': 2, 'left_clicks': 1}))
+    for future in futures:
+        future.result()
+    # Correction par valeurs absolues : la différence est reportée sur les totaux et les cumuls
+    repository.update_daily_stats({**repository.get_daily_stats(days[2]), 'left_clicks': 10}).result()
+
+    assert repository.check_totals() == {}
+    assert repository.check_rollups() == {}
+    assert repository.get_global_stats()['total_left_clicks'] == 1 + 3 + 10 + 4 + 5
+    yearly = repository.get_rollup_series('year')
+    assert yearly.periods == ["2025", "2026"]
+    assert list(yearly['left_clicks']) == [1 + 3, 10 + 4 + 5]
+
+
+def test_rebuild_repairs_drifted_totals_and_rollups(database):
+    repository = StatsRepository(database)
+    repository.increment_daily_stats("2026-10-16", {'left_clicks': 5}).result()
+    database.execute(lambda conn: conn.execute("UPDATE totals SET left_clicks = 999"))
+    database.execute(lambda conn: conn.execute("UPDATE monthly_stats SET left_clicks = 999"))
+
+    assert repository.check_totals()['left_clicks'] == {'stored': 999, 'expected': 5}
+    assert "monthly_stats" in repository.check_rollups()
+
+    repository.rebuild_totals()
+    repository.rebuild_rollups()
+    assert repository.check_totals() == {}
+    assert repository.check_rollups() == {}
@@ -0,0 +1,220 @@
+# tests/test_xp_ledger.py
+
+import copy
+import datetime
+import threading
+import time
+
+import pytest
+from pynput.mouse import Button
+
+from core.event_manager import event_manager
+from core.service_locator import service_locator
+from managers.stats_manager import StatsManager
+from modules.level.xp_manager import XPManager
+from modules.level.xp_rates import XPRates
+from modules.level.xp_recompute import XP_RATES_FINGERPRINT_SETTING, rates_fingerprint
+from modules.level.xp_repository import LEGACY_SOURCE, XPRepository
+
+
+@pytest.fixture
+def managers(app_services):
+    stats_manager = StatsManager()
+    service_locator.register_service("stats_manager", stats_manager)
+    xp_manager = XPManager(event_manager)
+    xp_manager.start()
+    yield stats_manager, xp_manager
+
+
+def _earn_points():
+    for _ in range(5):
+        event_manager.publish('mouse_clicked', button=Button.left, x=0, y=0)
+    event_manager.publish('mouse_clicked', button=Button.middle, x=0, y=0)
+    event_manager.publish('movement_delta', distance=4200.0)
+    for _ in range(30):
+        event_manager.publish('activity_tick', status='active')
+
+
+def _assert_ledger_consistent(repository: XPRepository, xp_manager: XPManager):
+    assert repository.check_total_points() is None
+    assert sum(repository.get_points_by_source().values()) == repository.get_total_points()
+    assert repository.get_total_points() == xp_manager.total_points
+
+
+def test_ledger_sum_equals_total_points_after_flush(managers, database):
+    _, xp_manager = managers
+    repository = XPRepository(database)
+    _earn_points()
+
+    assert xp_manager.save_progress()
+    _assert_ledger_consistent(repository, xp_manager)
+
+    # Deuxième cycle : seuls les points gagnés depuis sont ajoutés
+    _earn_points()
+    event_manager.publish('flush_requested')
+    _assert_ledger_consistent(repository, xp_manager)
+    assert not xp_manager.save_progress()
+
+
+def test_day_change_dates_ledger_rows_per_day(managers, database):
+    _, xp_manager = managers
+    repository = XPRepository(database)
+    today = xp_manager._ledger_date
+    tomorrow = (datetime.date.fromisoformat(today) + datetime.timedelta(days=1)).isoformat()
+
+    _earn_points()
+    points_today = xp_manager.total_points
+    event_manager.publish('day_changed', old_date=today, new_date=tomorrow)
+    _earn_points()
+    xp_manager.save_progress()
+
+    _assert_ledger_consistent(repository, xp_manager)
+    assert sum(repository.get_points_by_source(end=today).values()) == points_today
+    assert sum(repository.get_points_by_source(start=tomorrow).values()) == xp_manager.total_points - points_today
+
+
+def test_existing_total_points_are_seeded_as_legacy(database):
+    database.execute(lambda conn: conn.execute(
+        "CREATE TABLE user_progress (id INTEGER PRIMARY KEY, total_points INTEGER NOT NULL DEFAULT 0, unlocked_badges TEXT)"
+    ))
+    database.execute(lambda conn: conn.execute("INSERT INTO user_progress (id, total_points) VALUES (1, 123456)"))
+
+    repository = XPRepository(database)
+    assert repository.get_points_by_source() == {LEGACY_SOURCE: 123456}
+    assert repository.check_total_points() is None
+
+    # Le report n'a lieu qu'une fois
+    XPRepository(database)
+    assert repository.get_points_by_source() == {LEGACY_SOURCE: 123456}
+
+
+def test_recompute_from_history_keeps_ledger_and_total_consistent(managers, database):
+    stats_manager, xp_manager = managers
+    repository = XPRepository(database)
+    stats_manager.stats_repository.increment_daily_stats(
+        "2025-06-01", {'left_clicks': 10, 'right_clicks': 2, 'distance_pixels': 2500.7, 'active_time_seconds': 100}
+    ).result()
+    _earn_points()
+    xp_manager.save_progress()
+    _earn_points()
+
+    # Taux modifiés : les clics gauches rapportent le double
+    config = copy.deepcopy(xp_manager.config)
+    config['xp_gain_rates_scaled']['per_left_click'] *= 2
+    rates = XPRates.compile(config)
+    xp_manager._on_config_reloaded(config)
+    old_total, new_total = xp_manager.recompute_from_history(rates)
+
+    per_left, per_right = rates.points_per_button['left'], rates.points_per_button['right']
+    history_points = 10 * per_left + 2 * per_right + 2500 * rates.per_pixel + 100 * rates.per_active_second
+    today = stats_manager.get_todays_stats()
+    today_points = (today['left_clicks'] * per_left + rates.points_per_button['middle'] * today['middle_clicks']
+                    + int(today['distance_pixels']) * rates.per_pixel
+                    + today['active_time_seconds'] * rates.per_active_second)
+    assert new_total == history_points + today_points
+    assert new_total != old_total
+    _assert_ledger_consistent(repository, xp_manager)
+    assert stats_manager.stats_repository.get_app_setting(XP_RATES_FINGERPRINT_SETTING) == rates_fingerprint(rates)
+
+    # Points gagnés après le recalcul : en mémoire, puis ajoutés au registre au cycle suivant
+    _earn_points()
+    unflushed = sum(xp_manager._earned.values()) - sum(xp_manager._persisted_earned.values())
+    assert unflushed > 0
+    assert xp_manager.total_points == repository.get_total_points() + unflushed
+    xp_manager.save_progress()
+    _assert_ledger_consistent(repository, xp_manager)
+
+
+def test_recompute_does_not_block_readers_or_lose_concurrent_points(managers, database):
+    _, xp_manager = managers
+    repository = XPRepository(database)
+    _earn_points()
+    xp_manager.save_progress()
+
+    config = copy.deepcopy(xp_manager.config)
+    config['xp_gain_rates_scaled']['per_active_second'] *= 3
+    rates = XPRates.compile(config)
+
+    def on_progress(done, total):
+        # Pendant le calcul : gains, lecture de la répartition et cycle d'écriture sur un autre thread
+        def concurrent_work():
+            _earn_points()
+            xp_manager.get_xp_breakdown()
+            xp_manager.save_progress()
+        worker = threading.Thread(target=concurrent_work)
+        worker.start()
+        worker.join(5)
+        assert not worker.is_alive()
+
+    xp_manager.recompute_from_history(rates, on_progress)
+    xp_manager.save_progress()
+    _assert_ledger_consistent(repository, xp_manager)
+
+
+def test_config_reload_publishes_level_and_threshold_together(managers):
+    _, xp_manager = managers
+    _earn_points()
+    levels = []
+    subscription = event_manager.subscribe('level_up', lambda new_level: levels.append(new_level))
+    try:
+        # Courbe plus douce : le niveau monte au rechargement, sans 'level_up'
+        config = copy.deepcopy(xp_manager.config)
+        config['leveling_formula']['base_xp'] = 1
+        xp_manager._on_config_reloaded(config)
+        state = xp_manager._level_state
+        assert state.rates is xp_manager.rates
+        assert state.level == state.rates.level_curve.level_for_points(xp_manager.total_points)
+        assert state.next_level_threshold == state.rates.level_curve.threshold_for_level(state.level + 1)
+        assert levels == []
+
+        # Le gain qui franchit le seuil suivant publie exactement un 'level_up'
+        xp_manager._add_points('active_time', state.next_level_threshold - xp_manager.total_points)
+        assert len(levels) == 1 and levels[0] > state.level
+        assert xp_manager.current_level == levels[0]
+    finally:
+        subscription.unsubscribe()
+
+
+def test_breakdown_does_not_wait_for_a_queued_ledger_write(managers, database):
+    _, xp_manager = managers
+    started = threading.Event()
+    release = threading.Event()
+
+    def blocking_command(conn):
+        started.set()
+        release.wait(5)
+
+    # Le thread d'écriture est occupé : l'écriture du registre reste en file, _ledger_lock détenu
+    blocker = database.submit(blocking_command)
+    assert started.wait(5)
+    _earn_points()
+    expected = xp_manager.get_xp_breakdown()
+    save = threading.Thread(target=xp_manager.save_progress)
+    save.start()
+    try:
+        deadline = time.monotonic() + 5
+        while not xp_manager._ledger_lock.locked() and time.monotonic() < deadline:
+            time.sleep(0.001)
+
+        started_at = time.monotonic()
+        breakdown = xp_manager.get_xp_breakdown()
+        assert time.monotonic() - started_at < 1
+        assert save.is_alive()
+        assert breakdown == expected
+    finally:
+        release.set()
+        blocker.result()
+        save.join(5)
+
+    assert xp_manager.get_xp_breakdown() == expected
+    _assert_ledger_consistent(XPRepository(database), xp_manager)
+
+
+def test_level_check_below_threshold_does_not_take_the_points_lock(managers):
+    _, xp_manager = managers
+    checker = threading.Thread(target=xp_manager._check_for_level_up)
+    with xp_manager._points_lock:
+        checker.start()
+        checker.join(5)
+        assert not checker.is_alive()
+    assert xp_manager.total_points < xp_manager._level_state.next_level_threshold
@@ -6,7 +6,7 @@ import appdirs
 from typing import Optional
 
 # --- AJOUT: Import des constantes depuis la configuration centrale ---
-from config.app_config import APP_NAME, APP_AUTHOR, DB_FILENAME, PREFERENCES_FILENAME
+from config.app_config import APP_NAME, APP_AUTHOR, DB_FILENAME, PREFERENCES_FILENAME, RAW_EVENTS_DIRNAME, STATE_JOURNAL_FILENAME
 
 
 def resource_path(relative_path: str) -> str:
@@ -47,6 +47,16 @@ def get_db_path() -> str:
     # --- MODIFIÉ: Utilise la constante importée ---
     return os.path.join(get_user_data_dir(), DB_FILENAME)
 
+def get_state_journal_path() -> str:
+    """Retourne le chemin complet vers le journal d'état des compteurs en cours (à côté de la BDD)."""
+    return os.path.join(get_user_data_dir(), STATE_JOURNAL_FILENAME)
+
+def get_raw_events_dir() -> str:
+    """Retourne le dossier des segments du journal brut des événements et le crée s'il n'existe pas."""
+    raw_events_dir = os.path.join(get_user_data_dir(), RAW_EVENTS_DIRNAME)
+    os.makedirs(raw_events_dir, exist_ok=True)
+    return raw_events_dir
+
 def get_preferences_path() -> str:
     """Retourne le chemin complet et standardisé vers le fichier de préférences."""
     # --- MODIFIÉ: Utilise la constante importée ---